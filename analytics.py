@@ -0,0 +1,194 @@
+"""
+Time-bucketed analytics over a date range.
+
+Trend views (the dashboard charts cover 30-90 days) need totals per day, week
+or month. Rather than one single-day query per day, each range is answered by
+one grouped query: totals from ``daily_summaries`` and the meal-type breakdown
+from the food logs, both grouped by a dialect-specific bucket expression.
+
+Results are cached per (user, range, bucket). Every log write bumps the
+user's version, so cached ranges for that user stop matching and age out of
+the LRU; a result computed while a write was in flight is stored under the
+old version and is never served. The TTL bounds staleness for writes made by
+other processes.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from cache import LRUCache
+from config import Config
+from summaries import SUMMARY_COLUMNS
+
+BUCKETS = ('day', 'week', 'month')
+MEAL_TYPES = tuple(Config.MEAL_TYPES)
+
+
+def to_date(value) -> date:
+    """Accept a date, datetime or ISO string (SQLite returns dates as strings)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the day/week (Monday)/month bucket holding ``day``"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(start_date: date, end_date: date, bucket: str) -> List[date]:
+    """Every bucket between two dates, so gaps in the data still get a (zero) point"""
+    starts = []
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        starts.append(current)
+        if bucket == 'month':
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=7 if bucket == 'week' else 1)
+    return starts
+
+
+def build_series(start_date, end_date, bucket, total_rows, meal_rows) -> Dict[str, Any]:
+    """Columnar result (one list per metric, aligned with ``periods``) ready for Chart.js
+
+    ``total_rows`` are (bucket, days_logged, *SUMMARY_COLUMNS) and ``meal_rows``
+    are (bucket, meal_type, calories), as returned by the grouped queries.
+    """
+    periods = bucket_starts(start_date, end_date, bucket)
+    index = {period: i for i, period in enumerate(periods)}
+    totals = {column: [0] * len(periods) for column in SUMMARY_COLUMNS}
+    days_logged = [0] * len(periods)
+    meals = {meal_type: [0] * len(periods) for meal_type in MEAL_TYPES}
+
+    for period, logged, *values in total_rows:
+        i = index[to_date(period)]
+        days_logged[i] = logged
+        for column, value in zip(SUMMARY_COLUMNS, values):
+            totals[column][i] = round(float(value or 0), 2)
+    for period, meal_type, calories in meal_rows:
+        series = meals.setdefault(meal_type or 'snack', [0] * len(periods))
+        i = index[to_date(period)]
+        series[i] = round(series[i] + float(calories or 0), 2)
+
+    return {
+        'bucket': bucket,
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'periods': [period.isoformat() for period in periods],
+        'days_logged': days_logged,
+        'totals': totals,
+        'meals': meals,
+    }
+
+
+def date_range(days: int, end_date=None):
+    """(start, end) of the ``days`` days ending on ``end_date`` (today by default)"""
+    end_date = to_date(end_date) if end_date else date.today()
+    return end_date - timedelta(days=days - 1), end_date
+
+
+class AnalyticsCache:
+    """LRU of range results, invalidated per user by a version counter"""
+
+    # One cache per database, shared by every AnalyticsManager in the process
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, maxsize=None, ttl=None):
+        self._results = LRUCache(maxsize=maxsize or Config.ANALYTICS_CACHE_SIZE,
+                                 ttl=ttl if ttl is not None else Config.ANALYTICS_CACHE_TTL)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db) -> 'AnalyticsCache':
+        """Return the shared cache for the database ``db`` is connected to"""
+        key = db.db_manager.database_key()
+        with cls._caches_lock:
+            if key not in cls._caches:
+                cls._caches[key] = cls()
+            return cls._caches[key]
+
+    def key(self, user_id, *args) -> tuple:
+        """Cache key for a user's result; take it *before* running the query"""
+        with self._lock:
+            return (user_id, self._versions.get(user_id, 0)) + args
+
+    def get(self, key):
+        return self._results.get(key)
+
+    def set(self, key, value):
+        self._results.set(key, value)
+
+    def invalidate(self, user_id=None):
+        """Forget a user's cached ranges (everyone's if ``user_id`` is None)"""
+        if user_id is None:
+            self._results.clear()
+            return
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def stats(self):
+        return self._results.stats()
+
+
+class AnalyticsManager:
+    """Per-day/week/month totals and meal breakdowns for a date range"""
+
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def cache(self):
+        return AnalyticsCache.for_database(self.db)
+
+    def invalidate(self, user_id=None):
+        """Call after a log write for ``user_id`` has been committed"""
+        self.cache.invalidate(user_id)
+
+    def totals(self, user_id, start_date, end_date, bucket='day') -> List[tuple]:
+        """(bucket, days_logged, calories, protein, carbs, fat, water_glasses, exercise_minutes) rows"""
+        period = self.db.dialect.date_bucket('date', bucket)
+        sums = ', '.join(f"SUM({column})" for column in SUMMARY_COLUMNS)
+        return self.db.fetch_all(f'''
+            SELECT {period} AS period, COUNT(*), {sums}
+            FROM daily_summaries
+            WHERE user_id = %s AND date BETWEEN %s AND %s
+            GROUP BY period
+            ORDER BY period
+        ''', (user_id, start_date, end_date))
+
+    def meal_breakdown(self, user_id, start_date, end_date, bucket='day') -> List[tuple]:
+        """(bucket, meal_type, calories) rows"""
+        period = self.db.dialect.date_bucket('fl.date', bucket)
+        return self.db.fetch_all(f'''
+            SELECT {period} AS period, fl.meal_type, SUM(f.calories_per_100g * fl.amount / 100.0)
+            FROM food_logs fl
+            JOIN foods f ON fl.food_id = f.id
+            WHERE fl.user_id = %s AND fl.date BETWEEN %s AND %s
+            GROUP BY period, fl.meal_type
+            ORDER BY period
+        ''', (user_id, start_date, end_date))
+
+    def series(self, user_id, start_date, end_date, bucket='day') -> Dict[str, Any]:
+        """Cached per-bucket totals and meal breakdown for a range (see ``build_series``)"""
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket} (expected one of {', '.join(BUCKETS)})")
+        start_date, end_date = to_date(start_date), to_date(end_date)
+        cache = self.cache
+        key = cache.key(user_id, start_date, end_date, bucket)
+        result = cache.get(key)
+        if result is None:
+            params = (user_id, start_date.isoformat(), end_date.isoformat(), bucket)
+            result = build_series(start_date, end_date, bucket,
+                                  self.totals(*params), self.meal_breakdown(*params))
+            cache.set(key, result)
+        return result
@@ -0,0 +1,59 @@
+"""
+Background data access for the Kivy app.
+
+Kivy widgets may only be touched from the main thread, and a blocking
+database call there freezes the UI. ``BackgroundWorker`` runs callables on a
+single worker thread (one thread, so the app's single database connection is
+never used concurrently) and hands results back to the main thread through
+``Clock.schedule_once``.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _kivy_schedule(callback):
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback())
+
+
+class BackgroundWorker:
+    """Runs blocking calls off the UI thread and delivers results on it"""
+
+    def __init__(self, schedule=None, name='data'):
+        # ``schedule`` runs a zero-argument callable on the UI thread; Kivy's Clock by default
+        self.schedule = schedule or _kivy_schedule
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, fn, *args, on_result=None, on_error=None, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in the background
+
+        ``on_result(result)`` or ``on_error(exception)`` is then called on the
+        UI thread. Returns the underlying Future.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BackgroundWorker is shut down")
+            future = self._executor.submit(fn, *args, **kwargs)
+
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    self.schedule(lambda: on_error(error))
+                else:
+                    print(f"Background task {getattr(fn, '__name__', fn)} failed: {error}")
+            elif on_result:
+                result = future.result()
+                self.schedule(lambda: on_result(result))
+
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self, wait=True):
+        """Finish queued work and stop the thread"""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Load tests and micro-benchmarks.
+
+Seeds synthetic users and logs (from datagen.py) into dedicated benchmark
+databases (never the app's own), then measures:
+
+- ``web``: a weighted mix of ``/``, ``/food``, ``/add_food`` and
+  ``/add_water`` requests from concurrent clients, each signed in as a random
+  seeded user. Requests go through the WSGI app in-process, or over HTTP to a
+  running server with ``--url`` (start it with serve.py with
+  ``WEB_DATABASE_URI`` set to the benchmark's URI).
+- ``datamanager``: every DataManager read and write method, called repeatedly
+  for random seeded users.
+
+The databases are SQLite files in ``--data-dir`` unless
+``BENCH_DATABASE_TYPE=mysql`` with ``BENCH_MYSQL_DATABASE`` and/or
+``BENCH_WEB_DATABASE_URI`` are set; seeding empties them, so they must not be
+the app's own (``DB_NAME`` / ``WEB_DATABASE_URI``). The benchmark commands
+seed a data dir that has never been fully seeded (no ``bench_seed`` row).
+
+Runs are deterministic for a given ``--seed``. Save results with ``--save``
+and compare a later run against them with ``--baseline`` to catch regressions:
+
+    python3 benchmark.py seed --users 10000 --days 180   # ~14M logs
+    python3 benchmark.py all --save bench_output.json
+    python3 benchmark.py all --baseline bench_output.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'fitness_bench')
+
+# (method, path, weight)
+DEFAULT_MIX = [
+    ('GET', '/', 40),
+    ('GET', '/food', 30),
+    ('POST', '/add_food', 20),
+    ('POST', '/add_water', 10),
+]
+
+
+# Written last by each seed, so an interrupted seed is redone
+SEED_MARKER_TABLE = "CREATE TABLE IF NOT EXISTS bench_seed (users INT NOT NULL, days INT NOT NULL, seed INT NOT NULL)"
+
+
+def use_data_dir(data_dir):
+    """Point both stacks at benchmark databases inside ``data_dir`` (or the BENCH_* ones)
+
+    Raises ValueError when a benchmark database would be the app's own, since seeding empties it.
+    """
+    from sqlalchemy.engine import make_url
+
+    os.makedirs(data_dir, exist_ok=True)
+    database_type = os.getenv('BENCH_DATABASE_TYPE', 'sqlite')
+    if database_type == 'mysql':
+        database_name = os.getenv('BENCH_MYSQL_DATABASE')
+        if not database_name:
+            raise ValueError("BENCH_DATABASE_TYPE=mysql needs BENCH_MYSQL_DATABASE (a database just for benchmarks)")
+        if database_name == Config.DATABASE_NAME:
+            raise ValueError(f"BENCH_MYSQL_DATABASE is the app's database ({Config.DATABASE_NAME}); "
+                             f"refusing to seed it")
+        Config.DATABASE_NAME = database_name
+    default_web_uri = 'sqlite:///' + os.path.join(os.path.abspath(data_dir), 'bench_web.db')
+    web_uri = os.getenv('BENCH_WEB_DATABASE_URI', default_web_uri)
+    if make_url(web_uri) == make_url(Config.WEB_DATABASE_URI):
+        raise ValueError(f"BENCH_WEB_DATABASE_URI is the app's WEB_DATABASE_URI ({Config.WEB_DATABASE_URI}); "
+                         f"refusing to seed it")
+    Config.DATABASE_TYPE = database_type
+    Config.SQLITE_DATABASE_PATH = os.path.join(data_dir, 'bench_raw.db')
+    Config.WEB_DATABASE_URI = web_uri
+
+
+def percentiles(samples):
+    """Summary of latency samples (seconds) in milliseconds"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method='inclusive') if len(ordered) > 1 else ordered * 99
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+# Seeding
+
+def synthetic_data(foods, exercises, users, days, seed):
+    """Generator for ``users`` users over the last ``days`` days (see datagen.py)"""
+    from datagen import SyntheticDataGenerator
+
+    end_date = date.today()
+    return SyntheticDataGenerator(foods, exercises, users, end_date - timedelta(days=days - 1), end_date, seed)
+
+
+def seed_raw(users, days, seed):
+    """Seed the raw-SQL (Database/DataManager) benchmark database; return rows written per table"""
+    from database import Database
+    from datagen import catalogue_from_database, write_database
+
+    with Database() as db:
+        db.execute_query(SEED_MARKER_TABLE)
+        for table in ('bench_seed', 'daily_summaries', 'food_logs', 'exercise_logs', 'water_logs', 'pantry', 'users'):
+            db.execute_query(f"DELETE FROM {table}")
+        db.connection.commit()
+        foods, exercises = catalogue_from_database(db)
+        counts = write_database(db, synthetic_data(foods, exercises, users, days, seed))
+        db.execute_query(f'''
+            INSERT INTO pantry (user_id, food_id)
+            SELECT id, {foods[0]['id']} FROM users
+        ''')
+        db.execute_query("INSERT INTO bench_seed (users, days, seed) VALUES (%s, %s, %s)", (users, days, seed))
+        db.connection.commit()
+    return counts
+
+
+def seed_web(users, days, seed):
+    """Seed the web app's benchmark database; return rows written per table"""
+    from sqlalchemy import delete, insert, text
+    import web_app
+    from datagen import TABLE_COLUMNS, write_rows
+    from web_app import (DailySummary, Exercise, ExerciseLog, Food, FoodLog, Pantry, User, WaterLog, app, db,
+                         exercise_to_dict, food_to_dict)
+
+    models = {'users': User, 'food_logs': FoodLog, 'exercise_logs': ExerciseLog, 'water_logs': WaterLog,
+              'daily_summaries': DailySummary}
+
+    def write(table, rows):
+        values = [dict(zip(TABLE_COLUMNS[table], row)) for row in rows]
+        if 'date' in TABLE_COLUMNS[table]:
+            for value in values:
+                value['date'] = date.fromisoformat(value['date'])
+        db.session.execute(insert(models[table]), values)
+        db.session.commit()
+
+    web_app.init_db()
+    with app.app_context():
+        db.session.execute(text(SEED_MARKER_TABLE))
+        db.session.execute(text("DELETE FROM bench_seed"))
+        for model in (DailySummary, FoodLog, ExerciseLog, WaterLog, Pantry, User):
+            db.session.execute(delete(model))
+        db.session.commit()
+        foods = [food_to_dict(food) for food in Food.query.all()]
+        exercises = [exercise_to_dict(exercise) for exercise in Exercise.query.all()]
+        counts = write_rows(synthetic_data(foods, exercises, users, days, seed), write)
+        user_ids = [row[0] for row in db.session.query(User.id)]
+        db.session.execute(insert(Pantry), [{'user_id': user_id, 'food_id': foods[0]['id']} for user_id in user_ids])
+        db.session.execute(text("INSERT INTO bench_seed (users, days, seed) VALUES (:users, :days, :seed)"),
+                           {'users': users, 'days': days, 'seed': seed})
+        db.session.commit()
+    return counts
+
+
+def seed_markers():
+    """(users, days, seed) recorded by the last complete seed of each database, or None"""
+    from sqlalchemy import text
+    from database import Database
+    from web_app import app, db, init_db
+
+    init_db()
+    with Database() as raw:
+        raw.execute_query(SEED_MARKER_TABLE)
+        raw_marker = raw.fetch_one("SELECT users, days, seed FROM bench_seed")
+    with app.app_context():
+        db.session.execute(text(SEED_MARKER_TABLE))
+        web_marker = db.session.execute(text("SELECT users, days, seed FROM bench_seed")).first()
+        db.session.commit()
+    return (tuple(raw_marker) if raw_marker else None), (tuple(web_marker) if web_marker else None)
+
+
+def seeded_ids(args):
+    """Seeded user ids of both benchmark databases, seeding them first unless both were fully seeded
+
+    The app's own rows (the local user from the migrations, the web demo user)
+    do not count: only a ``bench_seed`` row written at the end of a seed does.
+    """
+    from database import Database
+    from web_app import User, app, db
+
+    raw_marker, web_marker = seed_markers()
+    if raw_marker is None or web_marker is None:
+        run_seed(args)
+    elif raw_marker != (args.users, args.days, args.seed):
+        users, days, seed = raw_marker
+        print(f"ℹ️ Using the existing seed of {users} users, {days} days (seed {seed}); "
+              f"run the seed command to change it")
+    with Database() as raw:
+        raw_ids = [row[0] for row in raw.fetch_all("SELECT id FROM users ORDER BY id")]
+    with app.app_context():
+        web_ids = [row[0] for row in db.session.query(User.id).order_by(User.id)]
+    return raw_ids, web_ids
+
+
+def run_seed(args):
+    started = time.perf_counter()
+    print(f"🌱 Seeding {args.users} users with {args.days} days of logs each (seed {args.seed})")
+    counts = seed_raw(args.users, args.days, args.seed)
+    print(f"   raw database ready ({time.perf_counter() - started:.1f}s, {sum(counts.values()):,} rows): "
+          f"{Config.SQLITE_DATABASE_PATH}")
+    counts = seed_web(args.users, args.days, args.seed)
+    print(f"   web database ready ({time.perf_counter() - started:.1f}s, {sum(counts.values()):,} rows): "
+          f"{Config.WEB_DATABASE_URI}")
+
+
+# Web load test
+
+def session_cookie(app, user_id):
+    """Signed Flask session cookie that signs a client in as ``user_id``"""
+    return app.session_interface.get_signing_serializer(app).dumps({'user_id': user_id, 'language': 'bn'})
+
+
+def run_web(args, user_ids):
+    from web_app import Food, app, db
+
+    with app.app_context():
+        food_ids = [row[0] for row in db.session.query(Food.id)]
+    mix = DEFAULT_MIX
+    routes = [(method, path) for method, path, _ in mix]
+    weights = [weight for _, _, weight in mix]
+    cookie_name = app.config.get('SESSION_COOKIE_NAME', 'session')
+
+    def client_loop(client_index, requests_per_client):
+        rng = random.Random(args.seed * 1000 + client_index)
+        cookie = session_cookie(app, rng.choice(user_ids))
+        if args.url:
+            import requests
+            http = requests.Session()
+            http.cookies.set(cookie_name, cookie)
+
+            def send(method, path, data):
+                return http.request(method, args.url.rstrip('/') + path, data=data, allow_redirects=False,
+                                    timeout=30).status_code
+        else:
+            client = app.test_client()
+            client.set_cookie(cookie_name, cookie)
+
+            def send(method, path, data):
+                return client.open(path, method=method, data=data).status_code
+
+        results = []
+        for _ in range(requests_per_client):
+            method, path = rng.choices(routes, weights)[0]
+            data = None
+            if path == '/add_food':
+                data = {'food_id': rng.choice(food_ids), 'amount': rng.choice((100, 150, 200)),
+                        'meal_type': rng.choice(list(Config.MEAL_TYPES))}
+            elif path == '/add_water':
+                data = {'glasses': rng.randint(1, 3)}
+            started = time.perf_counter()
+            try:
+                status = send(method, path, data)
+            except Exception:
+                status = 0
+            results.append((path, time.perf_counter() - started, status))
+        return results
+
+    per_client = max(1, args.requests // args.concurrency)
+    print(f"🌐 {per_client * args.concurrency} requests from {args.concurrency} clients "
+          f"({'HTTP ' + args.url if args.url else 'in-process WSGI'})")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        batches = list(pool.map(client_loop, range(args.concurrency), [per_client] * args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    samples = [result for batch in batches for result in batch]
+    report = {'elapsed_s': round(elapsed, 3), 'throughput_rps': round(len(samples) / elapsed, 1),
+              'overall': percentiles([duration for _, duration, _ in samples]), 'routes': {}}
+    report['overall']['errors'] = sum(1 for _, _, status in samples if not 200 <= status < 400)
+    for _, path, _ in mix:
+        route = percentiles([duration for p, duration, _ in samples if p == path])
+        route['errors'] = sum(1 for p, _, status in samples if p == path and not 200 <= status < 400)
+        report['routes'][path] = route
+
+    print(f"   {report['throughput_rps']} req/s over {report['elapsed_s']}s, "
+          f"{report['overall']['errors']} errors")
+    _print_table(report['routes'], 'route')
+    return report
+
+
+# DataManager micro-benchmarks
+
+def run_datamanager(args, user_ids):
+    from database import Database
+    from utils import DataManager
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    recent = [(today - timedelta(days=i)).isoformat() for i in range(min(args.days, 30))]
+
+    with Database() as db:
+        data = DataManager(db)
+        foods = data.get_foods()
+        exercises = data.get_exercises()
+        user = lambda: rng.choice(user_ids)
+        day = lambda: rng.choice(recent)
+        cases = {
+            'get_user': lambda: data.get_user(user()),
+            'get_foods': lambda: data.get_foods(),
+            'get_exercises': lambda: data.get_exercises(),
+            'get_daily_calories': lambda: data.get_daily_calories(user(), day()),
+            'get_daily_water': lambda: data.get_daily_water(user(), day()),
+            'get_daily_summary': lambda: data.get_daily_summary(user(), day()),
+            'get_meal_logs': lambda: data.get_meal_logs(user(), day()),
+            'get_exercise_logs': lambda: data.get_exercise_logs(user(), day()),
+            'get_pantry_items': lambda: data.get_pantry_items(user()),
+            'get_trends (30d, day)': lambda: data.get_trends(user(), 30, 'day'),
+            'get_trends (90d, week)': lambda: data.get_trends(user(), 90, 'week'),
+            'add_food_log': lambda: data.add_food_log(user(), rng.choice(foods)['name_english'], 150, 'lunch', day()),
+            'add_exercise_log': lambda: data.add_exercise_log(user(), rng.choice(exercises)['name_english'], 20,
+                                                              date=day()),
+            'add_water_log': lambda: data.add_water_log(user(), 1, day()),
+        }
+
+        print(f"🔬 DataManager methods ({args.iterations} calls each, {len(user_ids)} users)")
+        report = {}
+        for name, call in cases.items():
+            if args.methods and not any(method in name for method in args.methods):
+                continue
+            for _ in range(min(10, args.iterations)):
+                call()  # warm caches and the page cache
+            samples = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                call()
+                samples.append(time.perf_counter() - started)
+            report[name] = percentiles(samples)
+    _print_table(report, 'method')
+    return report
+
+
+# Reporting
+
+def _print_table(rows, label):
+    width = max([len(label)] + [len(name) for name in rows])
+    print(f"   {label:<{width}}  {'count':>7}  {'mean ms':>9}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}")
+    for name, row in rows.items():
+        if not row.get('count'):
+            continue
+        print(f"   {name:<{width}}  {row['count']:>7}  {row['mean_ms']:>9.3f}  {row['p50_ms']:>9.3f}  "
+              f"{row['p95_ms']:>9.3f}  {row['p99_ms']:>9.3f}")
+
+
+def compare(results, baseline, tolerance):
+    """Return regressions: p95 latencies more than ``tolerance`` (fraction) above the baseline"""
+    regressions = []
+    for section in ('web', 'datamanager'):
+        current_rows = results.get(section, {})
+        baseline_rows = baseline.get(section, {})
+        if section == 'web':
+            current_rows, baseline_rows = current_rows.get('routes', {}), baseline_rows.get('routes', {})
+        for name, row in current_rows.items():
+            before = baseline_rows.get(name, {}).get('p95_ms')
+            if before and row.get('p95_ms', 0) > before * (1 + tolerance):
+                regressions.append(f"{section} {name}: p95 {before:.3f} -> {row['p95_ms']:.3f} ms")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed synthetic data and benchmark the web routes and DataManager")
+    parser.add_argument('command', choices=('seed', 'web', 'datamanager', 'all'))
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="where the benchmark databases live (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed (default: %(default)s)")
+    parser.add_argument('--users', type=int, default=1000, help="users to seed (default: %(default)s)")
+    parser.add_argument('--days', type=int, default=90,
+                        help="days of history to seed per user (default: %(default)s)")
+    parser.add_argument('--requests', type=int, default=2000, help="web requests in total (default: %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent web clients (default: %(default)s)")
+    parser.add_argument('--url', help="benchmark a running server at this URL instead of the in-process app")
+    parser.add_argument('--iterations', type=int, default=500,
+                        help="calls per DataManager method (default: %(default)s)")
+    parser.add_argument('--methods', nargs='*', help="only benchmark DataManager methods containing these names")
+    parser.add_argument('--save', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare p95 latencies against a saved JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed p95 slowdown against the baseline (default: %(default)s = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        use_data_dir(args.data_dir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    # Timings are the subject here; the per-statement profiler and request hooks would add to them
+    Config.QUERY_PROFILING = False
+    Config.WEB_METRICS = False
+    from profiling import query_profiler
+    query_profiler.enabled = False
+
+    if args.command == 'seed':
+        run_seed(args)
+        return
+
+    raw_ids, web_ids = seeded_ids(args)
+    results = {'seed': args.seed, 'users': len(raw_ids), 'database_type': Config.DATABASE_TYPE}
+    if args.command in ('web', 'all'):
+        results['web'] = run_web(args, web_ids)
+    if args.command in ('datamanager', 'all'):
+        results['datamanager'] = run_datamanager(args, raw_ids)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+        print(f"💾 Results saved to {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"✅ No p95 regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup import-time benchmark.
+
+Imports each module in a fresh interpreter with ``python -X importtime`` and
+reports the median cumulative import time over several runs, the slowest
+nested imports, and whether a database driver was pulled in by a module that
+should load without one.
+
+    python3 benchmark_imports.py                 # default module set
+    python3 benchmark_imports.py utils --top 15  # one module, more detail
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['config', 'nutrition', 'utils', 'database', 'web_app']
+
+# Modules that must import without loading a database driver
+DRIVER_FREE = {'config', 'nutrition', 'utils', 'database', 'catalogue', 'summaries', 'analytics', 'profiling', 'food_search', 'datagen'}
+DRIVER_MODULES = ('mysql.connector', 'pymysql', 'sqlite3')
+
+
+def import_times(module):
+    """Import ``module`` in a fresh interpreter; return {imported module: (self_us, cumulative_us)}
+
+    Only ``module`` and what it imported are returned, not the interpreter's own
+    start-up imports (site, .pth hooks).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    # Nested imports are printed (indented) before the module that imported them
+    subtree = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        nested = name.startswith('   ')
+        name = name.strip()
+        subtree.append((name, int(self_us), int(cumulative_us)))
+        if not nested:
+            if name == module:
+                break
+            subtree = []
+    return {name: (self_us, cumulative_us) for name, self_us, cumulative_us in subtree}
+
+
+def benchmark(module, repeat=5, top=5):
+    """Median cumulative import time of ``module`` plus its slowest dependencies"""
+    runs = [import_times(module) for _ in range(repeat)]
+    total_ms = statistics.median(run[module][1] for run in runs) / 1000
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)
+    slowest = [(name, cumulative / 1000) for name, (_, cumulative) in slowest if name != module][:top]
+    drivers = [name for name in DRIVER_MODULES if name in runs[-1]]
+    return {'module': module, 'total_ms': total_ms, 'slowest': slowest, 'drivers': drivers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure module import times with -X importtime")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per module (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=5, help="slowest nested imports to list (default: %(default)s)")
+    args = parser.parse_args()
+
+    ok = True
+    print(f"⏱️ Import times (median of {args.repeat} runs)")
+    for module in args.modules:
+        try:
+            report = benchmark(module, args.repeat, args.top)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            ok = False
+            continue
+
+        print(f"\n{module}: {report['total_ms']:.1f} ms")
+        for name, cumulative_ms in report['slowest']:
+            print(f"   {cumulative_ms:8.1f} ms  {name}")
+        if module in DRIVER_FREE and report['drivers']:
+            print(f"❌ {module} imports database drivers: {', '.join(report['drivers'])}")
+            ok = False
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+In-process cache of the food and exercise catalogue.
+
+The catalogue tables are tiny and almost never change, yet every log write
+used to look a food or exercise up with ``name_bangla = %s OR name_english = %s``.
+The cache loads both tables once per database and answers those lookups from
+dicts indexed by id, Bangla name and English name. Catalogue writes go through
+``DataManager`` and call ``invalidate``. A lookup miss runs one targeted query,
+so items added by another process are still found; names that are not in the
+table either are remembered as misses for ``Config.CATALOGUE_MISS_TTL``
+seconds, after which the next lookup asks the database again.
+"""
+
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+from config import Config
+
+FOOD_COLUMNS = ('id', 'name_bangla', 'name_english', 'calories_per_100g', 'protein', 'carbs', 'fat',
+                'category', 'serving_size', 'serving_weight')
+EXERCISE_COLUMNS = ('id', 'name_bangla', 'name_english', 'level', 'category', 'description',
+                    'muscle_groups', 'equipment', 'instructions')
+# Cache attribute -> (table, columns)
+TABLES = {'_foods': ('foods', FOOD_COLUMNS), '_exercises': ('exercises', EXERCISE_COLUMNS)}
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a catalogue name for lookups
+
+    Matches MySQL's case-insensitive utf8mb4 collation for English names and
+    treats composed and decomposed Bangla vowel signs as equal.
+    """
+    return unicodedata.normalize('NFC', name).strip().casefold()
+
+
+class _Table:
+    """One catalogue table indexed by id and by both names"""
+
+    def __init__(self, rows, columns):
+        self.by_id = {}
+        self.by_name = {}
+        # (index, key) -> time.monotonic() when it was last found missing
+        self.misses = {}
+        for row in rows:
+            item = dict(zip(columns, row))
+            self.by_id[item['id']] = item
+            # Bangla names win over an English name that happens to collide
+            self.by_name.setdefault(normalize_name(item['name_english']), item)
+        for item in self.by_id.values():
+            self.by_name[normalize_name(item['name_bangla'])] = item
+
+    def add(self, item):
+        """Index an item found after the table was loaded"""
+        self.by_id[item['id']] = item
+        self.by_name.setdefault(normalize_name(item['name_english']), item)
+        self.by_name[normalize_name(item['name_bangla'])] = item
+
+
+class CatalogueCache:
+    """Foods and exercises for one database, loaded on first use"""
+
+    # One cache per database, shared by every DataManager in the process
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, miss_ttl: float = None):
+        self._lock = threading.Lock()
+        self._foods = None
+        self._exercises = None
+        self.version = 0
+        self.miss_ttl = Config.CATALOGUE_MISS_TTL if miss_ttl is None else miss_ttl
+
+    @classmethod
+    def for_database(cls, db) -> 'CatalogueCache':
+        """Return the shared cache for the database ``db`` is connected to"""
+        key = db.db_manager.database_key()
+        with cls._caches_lock:
+            if key not in cls._caches:
+                cls._caches[key] = cls()
+            return cls._caches[key]
+
+    def load(self, db):
+        """(Re)load both catalogue tables"""
+        foods = db.fetch_all(f"SELECT {', '.join(FOOD_COLUMNS)} FROM foods")
+        exercises = db.fetch_all(f"SELECT {', '.join(EXERCISE_COLUMNS)} FROM exercises")
+        with self._lock:
+            self._foods = _Table(foods, FOOD_COLUMNS)
+            self._exercises = _Table(exercises, EXERCISE_COLUMNS)
+
+    def invalidate(self):
+        """Drop the cached catalogue; the next lookup reloads it"""
+        with self._lock:
+            self._foods = None
+            self._exercises = None
+            self.version += 1
+
+    def _table(self, db, name) -> _Table:
+        table = getattr(self, name)
+        if table is None:
+            self.load(db)
+            table = getattr(self, name)
+        return table
+
+    def _find(self, db, name, index, key, where, params):
+        just_loaded = getattr(self, name) is None
+        table = self._table(db, name)
+        item = getattr(table, index).get(key)
+        if item is not None:
+            return item
+        missed_at = table.misses.get((index, key))
+        if missed_at is not None and time.monotonic() - missed_at < self.miss_ttl:
+            return None
+        if not just_loaded:
+            # Another process may have added it since we loaded: one targeted query, not a reload
+            sql_table, columns = TABLES[name]
+            row = db.fetch_one(f"SELECT {', '.join(columns)} FROM {sql_table} WHERE {where}", params)
+            if row is not None:
+                item = dict(zip(columns, row))
+                with self._lock:
+                    table.add(item)
+                    table.misses.pop((index, key), None)
+                return item
+        with self._lock:
+            table.misses[(index, key)] = time.monotonic()
+        return None
+
+    def find_food(self, db, name: str) -> Optional[Dict[str, Any]]:
+        """Return the food with this Bangla or English name, or None"""
+        return self._find(db, '_foods', 'by_name', normalize_name(name),
+                          "name_bangla = %s OR LOWER(name_english) = LOWER(%s)", (name.strip(), name.strip()))
+
+    def find_exercise(self, db, name: str) -> Optional[Dict[str, Any]]:
+        """Return the exercise with this Bangla or English name, or None"""
+        return self._find(db, '_exercises', 'by_name', normalize_name(name),
+                          "name_bangla = %s OR LOWER(name_english) = LOWER(%s)", (name.strip(), name.strip()))
+
+    def get_food(self, db, food_id: int) -> Optional[Dict[str, Any]]:
+        """Return the food with this id, or None"""
+        return self._find(db, '_foods', 'by_id', food_id, "id = %s", (food_id,))
+
+    def get_exercise(self, db, exercise_id: int) -> Optional[Dict[str, Any]]:
+        """Return the exercise with this id, or None"""
+        return self._find(db, '_exercises', 'by_id', exercise_id, "id = %s", (exercise_id,))
+
+    def foods(self, db):
+        """Return every food"""
+        return list(self._table(db, '_foods').by_id.values())
+
+    def exercises(self, db):
+        """Return every exercise"""
+        return list(self._table(db, '_exercises').by_id.values())
@@ -18,6 +18,71 @@ class AppConfig:
     DATABASE_PASSWORD = os.getenv('DB_PASSWORD', '')
     DATABASE_CHARSET = 'utf8mb4'
     
+    # Connection pool (shared by every Database instance in a process)
+    DATABASE_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+    DATABASE_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+    DATABASE_POOL_IDLE_TIMEOUT = int(os.getenv('DB_POOL_IDLE_TIMEOUT', 300))  # seconds
+    DATABASE_POOL_CHECKOUT_TIMEOUT = int(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 30))  # seconds
+    
+    # Raw SQL query profiling (profiling.py; per process)
+    QUERY_PROFILING = os.getenv('QUERY_PROFILING', '1') not in ('0', 'false', 'no')
+    QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv('QUERY_STATS_MAX_FINGERPRINTS', 500))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 100))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', '1') not in ('0', 'false', 'no')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # serve /metrics from the mobile app (0 = off)
+    
+    # Web app database (SQLAlchemy URL; relative SQLite paths live in instance/)
+    WEB_DATABASE_URI = os.getenv('WEB_DATABASE_URI', 'sqlite:///fitness_demo.db')
+    
+    # Web request metrics (request_metrics.py, /metrics) and sampled request traces
+    WEB_METRICS = os.getenv('WEB_METRICS', '1') not in ('0', 'false', 'no')
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0))  # fraction of requests traced, 0-1
+    TRACE_SLOW_MS = float(os.getenv('TRACE_SLOW_MS', 1000))  # always trace requests slower than this
+    TRACE_PATH = os.getenv('TRACE_PATH', os.path.join(os.getcwd(), 'request_traces.jsonl'))
+    
+    # Web app user cache (per process)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))  # seconds
+    
+    # Trend analytics (per-user range results, per process)
+    ANALYTICS_CACHE_SIZE = int(os.getenv('ANALYTICS_CACHE_SIZE', 2048))
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', 300))  # seconds
+    ANALYTICS_MAX_DAYS = int(os.getenv('ANALYTICS_MAX_DAYS', 366))  # longest range one request may ask for
+
+    # Rendered template fragments ({% cache %} in templates, per process)
+    FRAGMENT_CACHE = os.getenv('FRAGMENT_CACHE', '1') not in ('0', 'false', 'no')
+    FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE', 256))
+    FRAGMENT_CACHE_TTL = int(os.getenv('FRAGMENT_CACHE_TTL', 300))  # seconds; bounds staleness across workers
+    
+    # Raw-SQL catalogue cache (catalogue.py): how long an unknown name or id is answered
+    # from memory before the database is asked again, since another process may add it
+    CATALOGUE_MISS_TTL = float(os.getenv('CATALOGUE_MISS_TTL', 30))  # seconds
+    
+    # Production web server (serve.py)
+    SERVE_HOST = os.getenv('SERVE_HOST', '127.0.0.1')
+    SERVE_PORT = int(os.getenv('SERVE_PORT', 8080))
+    SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', os.cpu_count() or 1))
+    SERVE_THREADS = int(os.getenv('SERVE_THREADS', 2))
+    SERVE_TIMEOUT = int(os.getenv('SERVE_TIMEOUT', 30))  # seconds
+    SERVE_GRACEFUL_TIMEOUT = int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30))  # seconds
+    SERVE_MAX_REQUESTS = int(os.getenv('SERVE_MAX_REQUESTS', 0))  # recycle workers after N requests (0 = never)
+    
+    # Batched log ingestion (POST /api/logs)
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 10000))
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 500))
+    INGEST_FLUSH_INTERVAL = float(os.getenv('INGEST_FLUSH_INTERVAL', 0.05))  # seconds
+    INGEST_ENQUEUE_TIMEOUT = float(os.getenv('INGEST_ENQUEUE_TIMEOUT', 1.0))  # seconds
+    INGEST_MAX_EVENTS = int(os.getenv('INGEST_MAX_EVENTS', 1000))  # per request
+    INGEST_ACK_TIMEOUT = float(os.getenv('INGEST_ACK_TIMEOUT', 10))  # seconds to wait for a durable ack
+    
+    # Offline sync of the mobile app with the web server (disabled when no URL is set)
+    SYNC_SERVER_URL = os.getenv('SYNC_SERVER_URL', '')
+    SYNC_JOURNAL_PATH = os.getenv('SYNC_JOURNAL_PATH', os.path.join(os.getcwd(), 'sync_journal.db'))
+    SYNC_INTERVAL = float(os.getenv('SYNC_INTERVAL', 60))  # seconds
+    SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', 100))
+    SYNC_MAX_ATTEMPTS = int(os.getenv('SYNC_MAX_ATTEMPTS', 5))
+    
     # SQLite fallback (for development)
     SQLITE_DATABASE_NAME = "bangladeshi_fitness.db"
     SQLITE_DATABASE_PATH = os.path.join(os.getcwd(), SQLITE_DATABASE_NAME)
@@ -27,6 +92,17 @@ class AppConfig:
     THEME_STYLE = "Light"
     WINDOW_SIZE = (400, 700)  # For development
     
+    # Mobile app tabs are built on first visit; after a tab is shown the likely next one
+    # is built once the UI has been idle for PREWARM_DELAY seconds
+    PREWARM_TABS = True
+    PREWARM_DELAY = 1.0
+    PREWARM_NEXT_TAB = {
+        "dashboard": "food",
+        "food": "exercise",
+        "exercise": "pantry",
+        "pantry": "profile",
+    }
+    
     # Language Settings
     DEFAULT_LANGUAGE = "bangla"
     SUPPORTED_LANGUAGES = ["bangla", "english"]
@@ -35,6 +111,9 @@ class AppConfig:
     DEFAULT_CALORIE_GOAL = 2000
     DEFAULT_WATER_GOAL = 8  # glasses per day
     
+    # The mobile app's local database holds a single user
+    LOCAL_USER_ID = 1
+    
     # Activity Levels for TDEE calculation
     ACTIVITY_LEVELS = {
         "sedentary": {
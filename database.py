@@ -1,51 +1,352 @@
-import mysql.connector
-import pymysql
-import sqlite3
+import importlib
 import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
 from config import Config
+from migrations import MigrationRunner
+from profiling import query_profiler
 from typing import Optional, Dict, List, Any
 
+# DB-API driver module per backend. Drivers are imported on first connection rather
+# than with this module, so tools that never connect (or only use SQLite) skip the
+# cost of importing mysql.connector.
+DRIVERS = {
+    "mysql": "mysql.connector",
+    "sqlite": "sqlite3",
+}
+
+def load_driver(database_type: str):
+    """Import (once) and return the driver module for a backend"""
+    return importlib.import_module(DRIVERS[database_type])
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections"""
+    
+    def __init__(self, factory, ping, min_size: int = None, max_size: int = None,
+                 idle_timeout: int = None, checkout_timeout: int = None):
+        self.factory = factory
+        self.ping = ping
+        self.min_size = Config.DATABASE_POOL_MIN_SIZE if min_size is None else min_size
+        self.max_size = Config.DATABASE_POOL_MAX_SIZE if max_size is None else max_size
+        self.idle_timeout = Config.DATABASE_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.checkout_timeout = Config.DATABASE_POOL_CHECKOUT_TIMEOUT if checkout_timeout is None else checkout_timeout
+        self._idle = []  # (connection, returned_at), most recently used last
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def acquire(self):
+        """Borrow a healthy connection, creating one if the pool has room"""
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._evict_idle()
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.checkout_timeout}s "
+                        f"(pool max size {self.max_size})"
+                    )
+                self._condition.wait(remaining)
+        
+        # Connect and health-check outside the lock so slow handshakes don't block other threads
+        try:
+            if connection is None or not self._is_healthy(connection):
+                if connection is not None:
+                    self._close_quietly(connection)
+                connection = self.factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        return connection
+    
+    def release(self, connection):
+        """Return a borrowed connection to the pool"""
+        try:
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                self._close_quietly(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+    
+    def close_all(self):
+        """Close idle connections and stop handing out new ones"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(connection)
+            self._condition.notify_all()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return current pool occupancy"""
+        with self._condition:
+            return {'size': self._size, 'idle': len(self._idle), 'in_use': self._size - len(self._idle)}
+    
+    def _evict_idle(self):
+        """Close connections idle longer than idle_timeout, keeping min_size warm"""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            connection, _ = self._idle.pop(0)
+            self._size -= 1
+            self._close_quietly(connection)
+    
+    def _is_healthy(self, connection) -> bool:
+        try:
+            self.ping(connection)
+            return True
+        except Exception:
+            return False
+    
+    def _discard(self, connection):
+        self._close_quietly(connection)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+    
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+class Dialect:
+    """SQL dialect used to adapt the app's MySQL-flavoured queries to a backend"""
+    
+    name = None
+    EXPLAIN_PREFIX = None
+    INDEX_LIST_QUERY = None
+    # Expressions mapping a DATE column to the first day of its week (Monday) or month
+    DATE_BUCKETS = {'day': '{column}'}
+    
+    def translate(self, query: str) -> str:
+        """Return the backend-specific form of a query (cached per dialect and query)"""
+        return _translate(self.name, query)
+    
+    def rewrite(self, query: str) -> str:
+        """Rewrite a query for this dialect (uncached)"""
+        return query
+    
+    def full_scan_tables(self, plan: List[Dict[str, Any]]) -> List[str]:
+        """Return the tables an EXPLAIN plan reads with a full scan"""
+        return []
+    
+    def date_bucket(self, column: str, bucket: str) -> str:
+        """SQL expression for the start of the day/week/month bucket holding ``column``"""
+        return self.DATE_BUCKETS[bucket].format(column=column)
+
+class MySQLDialect(Dialect):
+    """MySQL - queries are written in this dialect already"""
+    
+    name = "mysql"
+    EXPLAIN_PREFIX = "EXPLAIN "
+    INDEX_LIST_QUERY = '''
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+    '''
+    DATE_BUCKETS = {
+        'day': '{column}',
+        'week': 'DATE_SUB({column}, INTERVAL WEEKDAY({column}) DAY)',
+        'month': 'DATE_SUB({column}, INTERVAL DAYOFMONTH({column}) - 1 DAY)',
+    }
+    
+    def full_scan_tables(self, plan):
+        return [row['table'] for row in plan if row.get('type') == 'ALL']
+
+class SQLiteDialect(Dialect):
+    """SQLite - placeholders, upserts and DDL differ from MySQL"""
+    
+    name = "sqlite"
+    EXPLAIN_PREFIX = "EXPLAIN QUERY PLAN "
+    INDEX_LIST_QUERY = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s"
+    DATE_BUCKETS = {
+        'day': '{column}',
+        # 'weekday 0' moves forward to Sunday (or stays on it); six days back is that week's Monday
+        'week': "date({column}, 'weekday 0', '-6 days')",
+        'month': "date({column}, 'start of month')",
+    }
+    
+    # (pattern, replacement) pairs applied in order
+    REWRITES = [
+        (re.compile(r"%s"), "?"),
+        (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+        (re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+        (re.compile(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b", re.IGNORECASE), ""),
+        (re.compile(r"^\s*SHOW\s+TABLES\s*$", re.IGNORECASE), "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"),
+    ]
+    UPSERT = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+    UPSERT_VALUES = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+    
+    def rewrite(self, query: str) -> str:
+        for pattern, replacement in self.REWRITES:
+            query = pattern.sub(replacement, query)
+        
+        # ON DUPLICATE KEY UPDATE col = VALUES(col) -> ON CONFLICT DO UPDATE SET col = excluded.col
+        match = self.UPSERT.search(query)
+        if match:
+            assignments = self.UPSERT_VALUES.sub(r"excluded.\1", query[match.end():])
+            query = query[:match.start()] + "ON CONFLICT DO UPDATE SET" + assignments
+        return query
+    
+    def full_scan_tables(self, plan):
+        # Plan details look like "SCAN fl" or "SEARCH fl USING INDEX ..."
+        return [row['detail'].split()[1] for row in plan if row['detail'].startswith('SCAN ')]
+
+DIALECTS: Dict[str, Dialect] = {
+    "mysql": MySQLDialect(),
+    "sqlite": SQLiteDialect(),
+}
+
+@lru_cache(maxsize=1024)
+def _translate(dialect_name: str, query: str) -> str:
+    return DIALECTS[dialect_name].rewrite(query)
+
+# Backend names (e.g. SQLAlchemy's) that speak another backend's dialect
+DIALECT_ALIASES = {"mariadb": "mysql"}
+
+def get_dialect(database_type: str) -> Dialect:
+    """Return the dialect for a backend name; raises ValueError for unsupported backends"""
+    try:
+        return DIALECTS[DIALECT_ALIASES.get(database_type, database_type)]
+    except KeyError:
+        raise ValueError(f"unsupported database backend: {database_type!r} "
+                         f"(expected one of {', '.join(list(DIALECTS) + list(DIALECT_ALIASES))})") from None
+
 class DatabaseManager:
     """Database manager for MySQL and SQLite connections"""
     
+    # One pool per backend, shared by every DatabaseManager in the process
+    _pools: Dict[str, ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+    
     def __init__(self, database_type: str = None):
         self.database_type = database_type or Config.DATABASE_TYPE
         self.connection = None
+        self._pool = None
         
     def get_connection(self):
-        """Get database connection based on type"""
+        """Borrow a pooled database connection based on type"""
         if self.database_type == "mysql":
-            return self._get_mysql_connection()
-        else:
-            return self._get_sqlite_connection()
-    
-    def _get_mysql_connection(self):
-        """Get MySQL connection"""
-        try:
-            connection = mysql.connector.connect(
-                host=Config.DATABASE_HOST,
-                port=Config.DATABASE_PORT,
-                user=Config.DATABASE_USER,
-                password=Config.DATABASE_PASSWORD,
-                database=Config.DATABASE_NAME,
-                charset=Config.DATABASE_CHARSET,
-                autocommit=True
-            )
-            return connection
-        except mysql.connector.Error as err:
-            print(f"MySQL Connection Error: {err}")
+            try:
+                driver = load_driver("mysql")
+            except ImportError as err:
+                driver = None
+                print(f"MySQL driver not installed: {err}")
+            if driver is not None:
+                try:
+                    return self._borrow(self._get_pool("mysql"))
+                except driver.Error as err:
+                    print(f"MySQL Connection Error: {err}")
             # Fallback to SQLite if MySQL is not available
             print("Falling back to SQLite...")
-            return self._get_sqlite_connection()
+            self.database_type = "sqlite"
+        return self._borrow(self._get_pool("sqlite"))
     
-    def _get_sqlite_connection(self):
+    def database_key(self) -> tuple:
+        """Identify the database this manager points at (for per-database caches)"""
+        if self.database_type == "mysql":
+            return (self.database_type, Config.DATABASE_HOST, Config.DATABASE_PORT, Config.DATABASE_NAME)
+        return (self.database_type, Config.SQLITE_DATABASE_PATH)
+    
+    def _borrow(self, pool: ConnectionPool):
+        self.connection = pool.acquire()
+        self._pool = pool
+        return self.connection
+    
+    @classmethod
+    def _get_pool(cls, database_type: str) -> ConnectionPool:
+        with cls._pools_lock:
+            pool = cls._pools.get(database_type)
+            if pool is None:
+                if database_type == "mysql":
+                    pool = ConnectionPool(cls._get_mysql_connection, cls._ping_mysql)
+                else:
+                    pool = ConnectionPool(cls._get_sqlite_connection, cls._ping_sqlite)
+                cls._pools[database_type] = pool
+            return pool
+    
+    @staticmethod
+    def _get_mysql_connection():
+        """Get MySQL connection"""
+        return load_driver("mysql").connect(
+            host=Config.DATABASE_HOST,
+            port=Config.DATABASE_PORT,
+            user=Config.DATABASE_USER,
+            password=Config.DATABASE_PASSWORD,
+            database=Config.DATABASE_NAME,
+            charset=Config.DATABASE_CHARSET,
+            autocommit=True
+        )
+    
+    @staticmethod
+    def _get_sqlite_connection():
         """Get SQLite connection"""
-        return sqlite3.connect(Config.SQLITE_DATABASE_PATH)
+        # Pooled connections may be handed to a different thread than the one that opened them
+        connection = load_driver("sqlite").connect(Config.SQLITE_DATABASE_PATH, check_same_thread=False)
+        # Match MySQL's ON DELETE CASCADE behaviour
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+    
+    @staticmethod
+    def _ping_mysql(connection):
+        connection.ping(reconnect=True, attempts=1)
+    
+    @staticmethod
+    def _ping_sqlite(connection):
+        connection.execute("SELECT 1")
     
     def close_connection(self):
-        """Close database connection"""
+        """Return the borrowed connection to its pool"""
         if self.connection:
-            self.connection.close()
+            self._pool.release(self.connection)
+            self.connection = None
+            self._pool = None
+    
+    @classmethod
+    def close_all_pools(cls):
+        """Close every pooled connection (e.g. at shutdown)"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close_all()
+    
+    @classmethod
+    def discard_pools(cls):
+        """Forget every pool without closing its connections
+        
+        For a freshly forked worker: the inherited sockets belong to the parent,
+        so closing them here would break its connections. The worker opens its own.
+        """
+        # The lock may have been held by another parent thread at fork time, so replace it too
+        cls._pools = {}
+        cls._pools_lock = threading.Lock()
 
 class Database:
     """Main database class for the fitness app"""
@@ -53,14 +354,16 @@ class Database:
     def __init__(self, database_type: str = None):
         self.db_manager = DatabaseManager(database_type)
         self.connection = self.db_manager.get_connection()
-        self.create_tables()
+        # Resolved after connecting, since MySQL may have fallen back to SQLite
+        self.dialect = get_dialect(self.db_manager.database_type)
+        # Nesting depth of transaction(); commits inside one are deferred to its end
+        self._transaction_depth = 0
+        MigrationRunner(self).run()
     
     def create_tables(self):
-        """Create database tables"""
-        cursor = self.connection.cursor()
-        
+        """Create database tables (applied once by migration 1)"""
         # Users table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS users (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 name VARCHAR(255),
@@ -75,7 +378,7 @@ class Database:
         ''')
         
         # Foods table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS foods (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 name_bangla VARCHAR(255) NOT NULL,
@@ -92,7 +395,7 @@ class Database:
         ''')
         
         # Exercises table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS exercises (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 name_bangla VARCHAR(255) NOT NULL,
@@ -108,7 +411,7 @@ class Database:
         ''')
         
         # Food logs table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS food_logs (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 user_id INT,
@@ -123,7 +426,7 @@ class Database:
         ''')
         
         # Exercise logs table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS exercise_logs (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 user_id INT,
@@ -139,7 +442,7 @@ class Database:
         ''')
         
         # Pantry table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS pantry (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 user_id INT,
@@ -153,7 +456,7 @@ class Database:
         ''')
         
         # Water logs table
-        cursor.execute('''
+        self.execute_query('''
             CREATE TABLE IF NOT EXISTS water_logs (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 user_id INT,
@@ -164,13 +467,10 @@ class Database:
             )
         ''')
         
-        self.connection.commit()
-        self.insert_sample_data()
+        self.commit()
     
     def insert_sample_data(self):
-        """Insert sample data into the database"""
-        cursor = self.connection.cursor()
-        
+        """Insert sample data into the database (applied once by migration 2)"""
         # Sample Bangladeshi foods
         foods = [
             ("ভাত", "Rice", 130, 2.7, 28, 0.3, "Grains", "1 cup (cooked)", 195),
@@ -190,12 +490,11 @@ class Database:
             ("বেগুন", "Eggplant", 25, 1, 6, 0.2, "Vegetables", "1 cup", 82)
         ]
         
-        for food in foods:
-            cursor.execute('''
-                INSERT IGNORE INTO foods 
-                (name_bangla, name_english, calories_per_100g, protein, carbs, fat, category, serving_size, serving_weight)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ''', food)
+        self.insert_many('''
+            INSERT IGNORE INTO foods 
+            (name_bangla, name_english, calories_per_100g, protein, carbs, fat, category, serving_size, serving_weight)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ''', foods)
         
         # Sample exercises
         exercises = [
@@ -211,58 +510,160 @@ class Database:
             ("ওয়াল সিট", "Wall Sit", "Beginner", "Strength", "পায়ের ব্যায়াম - দেওয়ালে ভর দিয়ে বসা", "Quadriceps, Glutes", "Wall", "দেওয়ালে পিঠ লাগিয়ে স্কোয়াট অবস্থায় বসুন")
         ]
         
-        for exercise in exercises:
-            cursor.execute('''
-                INSERT IGNORE INTO exercises 
-                (name_bangla, name_english, level, category, description, muscle_groups, equipment, instructions)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ''', exercise)
-        
-        self.connection.commit()
+        self.insert_many('''
+            INSERT IGNORE INTO exercises 
+            (name_bangla, name_english, level, category, description, muscle_groups, equipment, instructions)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', exercises)
     
     def execute_query(self, query: str, params: tuple = None):
-        """Execute a database query"""
+        """Execute a database query, translated to the connection's dialect"""
+        return self._run(query, params)
+    
+    def fetch_one(self, query: str, params: tuple = None):
+        """Fetch one row from database"""
+        return self._run(query, params, lambda cursor: cursor.fetchone())
+    
+    def fetch_all(self, query: str, params: tuple = None):
+        """Fetch all rows from database"""
+        return self._run(query, params, lambda cursor: cursor.fetchall())
+    
+    def _run(self, query: str, params: tuple = None, fetch=None):
+        """Execute (and optionally fetch) a query, recording it with the query profiler"""
+        translated = self.dialect.translate(query)
         cursor = self.connection.cursor()
+        started = time.perf_counter()
         try:
             if params:
-                cursor.execute(query, params)
+                cursor.execute(translated, params)
             else:
-                cursor.execute(query)
-            return cursor
+                cursor.execute(translated)
+            result = fetch(cursor) if fetch else cursor
         except Exception as e:
+            if query_profiler.enabled:
+                query_profiler.record(query, time.perf_counter() - started, error=True)
             print(f"Database query error: {e}")
-            self.connection.rollback()
+            self.rollback()
             raise e
+        
+        if query_profiler.enabled:
+            if fetch is None:
+                rows = cursor.rowcount
+            elif isinstance(result, list):
+                rows = len(result)
+            else:
+                rows = 0 if result is None else 1
+            # Un-fetched SELECT cursors are left alone; EXPLAIN would need the connection
+            query_profiler.record(query, time.perf_counter() - started, rows, params=params,
+                                  explain=(lambda: self._explain(translated, params)) if fetch else None)
+        return result
     
-    def fetch_one(self, query: str, params: tuple = None):
-        """Fetch one row from database"""
-        cursor = self.execute_query(query, params)
-        return cursor.fetchone()
+    def _explain(self, translated: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """EXPLAIN an already translated query without recording it"""
+        cursor = self.connection.cursor()
+        cursor.execute(self.dialect.EXPLAIN_PREFIX + translated.strip(), params or ())
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
-    def fetch_all(self, query: str, params: tuple = None):
-        """Fetch all rows from database"""
-        cursor = self.execute_query(query, params)
-        return cursor.fetchall()
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """Commit the enclosed statements together, or roll them all back on error
+        
+        MySQL connections are opened with autocommit on, so the transaction is
+        started explicitly; SQLite's driver opens one on the first write, or up
+        front with ``immediate`` (BEGIN IMMEDIATE), which takes the database's
+        write lock so other processes' writers wait until this one commits.
+        A nested transaction() joins the outer one, and commit() inside it
+        (including insert/update/delete's) is deferred to the outer block's end.
+        """
+        outermost = not self._transaction_depth
+        if outermost and not self.connection.in_transaction:
+            if self.db_manager.database_type == "mysql":
+                self.connection.start_transaction()
+            elif immediate:
+                self.connection.execute("BEGIN IMMEDIATE")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except Exception:
+            if outermost:
+                self.connection.rollback()
+            raise
+        finally:
+            self._transaction_depth -= 1
+        if outermost:
+            self.connection.commit()
+    
+    def commit(self):
+        """Commit pending writes, unless inside transaction(), which commits at its end"""
+        if not self._transaction_depth:
+            self.connection.commit()
+    
+    def rollback(self):
+        """Roll back pending writes, unless inside transaction(), which rolls back as the error leaves it"""
+        if not self._transaction_depth:
+            self.connection.rollback()
     
     def insert(self, query: str, params: tuple = None):
         """Insert data into database"""
         cursor = self.execute_query(query, params)
-        self.connection.commit()
+        self.commit()
         return cursor.lastrowid
     
+    def insert_many(self, query: str, rows, chunk_size: int = 1000, commit: bool = True) -> int:
+        """Insert many rows with executemany, committing once per chunk
+        
+        ``rows`` may be any iterable (including a generator), so large imports
+        are streamed without being held in memory. mysql-connector rewrites
+        INSERT ... VALUES executemany calls into multi-row VALUES statements.
+        With ``commit=False`` nothing is committed or rolled back here, for use
+        inside ``transaction()``. Returns the number of rows inserted.
+        """
+        translated = self.dialect.translate(query)
+        cursor = self.connection.cursor()
+        rows = iter(rows)
+        total = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            started = time.perf_counter()
+            try:
+                cursor.executemany(translated, chunk)
+                if commit:
+                    self.commit()
+            except Exception as e:
+                if query_profiler.enabled:
+                    query_profiler.record(query, time.perf_counter() - started, error=True)
+                print(f"Database bulk insert error: {e}")
+                if commit:
+                    self.rollback()
+                raise e
+            if query_profiler.enabled:
+                query_profiler.record(query, time.perf_counter() - started, len(chunk))
+            total += len(chunk)
+        return total
+    
     def update(self, query: str, params: tuple = None):
         """Update data in database"""
         cursor = self.execute_query(query, params)
-        self.connection.commit()
+        self.commit()
         return cursor.rowcount
     
     def delete(self, query: str, params: tuple = None):
         """Delete data from database"""
         cursor = self.execute_query(query, params)
-        self.connection.commit()
+        self.commit()
         return cursor.rowcount
     
     def close(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.connection:
-            self.connection.close() 
\ No newline at end of file
+            self.db_manager.close_connection()
+            self.connection = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for large-scale fitness datasets.
+
+Streams users and their food, exercise and water logs (plus the matching
+daily_summaries rows) over any date range, one user-day at a time, so memory
+use stays flat no matter how many rows are produced. Output is deterministic:
+every user gets its own RNG derived from ``seed`` and the user's position, so
+the same arguments always yield the same rows, and user ranges can be
+generated in separate processes (``first_user_id``) and still line up.
+
+Meals follow everyday Bangladeshi patterns per ``Config.MEAL_TYPES``: roti,
+egg and bhaji in the morning, rice with dal and fish or meat for lunch and
+dinner (a bigger lunch on Fridays), fruit or milk as a snack. Users differ in
+how reliably they log, how much they eat and how active they are.
+
+    python3 datagen.py --users 1000 --days 90 --to csv --output /tmp/fitness_csv
+    python3 datagen.py --users 10000 --days 180 --to database --sqlite-path /tmp/big.db
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from catalogue import normalize_name
+from config import Config
+from nutrition import FitnessUtils
+
+# Column order of the rows yielded per table (matches the database tables)
+TABLE_COLUMNS = {
+    'users': ('id', 'name', 'age', 'weight', 'height', 'goal', 'target_calories'),
+    'food_logs': ('user_id', 'food_id', 'amount', 'date', 'meal_type'),
+    'exercise_logs': ('user_id', 'exercise_id', 'duration', 'sets', 'reps', 'date'),
+    'water_logs': ('user_id', 'glasses', 'date'),
+    'daily_summaries': ('user_id', 'date', 'calories', 'protein', 'carbs', 'fat', 'water_glasses', 'exercise_minutes'),
+}
+
+FIRST_NAMES = ('আহমেদ', 'রহিম', 'করিম', 'তানভীর', 'সাকিব', 'রাফি', 'ফাতেমা', 'আয়েশা', 'নুসরাত', 'মিম', 'রিয়া', 'সুমাইয়া')
+LAST_NAMES = ('হোসেন', 'রহমান', 'ইসলাম', 'আক্তার', 'খান', 'চৌধুরী', 'উদ্দিন', 'সরকার')
+
+# (activity level, share of users, chance of exercising on a given day)
+ACTIVITY_PROFILES = (
+    ('sedentary', 0.35, 0.05),
+    ('light', 0.30, 0.20),
+    ('moderate', 0.20, 0.40),
+    ('active', 0.10, 0.60),
+    ('very_active', 0.05, 0.80),
+)
+# Exercise levels each activity level picks from
+ACTIVITY_EXERCISE_LEVELS = {
+    'sedentary': ('Beginner',),
+    'light': ('Beginner',),
+    'moderate': ('Beginner', 'Intermediate'),
+    'active': ('Intermediate', 'Advanced'),
+    'very_active': ('Intermediate', 'Advanced'),
+}
+
+# Per meal type: chance the meal is eaten, then its dishes as
+# (chance, category, preferred foods, servings range). Foods are matched by
+# Bangla or English name within the category of the loaded catalogue (the
+# device and server name some foods differently in English, e.g. Dal and
+# Lentils); a dish with no match picks from its whole category.
+MEAL_PATTERNS = {
+    'breakfast': (0.85, [
+        (0.75, 'Grains', ('রুটি',), (2, 4)),  # roti
+        (0.25, 'Grains', ('ভাত',), (1, 1.5)),  # rice
+        (0.60, 'Protein', ('ডিম',), (1, 2)),  # egg
+        (0.50, 'Vegetables', ('সবজি', 'আলু'), (0.5, 1)),  # vegetable or potato bhaji
+        (0.30, 'Dairy', ('দুধ',), (0.5, 1)),  # milk
+    ]),
+    'lunch': (0.95, [
+        (0.95, 'Grains', ('ভাত',), (1.5, 2.5)),
+        (0.80, 'Protein', ('ডাল',), (1, 1.5)),  # dal
+        (0.55, 'Protein', ('মাছ',), (1, 1.5)),  # fish
+        (0.25, 'Protein', ('মাংস',), (1, 1.5)),  # meat
+        (0.70, 'Vegetables', ('সবজি', 'বেগুন', 'আলু'), (1, 1.5)),
+    ]),
+    'dinner': (0.90, [
+        (0.90, 'Grains', ('ভাত',), (1, 2)),
+        (0.70, 'Protein', ('ডাল',), (1, 1.5)),
+        (0.40, 'Protein', ('মাছ',), (1, 1.5)),
+        (0.30, 'Protein', ('মাংস',), (1, 1.5)),
+        (0.60, 'Vegetables', ('সবজি', 'বেগুন', 'আলু'), (1, 1.5)),
+    ]),
+    'snack': (0.60, [
+        (0.50, 'Fruits', ('কলা', 'আপেল'), (1, 1)),  # banana or apple
+        (0.20, 'Dairy', ('দুধ',), (1, 1)),
+        (0.20, 'Vegetables', ('আলু',), (0.5, 1)),
+    ]),
+}
+# Likelier on Fridays (see _day_rows)
+MEAT = 'মাংস'
+FRIDAY = 4
+
+
+def _meal_types() -> List[str]:
+    """Meal types in Config.MEAL_TYPES order that have a pattern"""
+    return [meal_type for meal_type in Config.MEAL_TYPES if meal_type in MEAL_PATTERNS]
+
+
+class SyntheticDataGenerator:
+    """Streams deterministic users and logs for a food/exercise catalogue"""
+
+    def __init__(self, foods: List[Dict[str, Any]], exercises: List[Dict[str, Any]], users: int = 100,
+                 start_date: date = None, end_date: date = None, seed: int = 0, first_user_id: int = 1,
+                 summaries: bool = True):
+        if not foods or not exercises:
+            raise ValueError("The food and exercise catalogues must not be empty")
+        self.end_date = end_date or date.today()
+        self.start_date = start_date or self.end_date - timedelta(days=89)
+        if self.start_date > self.end_date:
+            raise ValueError(f"start_date {self.start_date} is after end_date {self.end_date}")
+        self.users = users
+        self.seed = seed
+        self.first_user_id = first_user_id
+        self.summaries = summaries
+        self.utils = FitnessUtils()
+        self.meal_types = _meal_types()
+        self.foods = {food['id']: food for food in foods}
+        self.dishes = self._resolve_dishes(foods)
+        meat = normalize_name(MEAT)
+        self.meat_ids = {food['id'] for food in foods if normalize_name(food.get('name_bangla') or '') == meat}
+        self.exercises_by_level = {}
+        for exercise in exercises:
+            self.exercises_by_level.setdefault(exercise['level'], []).append(exercise['id'])
+        self.all_exercise_ids = [exercise['id'] for exercise in exercises]
+
+    def _resolve_dishes(self, foods):
+        """Map each pattern entry to catalogue food ids (by either name within the category, else the category)"""
+        by_category = {}
+        for food in foods:
+            by_category.setdefault(food.get('category'), []).append(food)
+        dishes = {}
+        for meal_type, (_, pattern) in MEAL_PATTERNS.items():
+            resolved = []
+            for chance, category, names, servings in pattern:
+                candidates = by_category.get(category, [])
+                wanted = {normalize_name(name) for name in names}
+                ids = [food['id'] for food in candidates
+                       if wanted & {normalize_name(food.get('name_bangla') or ''),
+                                    normalize_name(food.get('name_english') or '')}]
+                ids = ids or [food['id'] for food in candidates]
+                if ids:
+                    resolved.append((chance, ids, servings))
+            dishes[meal_type] = resolved
+        return dishes
+
+    def days(self) -> int:
+        return (self.end_date - self.start_date).days + 1
+
+    def rows(self) -> Iterator[Tuple[str, tuple]]:
+        """Yield (table, row) pairs: each user followed by all of that user's logs, day by day"""
+        for index in range(self.users):
+            yield from self.user_rows(index)
+
+    def user_rows(self, index: int) -> Iterator[Tuple[str, tuple]]:
+        """Rows for the ``index``-th user (the same for a given seed, whatever else is generated)"""
+        rng = random.Random(self.seed * 1_000_003 + index)
+        user_id = self.first_user_id + index
+        profile = self._profile(rng)
+        yield 'users', (user_id, profile['name'], profile['age'], profile['weight'], profile['height'],
+                        profile['goal'], profile['target_calories'])
+
+        day = self.start_date
+        while day <= self.end_date:
+            if rng.random() < profile['adherence']:
+                yield from self._day_rows(rng, user_id, profile, day)
+            day += timedelta(days=1)
+
+    def _profile(self, rng) -> Dict[str, Any]:
+        gender = rng.choice(('male', 'female'))
+        age = int(rng.triangular(18, 65, 28))
+        height = round(rng.gauss(165, 7) if gender == 'male' else rng.gauss(152, 6), 1)
+        bmi = min(max(rng.gauss(23, 3.5), 16), 38)
+        weight = round(bmi * (height / 100) ** 2, 1)
+        if bmi >= 25:
+            goal = 'weight_loss' if rng.random() < 0.7 else 'maintenance'
+        elif bmi < 18.5:
+            goal = 'weight_gain' if rng.random() < 0.7 else 'maintenance'
+        else:
+            goal = rng.choices(('maintenance', 'weight_loss', 'weight_gain'), (0.6, 0.25, 0.15))[0]
+        names, shares, exercise_chances = zip(*ACTIVITY_PROFILES)
+        activity = rng.choices(range(len(names)), shares)[0]
+        bmr = self.utils.calculate_bmr(weight, height, age, gender)
+        target_calories = self.utils.get_calorie_goal(self.utils.calculate_tdee(bmr, names[activity]), goal)
+        return {
+            'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            'age': age,
+            'weight': weight,
+            'height': height,
+            'goal': goal,
+            'target_calories': int(target_calories),
+            'activity': names[activity],
+            'exercise_chance': exercise_chances[activity],
+            # Share of days the user logs anything at all
+            'adherence': rng.betavariate(5, 2),
+            # Portion size relative to the pattern
+            'appetite': min(max(rng.gauss(1.0, 0.15), 0.6), 1.5),
+        }
+
+    def _day_rows(self, rng, user_id, profile, day):
+        iso_day = day.isoformat()
+        totals = [0.0, 0.0, 0.0, 0.0, 0, 0]  # calories, protein, carbs, fat, water, exercise minutes
+        friday = day.weekday() == FRIDAY
+
+        for meal_type in self.meal_types:
+            meal_chance = MEAL_PATTERNS[meal_type][0]
+            if rng.random() >= meal_chance:
+                continue
+            for chance, food_ids, (low, high) in self.dishes[meal_type]:
+                if friday and meal_type == 'lunch':
+                    # Jumu'ah family lunch: meat is likelier and portions bigger
+                    chance = min(chance * 2, 0.9) if food_ids[0] in self.meat_ids else chance
+                    high *= 1.2
+                if rng.random() >= chance:
+                    continue
+                food = self.foods[rng.choice(food_ids)]
+                serving = food.get('serving_weight') or 100
+                amount = max(5, int(round(serving * rng.uniform(low, high) * profile['appetite'] / 5)) * 5)
+                yield 'food_logs', (user_id, food['id'], amount, iso_day, meal_type)
+                totals[0] += float(food['calories_per_100g'] or 0) * amount / 100
+                totals[1] += float(food.get('protein') or 0) * amount / 100
+                totals[2] += float(food.get('carbs') or 0) * amount / 100
+                totals[3] += float(food.get('fat') or 0) * amount / 100
+
+        # Water is logged a few glasses at a time through the day
+        glasses = min(max(int(round(rng.gauss(7, 2))), 1), 14)
+        remaining = glasses
+        while remaining:
+            logged = min(remaining, rng.randint(1, 4))
+            yield 'water_logs', (user_id, logged, iso_day)
+            remaining -= logged
+        totals[4] = glasses
+
+        if rng.random() < profile['exercise_chance']:
+            levels = ACTIVITY_EXERCISE_LEVELS[profile['activity']]
+            candidates = [exercise_id for level in levels for exercise_id in self.exercises_by_level.get(level, [])]
+            candidates = candidates or self.all_exercise_ids
+            for exercise_id in rng.sample(candidates, min(len(candidates), rng.randint(1, 3))):
+                duration = rng.choice((5, 10, 15, 20, 30))
+                sets = rng.randint(2, 4)
+                yield 'exercise_logs', (user_id, exercise_id, duration, sets, rng.choice((8, 10, 12, 15, 20)), iso_day)
+                totals[5] += duration
+
+        if self.summaries:
+            yield 'daily_summaries', (user_id, iso_day, round(totals[0], 2), round(totals[1], 2),
+                                      round(totals[2], 2), round(totals[3], 2), totals[4], totals[5])
+
+
+# Writers
+
+def write_rows(generator: SyntheticDataGenerator, write, chunk_size: int = 5000) -> Counter:
+    """Stream the generated rows to ``write(table, rows)`` in chunks; return rows written per table
+
+    Every table's buffer is flushed together, users first, so log rows never
+    reference a user that is not written yet.
+    """
+    buffers = {table: [] for table in TABLE_COLUMNS}
+    counts = Counter()
+
+    def flush():
+        for table, buffer in buffers.items():
+            if buffer:
+                write(table, buffer)
+                counts[table] += len(buffer)
+                buffers[table] = []
+
+    for table, row in generator.rows():
+        buffer = buffers[table]
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            flush()
+    flush()
+    return counts
+
+
+def catalogue_from_database(db) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Foods and exercises of a Database, for SyntheticDataGenerator"""
+    from catalogue import CatalogueCache
+
+    cache = CatalogueCache.for_database(db)
+    return list(cache.foods(db)), list(cache.exercises(db))
+
+
+def next_user_id(db) -> int:
+    row = db.fetch_one("SELECT MAX(id) FROM users")
+    return (row[0] or 0) + 1 if row else 1
+
+
+def write_database(db, generator: SyntheticDataGenerator, chunk_size: int = 5000) -> Counter:
+    """Bulk insert the generated rows through ``Database.insert_many``; return rows written per table"""
+    from summaries import UPSERT_QUERY
+
+    queries = {table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+               for table, columns in TABLE_COLUMNS.items()}
+    # Adds to any existing summary for the day, like a log write would
+    queries['daily_summaries'] = UPSERT_QUERY
+    return write_rows(generator, lambda table, rows: db.insert_many(queries[table], rows, chunk_size), chunk_size)
+
+
+def write_files(directory: str, generator: SyntheticDataGenerator, file_format: str = 'csv',
+                chunk_size: int = 50000) -> Counter:
+    """Write one file per table (csv, csv.gz or parquet); return rows written per table"""
+    os.makedirs(directory, exist_ok=True)
+    if file_format == 'parquet':
+        writers = _ParquetWriters(directory)
+    elif file_format in ('csv', 'csv.gz'):
+        writers = _CSVWriters(directory, compress=file_format == 'csv.gz')
+    else:
+        raise ValueError(f"Unknown file format: {file_format} (expected csv, csv.gz or parquet)")
+    try:
+        return write_rows(generator, writers.write, chunk_size)
+    finally:
+        writers.close()
+
+
+class _CSVWriters:
+    def __init__(self, directory, compress=False):
+        self.directory = directory
+        self.compress = compress
+        self.files = {}
+        self.writers = {}
+
+    def write(self, table, rows):
+        if table not in self.writers:
+            path = os.path.join(self.directory, f"{table}.csv" + ('.gz' if self.compress else ''))
+            opener = gzip.open if self.compress else open
+            self.files[table] = opener(path, 'wt', newline='', encoding='utf-8')
+            self.writers[table] = csv.writer(self.files[table])
+            self.writers[table].writerow(TABLE_COLUMNS[table])
+        self.writers[table].writerows(rows)
+
+    def close(self):
+        for handle in self.files.values():
+            handle.close()
+
+
+class _ParquetWriters:
+    def __init__(self, directory):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip3 install pyarrow (or use --to csv.gz)")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.directory = directory
+        self.writers = {}
+
+    def write(self, table, rows):
+        batch = self.pa.Table.from_arrays([list(column) for column in zip(*rows)], names=list(TABLE_COLUMNS[table]))
+        if table not in self.writers:
+            path = os.path.join(self.directory, f"{table}.parquet")
+            self.writers[table] = self.pq.ParquetWriter(path, batch.schema)
+        self.writers[table].write_table(batch.cast(self.writers[table].schema))
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic users and fitness logs")
+    parser.add_argument('--users', type=int, default=100, help="number of users (default: %(default)s)")
+    parser.add_argument('--days', type=int, default=90, help="days of history ending on --end (default: %(default)s)")
+    parser.add_argument('--start', type=date.fromisoformat, help="first day (YYYY-MM-DD; overrides --days)")
+    parser.add_argument('--end', type=date.fromisoformat, help="last day (YYYY-MM-DD, default: today)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument('--to', choices=('database', 'csv', 'csv.gz', 'parquet'), default='csv',
+                        help="output (default: %(default)s)")
+    parser.add_argument('--output', default='synthetic_data', help="directory for file output (default: %(default)s)")
+    parser.add_argument('--sqlite-path', help="SQLite file to write to with --to database (default: the app's database)")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="rows per bulk insert (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    end_date = args.end or date.today()
+    start_date = args.start or end_date - timedelta(days=args.days - 1)
+    started = time.perf_counter()
+
+    if args.to == 'database':
+        from database import Database
+
+        if args.sqlite_path:
+            Config.DATABASE_TYPE = 'sqlite'
+            Config.SQLITE_DATABASE_PATH = os.path.abspath(args.sqlite_path)
+        with Database() as db:
+            foods, exercises = catalogue_from_database(db)
+            generator = SyntheticDataGenerator(foods, exercises, args.users, start_date, end_date, args.seed,
+                                               first_user_id=next_user_id(db))
+            print(f"🌱 Writing {args.users} users from {start_date} to {end_date} into the "
+                  f"{db.db_manager.database_type} database")
+            counts = write_database(db, generator, args.chunk_size)
+    else:
+        from utils import BangladeshiFoodData, ExerciseData
+
+        foods = [dict(food, id=i) for i, food in enumerate(BangladeshiFoodData.get_common_foods(), 1)]
+        exercises = [dict(exercise, id=i) for i, exercise in enumerate(ExerciseData.get_exercises(), 1)]
+        generator = SyntheticDataGenerator(foods, exercises, args.users, start_date, end_date, args.seed)
+        print(f"🌱 Writing {args.users} users from {start_date} to {end_date} to {args.output}/ ({args.to})")
+        try:
+            counts = write_files(args.output, generator, args.to, args.chunk_size)
+        except ImportError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for table in TABLE_COLUMNS:
+        print(f"   {table:<16} {counts[table]:>12,}")
+    print(f"✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Server-side fuzzy food search.
+
+Names are reduced to a normalized "skeleton" (Unicode-normalized, casefolded,
+Bengali vowel signs and diacritics stripped) so spelling variants such as
+ভাত/ভত or পেঁয়াজ/পেয়াজ meet, and common romanizations ("bhat", "mach")
+are indexed as aliases of their Bangla names. The index holds:
+
+- a sorted list of name keys for prefix (autocomplete) lookups via bisect
+- a trigram -> names posting map for typo-tolerant ranked matches
+"""
+
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+# Dependent vowel signs, virama, candrabindu/anusvara/visarga, nukta, au length mark
+BENGALI_MARKS = {chr(code) for code in range(0x09BE, 0x09CE)} | {'ঁ', 'ং', 'ঃ', '়', 'ৗ'}
+
+# NFD already splits ড়/ঢ়/য় into letter + nukta; khanda ta has no decomposition
+BENGALI_LETTER_VARIANTS = {
+    'ৎ': 'ত',
+}
+
+# Common romanized spellings of Bangla food names
+TRANSLITERATIONS = {
+    'ভাত': ['bhat', 'bhaat', 'vat', 'bhath'],
+    'রুটি': ['ruti', 'roti', 'chapati'],
+    'মাছ': ['mach', 'machh', 'maach', 'maachh'],
+    'মাংস': ['mangsho', 'mangsha', 'mangso', 'gosht', 'mangsa'],
+    'ডাল': ['dal', 'daal', 'dhal'],
+    'সবজি': ['sobji', 'shobji', 'sabji', 'sobzi'],
+    'দুধ': ['dudh', 'dood'],
+    'ডিম': ['dim', 'deem'],
+    'কলা': ['kola', 'kala'],
+    'আপেল': ['apel'],
+    'আলু': ['alu', 'aloo'],
+    'টমেটো': ['tometo', 'tomato'],
+    'পেঁয়াজ': ['peyaj', 'piyaj', 'peyaz', 'piaj'],
+    'গাজর': ['gajor', 'gajar'],
+    'বেগুন': ['begun', 'baigan'],
+}
+
+
+def normalize(text: str) -> str:
+    """Reduce a name or query to its search skeleton"""
+    text = unicodedata.normalize('NFD', text.casefold())
+    chars = []
+    for char in text:
+        if char in BENGALI_MARKS or unicodedata.category(char) == 'Mn':
+            continue
+        chars.append(BENGALI_LETTER_VARIANTS.get(char, char))
+    return ' '.join(''.join(chars).split())
+
+
+def trigrams(key: str) -> set:
+    """Character trigrams of a key, padded so short words still produce grams"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FoodSearchIndex:
+    """In-memory n-gram and prefix index over food names"""
+
+    MIN_SIMILARITY = 0.2
+
+    def __init__(self, foods: Iterable[Dict[str, Any]]):
+        self.foods = {}
+        self._keys = []      # (key, food_id), sorted for prefix search
+        self._grams = {}     # (key, food_id) -> trigram set
+        self._postings = defaultdict(set)
+
+        for food in foods:
+            self.foods[food['id']] = food
+            names = [food['name_bangla'], food['name_english']]
+            names += TRANSLITERATIONS.get(food['name_bangla'], [])
+            for name in names:
+                key = normalize(name or '')
+                if not key or (key, food['id']) in self._grams:
+                    continue
+                entry = (key, food['id'])
+                grams = trigrams(key)
+                self._keys.append(entry)
+                self._grams[entry] = grams
+                for gram in grams:
+                    self._postings[gram].add(entry)
+        self._keys.sort()
+
+    def __len__(self):
+        return len(self.foods)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return foods with a name starting with ``prefix``, shortest names first"""
+        matches = self._prefix_matches(normalize(prefix))
+        ranked = sorted(matches.items(), key=lambda item: (item[1], item[0]))
+        return [self.foods[food_id] for food_id, _ in ranked[:limit]]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the best matching foods for ``query``, each with a ``score`` in (0, 1]"""
+        key = normalize(query)
+        if not key:
+            return []
+
+        scores = {}
+        for food_id, length in self._prefix_matches(key).items():
+            # Prefix hits rank above fuzzy hits; exact matches score 1.0
+            scores[food_id] = 0.5 + 0.5 * len(key) / length
+
+        query_grams = trigrams(key)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for entry in self._postings.get(gram, ()):
+                shared[entry] += 1
+        for entry, count in shared.items():
+            similarity = count / (len(query_grams) + len(self._grams[entry]) - count)
+            if similarity >= self.MIN_SIMILARITY:
+                food_id = entry[1]
+                scores[food_id] = max(scores.get(food_id, 0), similarity * 0.5)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [dict(self.foods[food_id], score=round(score, 3)) for food_id, score in ranked[:limit]]
+
+    def _prefix_matches(self, key: str) -> Dict[int, int]:
+        """Map food id -> length of its shortest name starting with key"""
+        matches = {}
+        if not key:
+            return matches
+        position = bisect_left(self._keys, (key, -1))
+        while position < len(self._keys) and self._keys[position][0].startswith(key):
+            name, food_id = self._keys[position]
+            matches[food_id] = min(matches.get(food_id, len(name)), len(name))
+            position += 1
+        return matches
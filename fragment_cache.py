@@ -0,0 +1,107 @@
+"""
+Cached template fragments.
+
+``FragmentCacheExtension`` adds a ``{% cache %}`` tag to Jinja:
+
+    {% cache 'food_grid' %} ... {% endcache %}
+    {% cache 'profile_card', user.id %} ... {% endcache %}
+
+The rendered body is stored in a ``FragmentCache`` under the fragment name,
+the cache's version, the implicit key parts from its ``vary`` callable (the
+session language in web_app) and any extra values given in the tag (e.g. the
+user for per-user fragments). ``invalidate()`` bumps the version, so every
+fragment is re-rendered after a catalogue write; one rendered while the write
+was in flight is stored under the old version and is never served.
+
+Views pair it with ``LazyValues`` so the queries behind a fragment only run
+when the fragment is actually rendered.
+"""
+
+import threading
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from cache import LRUCache
+
+
+class FragmentCache:
+    """LRU of rendered fragments, invalidated as a whole by a version counter"""
+
+    def __init__(self, maxsize=256, ttl=None, vary=None):
+        self._fragments = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.vary = vary
+        self.version = 0
+
+    def key(self, name, *vary) -> tuple:
+        """Cache key for a fragment; take it *before* rendering"""
+        with self._lock:
+            version = self.version
+        implicit = tuple(self.vary()) if self.vary is not None else ()
+        return (name, version) + implicit + vary
+
+    def get(self, key):
+        return self._fragments.get(key)
+
+    def set(self, key, html):
+        self._fragments.set(key, html)
+
+    def invalidate(self):
+        """Forget every fragment (call after the data they show has changed)"""
+        with self._lock:
+            self.version += 1
+        self._fragments.clear()
+
+    def stats(self):
+        return dict(self._fragments.stats(), version=self.version)
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache name[, vary...] %}body{% endcache %}`` backed by ``environment.fragment_cache``"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        # Without a cache the tag simply renders its body
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        vary = []
+        while parser.stream.skip_if('comma'):
+            vary.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [name, nodes.List(vary)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, name, vary, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        key = cache.key(name, *vary)
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, html)
+        return html
+
+
+class LazyValues:
+    """Template values loaded by ``load()`` on first attribute access"""
+
+    def __init__(self, load):
+        self._load = load
+        self._values = None
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._values is None:
+            self._values = self._load()
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
@@ -0,0 +1,126 @@
+"""
+Index management for the per-user, per-day log queries.
+
+Every hot DataManager read filters ``WHERE user_id = ? AND date = ?``, so each
+log table gets a composite index led by ``(user_id, date)``. The trailing
+columns make the indexes covering for the DataManager reads, so those never
+touch the table rows, and the ``(user_id, date)`` prefix serves every other
+lookup by user and day.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+# (index name, table, columns)
+INDEXES = [
+    ("idx_food_logs_user_date", "food_logs", ("user_id", "date", "meal_type", "food_id", "amount")),
+    ("idx_exercise_logs_user_date", "exercise_logs", ("user_id", "date", "exercise_id", "duration", "sets", "reps")),
+    ("idx_water_logs_user_date", "water_logs", ("user_id", "date", "glasses")),
+    ("idx_pantry_user", "pantry", ("user_id", "food_id")),
+]
+
+# DataManager reads checked by IndexManager.check_queries
+CHECKED_QUERIES = [
+    "get_daily_calories",
+    "get_meal_logs",
+    "get_exercise_logs",
+    "get_daily_water",
+    "get_pantry_items",
+]
+
+
+class _QueryRecorder:
+    """Stands in for Database and records the read queries issued to it"""
+
+    def __init__(self):
+        self.queries = []
+
+    def fetch_one(self, query, params=None):
+        self.queries.append((query, params))
+        return None
+
+    def fetch_all(self, query, params=None):
+        self.queries.append((query, params))
+        return []
+
+
+class IndexManager:
+    """Creates the declared indexes and reports full scans in DataManager queries"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def existing_indexes(self, table: str) -> List[str]:
+        """Return the names of the indexes defined on a table"""
+        rows = self.db.fetch_all(self.db.dialect.INDEX_LIST_QUERY, (table,))
+        return [row[0] for row in rows]
+
+    def missing_indexes(self):
+        """Return the declared indexes that do not exist yet"""
+        existing = {}
+        missing = []
+        for name, table, columns in INDEXES:
+            if table not in existing:
+                existing[table] = set(self.existing_indexes(table))
+            if name not in existing[table]:
+                missing.append((name, table, columns))
+        return missing
+
+    def ensure_indexes(self) -> List[str]:
+        """Create any missing declared index; return the names created"""
+        created = []
+        for name, table, columns in self.missing_indexes():
+            self.db.execute_query(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+            created.append(name)
+        self.db.commit()
+        return created
+
+    def explain(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Return the EXPLAIN plan of a query as a list of column-name dicts"""
+        cursor = self.db.execute_query(self.db.dialect.EXPLAIN_PREFIX + query.strip(), params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def check_queries(self, user_id: int = 1, date: str = None) -> List[Dict[str, Any]]:
+        """EXPLAIN each DataManager read and report the tables it fully scans"""
+        from utils import DataManager
+
+        if date is None:
+            date = datetime.now().strftime('%Y-%m-%d')
+
+        report = []
+        for method in CHECKED_QUERIES:
+            recorder = _QueryRecorder()
+            manager = DataManager(recorder)
+            if method == "get_pantry_items":
+                getattr(manager, method)(user_id)
+            else:
+                getattr(manager, method)(user_id, date)
+
+            for query, params in recorder.queries:
+                plan = self.explain(query, params)
+                full_scans = self.db.dialect.full_scan_tables(plan)
+                report.append({
+                    'method': method,
+                    'full_scans': full_scans,
+                    'plan': plan,
+                })
+        return report
+
+
+if __name__ == '__main__':
+    from database import Database
+
+    db = Database()
+    manager = IndexManager(db)
+
+    created = manager.ensure_indexes()
+    print(f"Created indexes: {', '.join(created) if created else 'none (all present)'}")
+
+    for entry in manager.check_queries():
+        if entry['full_scans']:
+            print(f"❌ {entry['method']}: full scan of {', '.join(entry['full_scans'])}")
+        else:
+            print(f"✅ {entry['method']}: uses indexes")
+
+    db.close()
@@ -0,0 +1,145 @@
+"""
+Write-behind queue for batched log ingestion.
+
+Producers (request handlers) ``submit`` already-validated items to a bounded
+in-process queue; one background thread drains it and hands the items to a
+flush callback in batches, flushing when ``batch_size`` items are waiting or
+``flush_interval`` seconds after the first one arrived. Concurrent requests
+therefore share a single transaction (group commit) instead of paying one
+commit each.
+
+Every submitted item gets a ``Future`` that resolves once the batch holding
+it is committed (or fails), so callers choose their acknowledgement: wait on
+the futures for a durable ack, or return immediately after queueing. A
+request's items are queued all together or not at all: if the queue has no
+room for all of them within ``enqueue_timeout``, ``QueueFullError`` is raised
+with nothing queued, so callers can shed load and clients can safely resend.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+_STOP = object()
+
+
+class QueueFullError(Exception):
+    """Raised when the queue stays full for longer than the enqueue timeout"""
+
+
+class WriteBehindQueue:
+    """Bounded queue flushed to storage in batches by a background thread"""
+
+    def __init__(self, flush: Callable[[List[Any]], None], maxsize=10000, batch_size=500,
+                 flush_interval=0.05, enqueue_timeout=1.0):
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.maxsize = maxsize
+        # Capacity is counted here rather than by the queue so a whole request can reserve room at once
+        self._queue = queue.Queue()
+        self._space = threading.Condition()
+        self._queued = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        # The exit flush is registered with the first thread, not again on each restart
+        self._exit_registered = False
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, items: List[Any]) -> List[Future]:
+        """Queue all items for the next batch (or none of them); return one future per item"""
+        self._ensure_started()
+        items = list(items)
+        with self._space:
+            # Room for the whole request is reserved up front, so it is never left half-queued
+            if self.maxsize and not (len(items) <= self.maxsize and self._space.wait_for(
+                    lambda: self._queued + len(items) <= self.maxsize, self.enqueue_timeout)):
+                raise QueueFullError(f"Ingestion queue full ({self.maxsize} items)")
+            self._queued += len(items)
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return futures
+
+    def pending(self) -> int:
+        """Number of items waiting to be flushed"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """Return queue depth and flush counters"""
+        return {'pending': self.pending(), 'flushed': self.flushed, 'failed': self.failed, 'batches': self.batches}
+
+    def close(self, timeout=None):
+        """Flush everything queued so far and stop the background thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put((_STOP, None))
+            thread.join(timeout)
+
+    def _ensure_started(self):
+        # Started lazily so a pre-forking server starts one thread per worker, after the fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+                if not self._exit_registered:
+                    atexit.register(self.close, 5)
+                    self._exit_registered = True
+
+    def _take(self, timeout=None):
+        item = self._queue.get(timeout=timeout)
+        if item[0] is not _STOP:
+            with self._space:
+                self._queued -= 1
+                self._space.notify_all()
+        return item
+
+    def _run(self):
+        while True:
+            item = self._take()
+            if item[0] is _STOP:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._take(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item[0] is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        try:
+            self.flush([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                batch[0][1].set_exception(e)
+                return
+            # Retry one by one so a single bad item does not fail the whole batch
+            for entry in batch:
+                self._flush([entry])
+            return
+        self.batches += 1
+        self.flushed += len(batch)
+        for _, future in batch:
+            future.set_result(True)
@@ -1,3 +1,6 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from kivymd.app import MDApp
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.screenmanager import MDScreenManager
@@ -18,10 +21,20 @@ from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.properties import StringProperty, NumericProperty
 from kivy.clock import Clock
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recyclegridlayout import RecycleGridLayout
 import json
 from datetime import datetime, date
 import os
-from database import Database
+from background import BackgroundWorker
+from food_search import FoodSearchIndex
+from config import Config
+from database import Database, DatabaseManager
+from profiling import serve_metrics
+from sync import SyncEngine, SyncJournal
+from utils import DataManager
 
 # Set window size for development (remove for mobile)
 Window.size = (400, 700)
@@ -32,9 +45,22 @@ class BangladeshiFitnessApp(MDApp):
         self.title = "ফিটনেস ট্র্যাকার"  # Fitness Tracker in Bangla
         self.theme_cls.primary_palette = "Green"
         self.theme_cls.theme_style = "Light"
-        self.db = Database()
+        # The database is opened on the background worker after the first frame;
+        # screens show placeholders until it is ready and load their data through ``load``
+        self.worker = BackgroundWorker()
+        self.db = None
+        self.journal = None
+        self.data = None
+        self.sync = None
+        self._data_callbacks = []
+        # Tab contents are built on first visit (see show_tab)
+        self.tabs = {}
+        self.screens = {}
+        self.timings = {'imports': time.perf_counter() - _IMPORT_STARTED}
         
     def build(self):
+        build_started = time.perf_counter()
+        
         # Create screen manager
         self.sm = MDScreenManager()
         
@@ -50,7 +76,6 @@ class BangladeshiFitnessApp(MDApp):
             text="হোম",  # Home
             icon="home"
         )
-        dashboard_tab.add_widget(DashboardScreen())
         
         # Food Tracking Tab
         food_tab = MDBottomNavigationItem(
@@ -58,7 +83,6 @@ class BangladeshiFitnessApp(MDApp):
             text="খাবার",  # Food
             icon="food"
         )
-        food_tab.add_widget(FoodTrackingScreen())
         
         # Exercise Tab
         exercise_tab = MDBottomNavigationItem(
@@ -66,7 +90,6 @@ class BangladeshiFitnessApp(MDApp):
             text="ব্যায়াম",  # Exercise
             icon="dumbbell"
         )
-        exercise_tab.add_widget(ExerciseScreen())
         
         # Pantry Tab
         pantry_tab = MDBottomNavigationItem(
@@ -74,7 +97,6 @@ class BangladeshiFitnessApp(MDApp):
             text="প্যান্ট্রি",  # Pantry
             icon="food-variant"
         )
-        pantry_tab.add_widget(PantryScreen())
         
         # Profile Tab
         profile_tab = MDBottomNavigationItem(
@@ -82,25 +104,159 @@ class BangladeshiFitnessApp(MDApp):
             text="প্রোফাইল",  # Profile
             icon="account"
         )
-        profile_tab.add_widget(ProfileScreen())
         
         # Add tabs to bottom navigation
-        bottom_nav.add_widget(dashboard_tab)
-        bottom_nav.add_widget(food_tab)
-        bottom_nav.add_widget(exercise_tab)
-        bottom_nav.add_widget(pantry_tab)
-        bottom_nav.add_widget(profile_tab)
+        for tab in (dashboard_tab, food_tab, exercise_tab, pantry_tab, profile_tab):
+            bottom_nav.add_widget(tab)
+            tab.bind(on_tab_press=self.show_tab)
+            self.tabs[tab.name] = tab
+        
+        # Only the first tab is built before the first frame
+        self.ensure_screen("dashboard")
         
         main_screen.add_widget(bottom_nav)
         self.sm.add_widget(main_screen)
         
+        self.timings['build'] = time.perf_counter() - build_started
         return self.sm
+    
+    def ensure_screen(self, name):
+        """Build a tab's screen if it has not been built yet; return it"""
+        screen = self.screens.get(name)
+        if screen is None:
+            started = time.perf_counter()
+            screen = SCREENS[name]()
+            self.tabs[name].add_widget(screen)
+            self.screens[name] = screen
+            self.timings[f'screen:{name}'] = time.perf_counter() - started
+        return screen
+    
+    def show_tab(self, tab):
+        already_built = tab.name in self.screens
+        screen = self.ensure_screen(tab.name)
+        if already_built and hasattr(screen, 'refresh'):
+            # Reload in the background on every later visit; the old values stay up meanwhile
+            screen.refresh()
+        self.schedule_prewarm(tab.name)
+    
+    def schedule_prewarm(self, name):
+        """Build the tab the user most likely opens next once the UI is idle"""
+        next_tab = Config.PREWARM_NEXT_TAB.get(name)
+        if Config.PREWARM_TABS and next_tab and next_tab not in self.screens:
+            # Widgets must be created on the UI thread, so this is deferred rather than threaded
+            Clock.schedule_once(lambda dt: self.ensure_screen(next_tab), Config.PREWARM_DELAY)
+    
+    def report_startup(self, *args):
+        """Print how long start-up took up to the first frame"""
+        self.timings['first_frame'] = time.perf_counter() - _IMPORT_STARTED
+        screens = ', '.join(f"{key.split(':', 1)[1]} {value * 1000:.0f}ms"
+                            for key, value in self.timings.items() if key.startswith('screen:'))
+        print(f"⏱️ Startup: imports {self.timings['imports'] * 1000:.0f}ms, "
+              f"build {self.timings['build'] * 1000:.0f}ms ({screens}), "
+              f"first frame after {self.timings['first_frame'] * 1000:.0f}ms")
+    
+    def on_start(self):
+        # Runs on the next frame, i.e. once the first one has been drawn
+        Clock.schedule_once(self.report_startup)
+        self.schedule_prewarm("dashboard")
+        self.worker.submit(self.open_database, on_result=self.on_database_ready,
+                           on_error=self.on_database_error)
+        if Config.METRICS_PORT:
+            # Query timings of this device's database, for profiling on a dev build
+            serve_metrics(Config.METRICS_PORT)
+    
+    def open_database(self):
+        """Connect, run migrations and open the sync journal (on the worker thread)"""
+        return Database(), SyncJournal()
+    
+    def on_database_ready(self, result):
+        self.db, self.journal = result
+        self.timings['database_ready'] = time.perf_counter() - _IMPORT_STARTED
+        # Log writes land locally first and are uploaded in the background when online
+        self.data = DataManager(self.db, journal=self.journal)
+        if Config.SYNC_SERVER_URL:
+            self.sync = SyncEngine(self.journal, Config.SYNC_SERVER_URL, on_status=self.on_sync_status)
+            self.sync.start()
+        
+        callbacks, self._data_callbacks = self._data_callbacks, None
+        for callback in callbacks:
+            callback()
+    
+    def on_sync_status(self, online, pending, rejected):
+        # Called on the sync thread; the dashboard is always built, so it shows the status
+        Clock.schedule_once(lambda dt: self.screens['dashboard'].show_sync_status(online, pending, rejected))
+    
+    def on_database_error(self, error):
+        print(f"❌ Could not open the database: {error}")
+    
+    def load(self, query, *args, on_result):
+        """Run ``query(data_manager, *args)`` on the worker and pass its result to ``on_result`` on the UI thread
+        
+        Queries made before the database is open wait for it.
+        """
+        def run():
+            self.worker.submit(query, self.data, *args, on_result=on_result)
+        
+        if self._data_callbacks is None:
+            run()
+        else:
+            self._data_callbacks.append(run)
+    
+    def on_stop(self):
+        if self.sync:
+            self.sync.stop()
+        self.worker.shutdown()
+        if self.journal:
+            self.journal.close()
+        # Return the shared connection and close the pool on exit
+        if self.db:
+            self.db.close()
+        DatabaseManager.close_all_pools()
 
 class DashboardScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.db = Database()
         self.setup_ui()
+        self.refresh()
+    
+    def refresh(self, *args):
+        MDApp.get_running_app().load(self.fetch_today, on_result=self.show_today)
+    
+    @staticmethod
+    def fetch_today(data):
+        """Today's totals and logs (runs on the worker thread)"""
+        user_id = Config.LOCAL_USER_ID
+        return {
+            'user': data.get_user(user_id),
+            'summary': data.get_daily_summary(user_id),
+            'meals': data.get_meal_logs(user_id),
+            'exercises': data.get_exercise_logs(user_id),
+        }
+    
+    def show_today(self, today):
+        user = today['user'] or {}
+        summary = today['summary']
+        target = user.get('target_calories') or Config.DEFAULT_CALORIE_GOAL
+        self.calories_label.text = f"{float(summary['calories']):,.0f}/{target:,}"
+        self.water_label.text = f"{summary['water_glasses']}/{Config.DEFAULT_WATER_GOAL} গ্লাস"
+        
+        activities = [f"{name} ({float(calories):.0f} ক্যালরি)" for name, amount, meal_type, calories in today['meals']]
+        activities += [f"{name} ({duration} মিনিট)" for name, duration, sets, reps in today['exercises']]
+        if summary['water_glasses']:
+            activities.append(f"পানি ({summary['water_glasses']} গ্লাস)")
+        
+        self.recent_list.clear_widgets()
+        for activity in activities or ["আজ এখনো কিছু যোগ করা হয়নি"]:  # Nothing logged today yet
+            self.recent_list.add_widget(OneLineListItem(text=activity))
+        
+    def show_sync_status(self, online, pending, rejected):
+        if rejected:
+            # N entries could not be sent to the server
+            self.sync_label.text = f"⚠️ {rejected}টি এন্ট্রি সার্ভারে পাঠানো যায়নি"
+            self.sync_label.height = dp(30)
+        else:
+            self.sync_label.text = ""
+            self.sync_label.height = dp(0)
         
     def setup_ui(self):
         layout = MDBoxLayout(orientation='vertical', spacing=dp(10), padding=dp(16))
@@ -115,6 +271,11 @@ class DashboardScreen(MDScreen):
         )
         layout.add_widget(header)
         
+        # Entries the server would not accept (see SyncEngine); empty while there are none
+        self.sync_label = MDLabel(text="", halign="center", font_style="Caption",
+                                  theme_text_color="Error", size_hint_y=None, height=dp(0))
+        layout.add_widget(self.sync_label)
+        
         # Stats Cards
         stats_layout = MDBoxLayout(orientation='horizontal', spacing=dp(10), size_hint_y=None, height=dp(120))
         
@@ -125,7 +286,8 @@ class DashboardScreen(MDScreen):
         )
         calories_layout = MDBoxLayout(orientation='vertical')
         calories_layout.add_widget(MDLabel(text="ক্যালরি", halign="center", font_style="Caption"))
-        calories_layout.add_widget(MDLabel(text="1,200/2,000", halign="center", font_style="H6"))
+        self.calories_label = MDLabel(text="...", halign="center", font_style="H6")
+        calories_layout.add_widget(self.calories_label)
         calories_card.add_widget(calories_layout)
         
         # Water Card
@@ -135,7 +297,8 @@ class DashboardScreen(MDScreen):
         )
         water_layout = MDBoxLayout(orientation="vertical")
         water_layout.add_widget(MDLabel(text="পানি", halign="center", font_style="Caption"))
-        water_layout.add_widget(MDLabel(text="6/8 গ্লাস", halign="center", font_style="H6"))
+        self.water_label = MDLabel(text="...", halign="center", font_style="H6")
+        water_layout.add_widget(self.water_label)
         water_card.add_widget(water_layout)
         
         stats_layout.add_widget(calories_card)
@@ -180,20 +343,11 @@ class DashboardScreen(MDScreen):
         
         # Scrollable recent activities
         scroll = MDScrollView()
-        recent_list = MDList()
-        
-        # Add some dummy recent activities
-        activities = [
-            "ভাত + মাছ (৩০০ ক্যালরি)",
-            "পুশ-আপ (১০ বার)",
-            "পানি (১ গ্লাস)",
-            "দুধ (১৫০ ক্যালরি)"
-        ]
+        self.recent_list = MDList()
+        # Placeholder until today's logs are loaded
+        self.recent_list.add_widget(OneLineListItem(text="লোড হচ্ছে..."))
         
-        for activity in activities:
-            recent_list.add_widget(OneLineListItem(text=activity))
-        
-        scroll.add_widget(recent_list)
+        scroll.add_widget(self.recent_list)
         layout.add_widget(scroll)
         
         self.add_widget(layout)
@@ -206,11 +360,65 @@ class DashboardScreen(MDScreen):
         # Navigate to exercise screen
         pass
 
+class CatalogueCard(RecycleDataViewBehavior, MDCard):
+    """Two-line card used as a RecycleView row; only the visible cards exist and are reused"""
+    title = StringProperty()
+    subtitle = StringProperty()
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.padding = dp(10)
+        layout = MDBoxLayout(orientation='vertical')
+        title_label = MDLabel(halign="center")
+        subtitle_label = MDLabel(halign="center", font_style="Caption")
+        layout.add_widget(title_label)
+        layout.add_widget(subtitle_label)
+        self.add_widget(layout)
+        self.bind(title=title_label.setter('text'), subtitle=subtitle_label.setter('text'))
+
+def recycle_view(viewclass, cols=None, row_height=dp(80)):
+    """A RecycleView laid out in a grid of ``cols`` columns, or as a single list"""
+    view = RecycleView(viewclass=viewclass)
+    if cols:
+        layout = RecycleGridLayout(cols=cols, spacing=dp(10), default_size=(None, row_height),
+                                   default_size_hint=(1, None), size_hint_y=None)
+    else:
+        layout = RecycleBoxLayout(orientation='vertical', default_size=(None, row_height),
+                                  default_size_hint=(1, None), size_hint_y=None)
+    layout.bind(minimum_height=layout.setter('height'))
+    view.add_widget(layout)
+    return view
+
+LOADING_ROW = {'title': "লোড হচ্ছে...", 'subtitle': ""}  # Loading...
+
 class FoodTrackingScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.db = Database()
+        self.foods = []
+        self.search_index = None
         self.setup_ui()
+        MDApp.get_running_app().load(self.fetch_foods, on_result=self.show_foods)
+    
+    @staticmethod
+    def fetch_foods(data):
+        """The food catalogue and a search index over it (runs on the worker thread)"""
+        foods = data.get_foods()
+        return foods, FoodSearchIndex(foods)
+    
+    def show_foods(self, result):
+        self.foods, self.search_index = result
+        self.search()
+    
+    def search(self, *args):
+        query = self.search_field.text.strip()
+        if query and self.search_index:
+            foods = self.search_index.search(query, limit=50)
+        else:
+            foods = self.foods
+        self.food_list.data = [
+            {'title': food['name_bangla'], 'subtitle': f"{food['calories_per_100g']} ক্যালরি"}
+            for food in foods
+        ]
         
     def setup_ui(self):
         layout = MDBoxLayout(orientation='vertical', spacing=dp(10), padding=dp(16))
@@ -227,15 +435,17 @@ class FoodTrackingScreen(MDScreen):
         
         # Search Bar
         search_layout = MDBoxLayout(orientation='horizontal', spacing=dp(10), size_hint_y=None, height=dp(60))
-        search_field = MDTextField(
+        self.search_field = MDTextField(
             hint_text="খাবার খুঁজুন...",  # Search food...
             size_hint=(0.7, 1)
         )
+        self.search_field.bind(on_text_validate=self.search)
         search_btn = MDRaisedButton(
             text="খুঁজুন",  # Search
-            size_hint=(0.3, 1)
+            size_hint=(0.3, 1),
+            on_release=self.search
         )
-        search_layout.add_widget(search_field)
+        search_layout.add_widget(self.search_field)
         search_layout.add_widget(search_btn)
         layout.add_widget(search_layout)
         
@@ -248,44 +458,10 @@ class FoodTrackingScreen(MDScreen):
         )
         layout.add_widget(quick_add_label)
         
-        # Pantry items grid
-        pantry_layout = MDBoxLayout(orientation='vertical', spacing=dp(10))
-        
-        # Common Bangladeshi foods
-        common_foods = [
-            ("ভাত", "Rice", "130"),
-            ("রুটি", "Roti", "80"),
-            ("মাছ", "Fish", "120"),
-            ("মাংস", "Meat", "250"),
-            ("ডাল", "Dal", "100"),
-            ("সবজি", "Vegetables", "50")
-        ]
-        
-        for i in range(0, len(common_foods), 2):
-            row = MDBoxLayout(orientation='horizontal', spacing=dp(10))
-            
-            # First item
-            food1 = common_foods[i]
-            card1 = MDCard(size_hint=(0.5, 1), padding=dp(10))
-            card1_layout = MDBoxLayout(orientation='vertical')
-            card1_layout.add_widget(MDLabel(text=food1[0], halign="center"))
-            card1_layout.add_widget(MDLabel(text=f"{food1[2]} ক্যালরি", halign="center", font_style="Caption"))
-            card1.add_widget(card1_layout)
-            row.add_widget(card1)
-            
-            # Second item (if exists)
-            if i + 1 < len(common_foods):
-                food2 = common_foods[i + 1]
-                card2 = MDCard(size_hint=(0.5, 1), padding=dp(10))
-                card2_layout = MDBoxLayout(orientation='vertical')
-                card2_layout.add_widget(MDLabel(text=food2[0], halign="center"))
-                card2_layout.add_widget(MDLabel(text=f"{food2[2]} ক্যালরি", halign="center", font_style="Caption"))
-                card2.add_widget(card2_layout)
-                row.add_widget(card2)
-            
-            pantry_layout.add_widget(row)
-        
-        layout.add_widget(pantry_layout)
+        # Food grid: a recycling view, so only the visible cards are ever instantiated
+        self.food_list = recycle_view(CatalogueCard, cols=2)
+        self.food_list.data = [LOADING_ROW]
+        layout.add_widget(self.food_list)
         
         # Add custom food button
         add_custom_btn = MDRaisedButton(
@@ -301,10 +477,29 @@ class FoodTrackingScreen(MDScreen):
         pass
 
 class ExerciseScreen(MDScreen):
+    # Level chip text -> catalogue level
+    LEVELS = {"শুরুর": "Beginner", "মাঝারি": "Intermediate", "উন্নত": "Advanced"}
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.db = Database()
+        self.exercises = []
+        self.level = None
         self.setup_ui()
+        MDApp.get_running_app().load(lambda data: data.get_exercises(), on_result=self.show_exercises)
+    
+    def show_exercises(self, exercises):
+        self.exercises = exercises
+        self.exercise_list.data = [
+            {'title': exercise['name_bangla'], 'subtitle': exercise['level']}
+            for exercise in exercises
+            if self.level is None or exercise['level'] == self.level
+        ]
+    
+    def filter_level(self, chip):
+        # Pressing the selected level again shows every level
+        level = self.LEVELS[chip.text]
+        self.level = None if level == self.level else level
+        self.show_exercises(self.exercises)
         
     def setup_ui(self):
         layout = MDBoxLayout(orientation='vertical', spacing=dp(10), padding=dp(16))
@@ -335,7 +530,8 @@ class ExerciseScreen(MDScreen):
             chip = MDChip(
                 text=level,
                 size_hint=(None, None),
-                size=(dp(80), dp(40))
+                size=(dp(80), dp(40)),
+                on_release=self.filter_level
             )
             level_layout.add_widget(chip)
         
@@ -350,43 +546,10 @@ class ExerciseScreen(MDScreen):
         )
         layout.add_widget(categories_label)
         
-        # Exercise grid
-        exercise_layout = MDBoxLayout(orientation='vertical', spacing=dp(10))
-        
-        exercises = [
-            ("পুশ-আপ", "Push-ups", "Beginner"),
-            ("স্কোয়াট", "Squats", "Beginner"),
-            ("প্লাঙ্ক", "Plank", "Intermediate"),
-            ("বারপি", "Burpees", "Advanced"),
-            ("লাঞ্জ", "Lunges", "Intermediate"),
-            ("মাউন্টেন ক্লাইম্বার", "Mountain Climber", "Advanced")
-        ]
-        
-        for i in range(0, len(exercises), 2):
-            row = MDBoxLayout(orientation='horizontal', spacing=dp(10))
-            
-            # First exercise
-            ex1 = exercises[i]
-            card1 = MDCard(size_hint=(0.5, 1), padding=dp(10))
-            card1_layout = MDBoxLayout(orientation='vertical')
-            card1_layout.add_widget(MDLabel(text=ex1[0], halign="center"))
-            card1_layout.add_widget(MDLabel(text=ex1[2], halign="center", font_style="Caption"))
-            card1.add_widget(card1_layout)
-            row.add_widget(card1)
-            
-            # Second exercise (if exists)
-            if i + 1 < len(exercises):
-                ex2 = exercises[i + 1]
-                card2 = MDCard(size_hint=(0.5, 1), padding=dp(10))
-                card2_layout = MDBoxLayout(orientation='vertical')
-                card2_layout.add_widget(MDLabel(text=ex2[0], halign="center"))
-                card2_layout.add_widget(MDLabel(text=ex2[2], halign="center", font_style="Caption"))
-                card2.add_widget(card2_layout)
-                row.add_widget(card2)
-            
-            exercise_layout.add_widget(row)
-        
-        layout.add_widget(exercise_layout)
+        # Exercise grid (recycled, like the food grid)
+        self.exercise_list = recycle_view(CatalogueCard, cols=2)
+        self.exercise_list.data = [LOADING_ROW]
+        layout.add_widget(self.exercise_list)
         
         # Create routine button
         create_routine_btn = MDRaisedButton(
@@ -404,8 +567,18 @@ class ExerciseScreen(MDScreen):
 class PantryScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.db = Database()
         self.setup_ui()
+        self.refresh()
+    
+    def refresh(self, *args):
+        MDApp.get_running_app().load(lambda data: data.get_pantry_items(Config.LOCAL_USER_ID),
+                                     on_result=self.show_items)
+    
+    def show_items(self, items):
+        self.pantry_list.data = [
+            {'text': f"{custom_name or name_bangla} - {custom_calories or calories_per_100g} ক্যালরি"}
+            for name_bangla, calories_per_100g, custom_name, custom_calories in items
+        ] or [{'text': "প্যান্ট্রি খালি"}]  # Pantry is empty
         
     def setup_ui(self):
         layout = MDBoxLayout(orientation='vertical', spacing=dp(10), padding=dp(16))
@@ -436,25 +609,10 @@ class PantryScreen(MDScreen):
         )
         layout.add_widget(pantry_label)
         
-        # Scrollable pantry list
-        scroll = MDScrollView()
-        pantry_list = MDList()
-        
-        # Dummy pantry items
-        pantry_items = [
-            "ভাত (১ কাপ) - ১৩০ ক্যালরি",
-            "মাছ (১০০ গ্রাম) - ১২০ ক্যালরি",
-            "ডিম (১টি) - ৭০ ক্যালরি",
-            "দুধ (১ গ্লাস) - ১৫০ ক্যালরি",
-            "কলা (১টি) - ১০৫ ক্যালরি",
-            "আপেল (১টি) - ৯৫ ক্যালরি"
-        ]
-        
-        for item in pantry_items:
-            pantry_list.add_widget(OneLineListItem(text=item))
-        
-        scroll.add_widget(pantry_list)
-        layout.add_widget(scroll)
+        # Recycled list of pantry rows, with a placeholder until the pantry is loaded
+        self.pantry_list = recycle_view(OneLineListItem, row_height=dp(48))
+        self.pantry_list.data = [{'text': "লোড হচ্ছে..."}]
+        layout.add_widget(self.pantry_list)
         
         self.add_widget(layout)
     
@@ -465,8 +623,17 @@ class PantryScreen(MDScreen):
 class ProfileScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.db = Database()
         self.setup_ui()
+        MDApp.get_running_app().load(lambda data: data.get_user(Config.LOCAL_USER_ID), on_result=self.show_user)
+    
+    def show_user(self, user):
+        if not user:
+            return
+        self.name_label.text = f"নাম: {user['name']}"
+        self.age_label.text = f"বয়স: {user['age']} বছর"
+        self.weight_label.text = f"ওজন: {float(user['weight']):g} কেজি"
+        self.height_label.text = f"উচ্চতা: {float(user['height']):g} সেমি"
+        self.goal_label.text = f"লক্ষ্য: {Config.get_fitness_goal_text(user['goal'])}"
         
     def setup_ui(self):
         layout = MDBoxLayout(orientation='vertical', spacing=dp(10), padding=dp(16))
@@ -485,11 +652,14 @@ class ProfileScreen(MDScreen):
         profile_card = MDCard(padding=dp(16))
         profile_layout = MDBoxLayout(orientation='vertical', spacing=dp(10))
         
-        profile_layout.add_widget(MDLabel(text="নাম: আহমেদ", font_style="H6"))
-        profile_layout.add_widget(MDLabel(text="বয়স: ২৫ বছর", font_style="Body1"))
-        profile_layout.add_widget(MDLabel(text="ওজন: ৭০ কেজি", font_style="Body1"))
-        profile_layout.add_widget(MDLabel(text="উচ্চতা: ৫'৮\"", font_style="Body1"))
-        profile_layout.add_widget(MDLabel(text="লক্ষ্য: ওজন কমানো", font_style="Body1"))
+        # Placeholders until the profile is loaded
+        self.name_label = MDLabel(text="নাম: ...", font_style="H6")
+        self.age_label = MDLabel(text="বয়স: ...", font_style="Body1")
+        self.weight_label = MDLabel(text="ওজন: ...", font_style="Body1")
+        self.height_label = MDLabel(text="উচ্চতা: ...", font_style="Body1")
+        self.goal_label = MDLabel(text="লক্ষ্য: ...", font_style="Body1")
+        for label in (self.name_label, self.age_label, self.weight_label, self.height_label, self.goal_label):
+            profile_layout.add_widget(label)
         
         profile_card.add_widget(profile_layout)
         layout.add_widget(profile_card)
@@ -522,6 +692,15 @@ class ProfileScreen(MDScreen):
         
         self.add_widget(layout)
 
+# Screen class per bottom navigation tab, built lazily by BangladeshiFitnessApp.ensure_screen
+SCREENS = {
+    "dashboard": DashboardScreen,
+    "food": FoodTrackingScreen,
+    "exercise": ExerciseScreen,
+    "pantry": PantryScreen,
+    "profile": ProfileScreen,
+}
+
 # Database class is now imported from database.py
 
 if __name__ == '__main__':
@@ -0,0 +1,163 @@
+"""
+Versioned schema migrations for the fitness database.
+
+Each migration is applied once and recorded in the ``schema_version`` table,
+so constructing a ``Database`` against an up-to-date schema costs a single
+query (and nothing at all after the first check in a process).
+
+A migration and its version bump run in one transaction, so a failure leaves
+the previous version in place. Processes starting together (web workers, the
+app and the sync engine) are serialized: on SQLite by each migration's
+BEGIN IMMEDIATE, on MySQL by a named GET_LOCK held for the whole run. MySQL
+commits DDL implicitly, so there only the lock and version re-check protect
+a migration from being applied twice.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+def create_tables(db):
+    """Create the initial schema"""
+    db.create_tables()
+
+
+def seed_catalogue(db):
+    """Insert the built-in food and exercise catalogue"""
+    # Databases created before migrations existed already carry the seed rows
+    if db.fetch_one("SELECT COUNT(*) FROM foods")[0] == 0:
+        db.insert_sample_data()
+
+
+def create_log_indexes(db):
+    """Add the composite (user_id, date) indexes on the log tables"""
+    from indexes import IndexManager
+    IndexManager(db).ensure_indexes()
+
+
+def create_daily_summaries(db):
+    """Add the daily_summaries table and backfill it from existing logs"""
+    from summaries import DailySummaryManager, create_table
+    create_table(db)
+    DailySummaryManager(db).rebuild()
+
+
+def create_local_user(db):
+    """Create the device's single user, which the app's logs and profile refer to"""
+    from config import Config
+    if db.fetch_one("SELECT id FROM users WHERE id = %s", (Config.LOCAL_USER_ID,)) is None:
+        db.insert(
+            "INSERT INTO users (id, name, age, weight, height, goal, target_calories) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            (Config.LOCAL_USER_ID, 'আহমেদ', 25, 70, 173, 'weight_loss', Config.DEFAULT_CALORIE_GOAL)
+        )
+
+
+# Ordered list of (version, name, function). Append new migrations; never reorder.
+MIGRATIONS = [
+    (1, "create_tables", create_tables),
+    (2, "seed_catalogue", seed_catalogue),
+    (3, "create_log_indexes", create_log_indexes),
+    (4, "create_daily_summaries", create_daily_summaries),
+    (5, "create_local_user", create_local_user),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+class MigrationRunner:
+    """Applies pending migrations and records them in schema_version"""
+
+    # Databases already verified as current in this process
+    _current = set()
+    _lock = threading.Lock()
+
+    # MySQL named lock serializing runners across processes
+    LOCK_NAME = "fitness_schema_migrations"
+    LOCK_TIMEOUT = 60
+
+    def __init__(self, db):
+        self.db = db
+
+    def current_version(self) -> int:
+        """Return the applied schema version, or 0 for a fresh database"""
+        cursor = self.db.connection.cursor()
+        try:
+            cursor.execute("SELECT MAX(version) FROM schema_version")
+            row = cursor.fetchone()
+        except Exception:
+            # schema_version does not exist yet
+            self.db.rollback()
+            return 0
+        return row[0] if row and row[0] else 0
+
+    def pending(self):
+        """Return the migrations that have not been applied yet"""
+        version = self.current_version()
+        return [migration for migration in MIGRATIONS if migration[0] > version]
+
+    def run(self) -> int:
+        """Apply every pending migration in order; return the number applied"""
+        key = self.db.db_manager.database_key()
+        if key in self._current:
+            return 0
+
+        with self._lock:
+            if key in self._current:
+                return 0
+
+            applied = 0
+            if self.pending():
+                with self._process_lock():
+                    self.db.execute_query('''
+                        CREATE TABLE IF NOT EXISTS schema_version (
+                            version INT PRIMARY KEY,
+                            name VARCHAR(255) NOT NULL,
+                            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    ''')
+                    self.db.commit()
+
+                    for version, name, migrate in MIGRATIONS:
+                        with self.db.transaction(immediate=True):
+                            # Re-read under the lock: another process may have applied it meanwhile
+                            if version <= self.current_version():
+                                continue
+                            print(f"Applying migration {version}: {name}")
+                            migrate(self.db)
+                            self.db.insert(
+                                "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                                (version, name)
+                            )
+                            applied += 1
+
+            self._current.add(key)
+            return applied
+
+    @contextmanager
+    def _process_lock(self):
+        """Hold MySQL's named migration lock; SQLite locks per migration with BEGIN IMMEDIATE"""
+        if self.db.db_manager.database_type != "mysql":
+            yield
+            return
+        (acquired,) = self.db.fetch_one("SELECT GET_LOCK(%s, %s)", (self.LOCK_NAME, self.LOCK_TIMEOUT))
+        if not acquired:
+            raise TimeoutError(f"Another process held the migration lock for over {self.LOCK_TIMEOUT}s")
+        try:
+            yield
+        finally:
+            self.db.fetch_one("SELECT RELEASE_LOCK(%s)", (self.LOCK_NAME,))
+
+    @classmethod
+    def reset_cache(cls):
+        """Forget which databases are known to be current (e.g. after a restore)"""
+        with cls._lock:
+            cls._current.clear()
+
+
+if __name__ == '__main__':
+    from database import Database
+
+    db = Database()
+    print(f"Schema version: {MigrationRunner(db).current_version()} (latest {LATEST_VERSION})")
+    db.close()
@@ -0,0 +1,111 @@
+"""
+Pure nutrition calculations (BMR, TDEE, calorie goals, macros).
+
+Kept free of database imports so scripts that only compute targets start
+quickly; ``utils`` re-exports ``FitnessUtils`` for existing callers.
+
+``FitnessUtils.calculate_targets_batch`` computes the same targets for many
+users at once with NumPy (imported on first use), giving results identical to
+the scalar methods.
+"""
+
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,      # Little or no exercise
+    'light': 1.375,         # Light exercise 1-3 days/week
+    'moderate': 1.55,       # Moderate exercise 3-5 days/week
+    'active': 1.725,        # Hard exercise 6-7 days/week
+    'very_active': 1.9      # Very hard exercise, physical job
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.2
+
+# Daily calorie adjustment per goal (maintenance and unknown goals: none)
+CALORIE_ADJUSTMENTS = {
+    'weight_loss': -500,   # 500 calorie deficit
+    'weight_gain': 300,    # 300 calorie surplus
+}
+
+MACRO_RATIOS = {
+    'weight_loss': {'protein': 0.3, 'carbs': 0.4, 'fat': 0.3},
+    'weight_gain': {'protein': 0.25, 'carbs': 0.55, 'fat': 0.2},
+    'maintenance': {'protein': 0.25, 'carbs': 0.5, 'fat': 0.25},
+}
+CALORIES_PER_GRAM = {'protein': 4, 'carbs': 4, 'fat': 9}
+
+class FitnessUtils:
+    def __init__(self, db_connection=None):
+        self.db = db_connection
+    
+    def calculate_bmr(self, weight, height, age, gender):
+        """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
+        if gender.lower() == 'male':
+            bmr = 10 * weight + 6.25 * height - 5 * age + 5
+        else:
+            bmr = 10 * weight + 6.25 * height - 5 * age - 161
+        return round(bmr)
+    
+    def calculate_tdee(self, bmr, activity_level):
+        """Calculate Total Daily Energy Expenditure"""
+        return round(bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER))
+    
+    def get_calorie_goal(self, tdee, goal):
+        """Calculate calorie goal based on fitness objective"""
+        return tdee + CALORIE_ADJUSTMENTS.get(goal, 0)
+    
+    def get_macro_ratios(self, goal):
+        """Get macro ratios based on fitness goal"""
+        return dict(MACRO_RATIOS.get(goal, MACRO_RATIOS['maintenance']))
+    
+    def calculate_macros(self, calories, goal):
+        """Calculate macro targets in grams"""
+        ratios = self.get_macro_ratios(goal)
+        macros = {}
+        macros['protein'] = round((calories * ratios['protein']) / 4)  # 4 cal/g
+        macros['carbs'] = round((calories * ratios['carbs']) / 4)      # 4 cal/g
+        macros['fat'] = round((calories * ratios['fat']) / 9)          # 9 cal/g
+        return macros
+    
+    def calculate_targets_batch(self, weights, heights, ages, genders, activity_levels, goals):
+        """Calculate BMR, TDEE, calorie goal and macro grams for many users at once
+        
+        Takes equal-length sequences (lists, NumPy arrays or DataFrame columns) and
+        returns a dict of int64 arrays keyed 'bmr', 'tdee', 'calorie_goal',
+        'protein', 'carbs' and 'fat', element-for-element equal to the scalar methods.
+        """
+        import numpy as np
+        
+        weights = np.asarray(weights, dtype=np.float64)
+        heights = np.asarray(heights, dtype=np.float64)
+        ages = np.asarray(ages, dtype=np.float64)
+        
+        # Categorical columns are mapped once per distinct value, then gathered by code
+        gender_keys, gender_codes = _categories(np, genders)
+        level_keys, level_codes = _categories(np, activity_levels)
+        goal_keys, goal_codes = _categories(np, goals)
+        
+        # Same operation order as calculate_bmr, so float results match bit for bit;
+        # np.rint rounds half to even like round()
+        is_male = np.array([str(gender).lower() == 'male' for gender in gender_keys], dtype=bool)[gender_codes]
+        bmr = np.rint(np.where(is_male,
+                               10 * weights + 6.25 * heights - 5 * ages + 5,
+                               10 * weights + 6.25 * heights - 5 * ages - 161))
+        
+        multipliers = np.array([ACTIVITY_MULTIPLIERS.get(level, DEFAULT_ACTIVITY_MULTIPLIER)
+                                for level in level_keys], dtype=np.float64)[level_codes]
+        tdee = np.rint(bmr * multipliers)
+        calorie_goal = tdee + np.array([CALORIE_ADJUSTMENTS.get(goal, 0) for goal in goal_keys],
+                                       dtype=np.float64)[goal_codes]
+        
+        targets = {'bmr': bmr, 'tdee': tdee, 'calorie_goal': calorie_goal}
+        for macro, calories_per_gram in CALORIES_PER_GRAM.items():
+            ratios = np.array([self.get_macro_ratios(goal)[macro] for goal in goal_keys],
+                              dtype=np.float64)[goal_codes]
+            targets[macro] = np.rint((calorie_goal * ratios) / calories_per_gram)
+        return {name: values.astype(np.int64) for name, values in targets.items()}
+
+def _categories(np, keys):
+    """Return (distinct keys, code of each row) for a column of categorical values"""
+    if hasattr(keys, 'tolist'):
+        keys = keys.tolist()
+    codes = {}
+    rows = np.fromiter((codes.setdefault(key, len(codes)) for key in keys), dtype=np.intp, count=len(keys))
+    return list(codes), rows
@@ -0,0 +1,63 @@
+"""
+Keyset (cursor) pagination helpers for the JSON API.
+
+Pages are selected with ``WHERE id > :last_id ORDER BY id LIMIT :n`` rather
+than OFFSET, so every page costs the same however deep the client scrolls.
+The cursor handed to clients is an opaque URL-safe token wrapping the last id.
+"""
+
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(last_id):
+    """Return an opaque cursor for the row after ``last_id``"""
+    raw = json.dumps({'after': last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the last id wrapped in a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))['after']
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(last_id, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return last_id
+
+
+def page_size(requested):
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    if not requested:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(requested), MAX_PAGE_SIZE))
+
+
+def keyset_page(query, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=False):
+    """Return (items, next_cursor) for one page of a SQLAlchemy query
+
+    ``next_cursor`` is None on the last page.
+    """
+    if cursor:
+        last_id = decode_cursor(cursor)
+        query = query.filter(id_column < last_id if descending else id_column > last_id)
+    query = query.order_by(id_column.desc() if descending else id_column)
+
+    # Fetch one extra row to learn whether another page exists
+    items = query.limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        return items, encode_cursor(items[-1].id)
+    return items, None
+
+
+def select_fields(item, fields):
+    """Keep only the requested keys of a serialized item (all of them if fields is empty)"""
+    if not fields:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
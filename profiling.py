@@ -0,0 +1,287 @@
+"""
+Query profiling for the raw SQL in ``Database``.
+
+Every statement that goes through ``Database`` is timed and recorded under its
+fingerprint: the SQL with literals and placeholders replaced by ``?`` and
+whitespace collapsed, so the same query with different parameters is counted
+together. Per fingerprint the profiler keeps a latency histogram, row counts,
+errors and which functions issued it (e.g. ``DataManager.get_meal_logs``).
+
+Statements slower than ``Config.SLOW_QUERY_MS`` go to a bounded slow-query
+log, and the first slow run of each SELECT fingerprint is EXPLAINed so the
+plan is at hand. ``query_profiler.report()`` returns the numbers,
+``to_prometheus()`` renders them for scraping and ``serve_metrics`` exposes
+them over HTTP for processes without a web server (the Kivy app, scripts).
+"""
+
+import bisect
+import json
+import re
+import sys
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from config import Config
+
+# Histogram bucket upper bounds in seconds (Prometheus conventions)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+OTHER_FINGERPRINT = 'other'
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """Normalize a statement so executions differing only in values share one key"""
+    query = _STRING.sub('?', query)
+    query = _NUMBER.sub('?', query)
+    query = _PLACEHOLDER.sub('?', query)
+    query = _WHITESPACE.sub(' ', query).strip()
+    # IN lists and multi-row VALUES of any length look the same
+    return _LIST.sub('(...)', query)
+
+
+def _caller() -> str:
+    """Qualified name of the first function outside this module and database.py"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.endswith(('database.py', 'profiling.py')):
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    code = frame.f_code
+    return getattr(code, 'co_qualname', code.co_name)
+
+
+class Histogram:
+    """Latency histogram over ``LATENCY_BUCKETS`` with percentile estimates"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Estimate a latency percentile (seconds) by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            if bucket_count and seen + bucket_count >= target:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return min(lower + (upper - lower) * (target - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary_ms(self) -> Dict[str, float]:
+        """Mean, p50/p95/p99 and max in milliseconds"""
+        return {
+            'mean_ms': round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.5) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+    def prometheus(self, name: str, labels: str) -> List[str]:
+        """_bucket/_sum/_count sample lines; ``labels`` is the rendered label list, e.g. 'query="..."'"""
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), self.buckets):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class _QueryStat(Histogram):
+    """Counters for one fingerprint"""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = 0
+        self.rows = 0
+        self.callers = Counter()
+
+
+class QueryProfiler:
+    """Thread-safe per-fingerprint query statistics and slow-query log"""
+
+    def __init__(self, enabled=None, slow_ms=None, slow_log_size=None, explain=None, max_fingerprints=None):
+        self.enabled = Config.QUERY_PROFILING if enabled is None else enabled
+        self.slow_ms = Config.SLOW_QUERY_MS if slow_ms is None else slow_ms
+        self.explain = Config.SLOW_QUERY_EXPLAIN if explain is None else explain
+        self.max_fingerprints = max_fingerprints or Config.QUERY_STATS_MAX_FINGERPRINTS
+        self.slow_queries = deque(maxlen=slow_log_size or Config.SLOW_QUERY_LOG_SIZE)
+        self.plans = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+
+    def record(self, query: str, duration: float, rows: int = None, error: bool = False,
+               params=None, explain=None) -> str:
+        """Record one execution; ``explain()`` returns its plan and is only called for new slow SELECTs"""
+        key = fingerprint(query)
+        caller = _caller()
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    key = OTHER_FINGERPRINT
+                stat = self._stats.setdefault(key, _QueryStat())
+            stat.observe(duration)
+            stat.callers[caller] += 1
+            if error:
+                stat.errors += 1
+            elif rows is not None and rows >= 0:
+                stat.rows += rows
+
+        if duration * 1000 >= self.slow_ms and not error:
+            self._log_slow(key, query, duration, rows, params, caller, explain)
+        return key
+
+    def _log_slow(self, key, query, duration, rows, params, caller, explain):
+        plan = self.plans.get(key)
+        if (plan is None and explain is not None and self.explain
+                and key.upper().startswith('SELECT')):
+            try:
+                plan = self.plans[key] = explain()
+            except Exception as e:
+                plan = self.plans[key] = [{'error': str(e)}]
+        entry = {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'duration_ms': round(duration * 1000, 2),
+            'fingerprint': key,
+            'query': _WHITESPACE.sub(' ', query).strip(),
+            'params': [str(param) for param in params] if params else [],
+            'rows': rows,
+            'caller': caller,
+            'plan': plan,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+        print(f"🐢 Slow query ({entry['duration_ms']} ms, {caller}): {entry['query'][:200]}")
+
+    def reset(self):
+        """Forget all statistics, plans and slow queries"""
+        with self._lock:
+            self._stats = {}
+            self.plans = {}
+            self.slow_queries.clear()
+            self.started_at = datetime.now()
+
+    def report(self, top: int = None) -> List[Dict[str, Any]]:
+        """Per-fingerprint statistics, the fingerprints costing the most total time first"""
+        with self._lock:
+            items = [(key, stat) for key, stat in self._stats.items()]
+            rows = [dict({
+                'fingerprint': key,
+                'count': stat.count,
+                'errors': stat.errors,
+                'rows': stat.rows,
+                'total_ms': round(stat.total * 1000, 3),
+            }, **stat.summary_ms(), callers=dict(stat.callers.most_common())) for key, stat in items]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows[:top] if top else rows
+
+    def by_caller(self) -> List[Dict[str, Any]]:
+        """Query count and estimated DB time per calling function, most time first"""
+        totals = {}
+        with self._lock:
+            for stat in self._stats.values():
+                mean = stat.total / stat.count
+                for caller, count in stat.callers.items():
+                    entry = totals.setdefault(caller, {'caller': caller, 'queries': 0, 'total_ms': 0.0})
+                    entry['queries'] += count
+                    entry['total_ms'] += mean * count * 1000
+        for entry in totals.values():
+            entry['total_ms'] = round(entry['total_ms'], 3)
+        return sorted(totals.values(), key=lambda entry: entry['total_ms'], reverse=True)
+
+    def to_prometheus(self) -> str:
+        """Statistics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP db_query_duration_seconds Raw SQL execution time by query fingerprint',
+            '# TYPE db_query_duration_seconds histogram',
+        ]
+        counters = []
+        with self._lock:
+            for key, stat in sorted(self._stats.items()):
+                label = f'query="{escape_label(key)}"'
+                lines += stat.prometheus('db_query_duration_seconds', label)
+                counters.append((label, stat))
+            slow = len(self.slow_queries)
+        lines += ['# HELP db_query_rows_total Rows returned or affected by query fingerprint',
+                  '# TYPE db_query_rows_total counter']
+        lines += [f'db_query_rows_total{{{label}}} {stat.rows}' for label, stat in counters]
+        lines += ['# HELP db_query_errors_total Failed executions by query fingerprint',
+                  '# TYPE db_query_errors_total counter']
+        lines += [f'db_query_errors_total{{{label}}} {stat.errors}' for label, stat in counters]
+        lines += ['# HELP db_slow_queries_logged Entries currently in the slow-query log',
+                  '# TYPE db_slow_queries_logged gauge',
+                  f'db_slow_queries_logged {slow}']
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every Database in the process
+query_profiler = QueryProfiler()
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1', profiler: QueryProfiler = None):
+    """Serve /metrics (Prometheus text), /queries and /slow_queries (JSON) on a daemon thread
+
+    Returns the server; call ``shutdown()`` on it to stop.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    profiler = profiler or query_profiler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/metrics':
+                body, content_type = profiler.to_prometheus(), 'text/plain; version=0.0.4'
+            elif path == '/queries':
+                body, content_type = json.dumps({'queries': profiler.report(), 'callers': profiler.by_caller()},
+                                                ensure_ascii=False, default=str), 'application/json'
+            elif path == '/slow_queries':
+                body, content_type = json.dumps(list(profiler.slow_queries), ensure_ascii=False,
+                                                default=str), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
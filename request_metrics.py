@@ -0,0 +1,237 @@
+"""
+Request-level latency metrics and tracing for the Flask app.
+
+``RequestMetrics`` hooks into a Flask app and records, per endpoint:
+
+- request latency (histogram, so p50/p95/p99 can be read off),
+- request counts by method and status,
+- SQL statements and time spent in them per request, from SQLAlchemy
+  ``before/after_cursor_execute`` engine events,
+- template render time per template, from Flask's template signals.
+
+``to_prometheus()`` renders everything in the Prometheus text format (served
+at ``/metrics`` by web_app) and ``report()`` returns the same numbers as dicts.
+
+A sample of requests (``Config.TRACE_SAMPLE_RATE``) plus every request slower
+than ``Config.TRACE_SLOW_MS`` is written to ``Config.TRACE_PATH`` as one JSON
+line holding the request's individual SQL statements and template renders.
+
+Metrics are per process; under a multi-worker server each worker reports its
+own.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import Config
+from profiling import Histogram, escape_label, fingerprint
+
+
+class _EndpointStats:
+    """Latency, DB and status counters for one endpoint"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.db_time = Histogram()
+        self.db_queries = 0
+        self.template_time = 0.0
+        self.statuses = {}  # (method, status) -> count
+
+
+class RequestMetrics:
+    """Per-endpoint latency, DB and template metrics for a Flask app"""
+
+    def __init__(self, app=None, trace_sample_rate=None, trace_slow_ms=None, trace_path=None):
+        self.trace_sample_rate = Config.TRACE_SAMPLE_RATE if trace_sample_rate is None else trace_sample_rate
+        self.trace_slow_ms = Config.TRACE_SLOW_MS if trace_slow_ms is None else trace_slow_ms
+        self.trace_path = Config.TRACE_PATH if trace_path is None else trace_path
+        self._endpoints = {}
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._trace_lock = threading.Lock()
+        self.traces_written = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._start_request)
+        app.teardown_request(self._finish_request)
+        # after_request handlers run in reverse order, so this sees the final status
+        app.after_request(self._record_status)
+        before_render_template.connect(self._start_template, app, weak=False)
+        template_rendered.connect(self._finish_template, app, weak=False)
+        # Every engine in the process; statements outside a request are ignored
+        event.listen(Engine, 'before_cursor_execute', self._start_query)
+        event.listen(Engine, 'after_cursor_execute', self._finish_query)
+
+    # Request lifecycle
+
+    def _start_request(self):
+        g.metrics = {
+            'owner': self,
+            'started': time.perf_counter(),
+            'status': 500,
+            'db_queries': 0,
+            'db_time': 0.0,
+            'template_time': 0.0,
+            'template_started': [],
+            'trace': self.trace_sample_rate > 0 and random.random() < self.trace_sample_rate,
+            'statements': [],
+            'templates': [],
+        }
+
+    def _record_status(self, response):
+        if 'metrics' in g:
+            g.metrics['status'] = response.status_code
+        return response
+
+    def _finish_request(self, error=None):
+        state = g.pop('metrics', None)
+        if state is None:
+            return
+        duration = time.perf_counter() - state['started']
+        endpoint = request.endpoint or 'unmatched'
+        status = 500 if error is not None else state['status']
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            stats.latency.observe(duration)
+            stats.db_time.observe(state['db_time'])
+            stats.db_queries += state['db_queries']
+            stats.template_time += state['template_time']
+            key = (request.method, status)
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+
+        if self.trace_path and (state['trace'] or duration * 1000 >= self.trace_slow_ms):
+            self._write_trace(endpoint, status, duration, state)
+
+    # SQLAlchemy engine events
+
+    def _request_state(self):
+        """This request's counters, if it is a request to the app this instance measures"""
+        if not has_request_context():
+            return None
+        state = g.get('metrics')
+        return state if state is not None and state['owner'] is self else None
+
+    def _start_query(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and self._request_state() is not None:
+            context.metrics_started = time.perf_counter()
+
+    def _finish_query(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_started', None)
+        state = self._request_state()
+        if started is None or state is None:
+            return
+        context.metrics_started = None
+        elapsed = time.perf_counter() - started
+        state['db_queries'] += 1
+        state['db_time'] += elapsed
+        if self.trace_path:
+            # Kept for every request since slowness is only known at the end
+            state['statements'].append((statement, elapsed))
+
+    # Template signals
+
+    def _start_template(self, sender, template, context, **extra):
+        if 'metrics' in g:
+            g.metrics['template_started'].append(time.perf_counter())
+
+    def _finish_template(self, sender, template, context, **extra):
+        if 'metrics' not in g or not g.metrics['template_started']:
+            return
+        elapsed = time.perf_counter() - g.metrics['template_started'].pop()
+        name = template.name or '<string>'
+        g.metrics['template_time'] += elapsed
+        g.metrics['templates'].append((name, elapsed))
+        with self._lock:
+            histogram = self._templates.get(name)
+            if histogram is None:
+                histogram = self._templates[name] = Histogram()
+            histogram.observe(elapsed)
+
+    # Output
+
+    def _write_trace(self, endpoint, status, duration, state):
+        trace = {
+            'trace_id': uuid.uuid4().hex,
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'sampled': state['trace'],
+            'db_ms': round(state['db_time'] * 1000, 3),
+            'template_ms': round(state['template_time'] * 1000, 3),
+            'statements': [{'sql': fingerprint(statement), 'ms': round(elapsed * 1000, 3)}
+                           for statement, elapsed in state['statements']],
+            'templates': [{'name': name, 'ms': round(elapsed * 1000, 3)} for name, elapsed in state['templates']],
+        }
+        line = json.dumps(trace, ensure_ascii=False) + '\n'
+        try:
+            with self._trace_lock:
+                with open(self.trace_path, 'a', encoding='utf-8') as trace_file:
+                    trace_file.write(line)
+                self.traces_written += 1
+        except OSError as e:
+            print(f"Could not write request trace: {e}")
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self._templates = {}
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-endpoint latency percentiles and mean DB/template cost, slowest p99 first"""
+        with self._lock:
+            rows = []
+            for endpoint, stats in self._endpoints.items():
+                count = stats.latency.count
+                rows.append(dict({
+                    'endpoint': endpoint,
+                    'requests': count,
+                    'errors': sum(n for (_, status), n in stats.statuses.items() if status >= 500),
+                }, **stats.latency.summary_ms(),
+                    db_queries_per_request=round(stats.db_queries / count, 2),
+                    db_ms_per_request=round(stats.db_time.total * 1000 / count, 3),
+                    db_p99_ms=round(stats.db_time.percentile(0.99) * 1000, 3),
+                    template_ms_per_request=round(stats.template_time * 1000 / count, 3)))
+        rows.sort(key=lambda row: row['p99_ms'], reverse=True)
+        return rows
+
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        latency = ['# HELP http_request_duration_seconds Request latency by endpoint',
+                   '# TYPE http_request_duration_seconds histogram']
+        requests_total = ['# HELP http_requests_total Requests by endpoint, method and status',
+                          '# TYPE http_requests_total counter']
+        db_time = ['# HELP http_request_db_duration_seconds SQL time per request by endpoint',
+                   '# TYPE http_request_db_duration_seconds histogram']
+        db_queries = ['# HELP http_request_db_queries_total SQL statements executed by endpoint',
+                      '# TYPE http_request_db_queries_total counter']
+        templates = ['# HELP template_render_duration_seconds Template render time by template',
+                     '# TYPE template_render_duration_seconds histogram']
+        with self._lock:
+            for endpoint, stats in sorted(self._endpoints.items()):
+                label = f'endpoint="{escape_label(endpoint)}"'
+                latency += stats.latency.prometheus('http_request_duration_seconds', label)
+                db_time += stats.db_time.prometheus('http_request_db_duration_seconds', label)
+                db_queries.append(f'http_request_db_queries_total{{{label}}} {stats.db_queries}')
+                for (method, status), count in sorted(stats.statuses.items()):
+                    requests_total.append(
+                        f'http_requests_total{{{label},method="{method}",status="{status}"}} {count}')
+            for name, histogram in sorted(self._templates.items()):
+                templates += histogram.prometheus('template_render_duration_seconds',
+                                                  f'template="{escape_label(name)}"')
+        return '\n'.join(latency + requests_total + db_time + db_queries + templates) + '\n'
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Bangladeshi Fitness App - Production Web Server
+Runs web_app under gunicorn with several pre-forked worker processes, for use
+behind a reverse proxy (nginx etc.). ``run_web_app.py`` remains the
+single-process debug server for development.
+
+The app, its tables and its per-process caches (food search index, compiled
+templates) are loaded once in the master before forking, so workers start warm
+and share that memory copy-on-write. Each worker opens its own database
+connections after the fork.
+
+Reloading (send signals to the master, see --pid):
+    kill -HUP <pid>     gracefully restart the workers (new settings, same code)
+    kill -USR2 <pid>    start a new master with new code, then TERM the old one
+"""
+
+import argparse
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = object
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections"""
+    from database import DatabaseManager
+    from web_app import app, db
+
+    # Forget the master's connections without closing them; their sockets are shared with it
+    with app.app_context():
+        db.engine.dispose(close=False)
+    DatabaseManager.discard_pools()
+
+
+class FitnessServer(BaseApplication):
+    """gunicorn application that preloads web_app before forking workers"""
+
+    def __init__(self, options, proxy_count=0):
+        self.options = options
+        self.proxy_count = proxy_count
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from web_app import app, db, init_db, warm_up
+
+        init_db()
+        warm_up()
+        # The master never serves requests; close what start-up opened so nothing is inherited
+        with app.app_context():
+            db.engine.dispose()
+
+        if self.proxy_count:
+            from werkzeug.middleware.proxy_fix import ProxyFix
+            return ProxyFix(app, x_for=self.proxy_count, x_proto=self.proxy_count,
+                            x_host=self.proxy_count, x_prefix=self.proxy_count)
+        return app
+
+
+def build_options(args):
+    """Translate command-line arguments into gunicorn settings"""
+    options = {
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'post_fork': post_fork,
+        'accesslog': '-' if args.access_log else None,
+        'errorlog': '-',
+        'proc_name': 'fitness-web',
+    }
+    if args.pid:
+        options['pidfile'] = args.pid
+    if args.proxy_count:
+        # The proxy's address; gunicorn trusts X-Forwarded-* headers only from these
+        options['forwarded_allow_ips'] = args.forwarded_allow_ips
+    return options
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the fitness web app with multiple worker processes")
+    parser.add_argument('--host', default=Config.SERVE_HOST, help="address to bind (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=Config.SERVE_PORT, help="port to bind (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=Config.SERVE_WORKERS,
+                        help="worker processes (default: one per core, %(default)s)")
+    parser.add_argument('--threads', type=int, default=Config.SERVE_THREADS,
+                        help="threads per worker (default: %(default)s)")
+    parser.add_argument('--timeout', type=int, default=Config.SERVE_TIMEOUT,
+                        help="seconds before a stuck worker is restarted (default: %(default)s)")
+    parser.add_argument('--graceful-timeout', type=int, default=Config.SERVE_GRACEFUL_TIMEOUT,
+                        help="seconds workers get to finish requests on reload/stop (default: %(default)s)")
+    parser.add_argument('--max-requests', type=int, default=Config.SERVE_MAX_REQUESTS,
+                        help="recycle a worker after this many requests, 0 to never (default: %(default)s)")
+    parser.add_argument('--proxy-count', type=int, default=0,
+                        help="number of reverse proxies in front of the app whose X-Forwarded-* headers to trust")
+    parser.add_argument('--forwarded-allow-ips', default='127.0.0.1',
+                        help="proxy addresses allowed to set X-Forwarded-* (default: %(default)s)")
+    parser.add_argument('--pid', help="write the master's pid to this file (for reload signals)")
+    parser.add_argument('--access-log', action='store_true', help="log every request to stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    if BaseApplication is object:
+        print("❌ gunicorn is not installed")
+        print("💡 Install it with: pip3 install -r requirements.txt")
+        print("   (or use run_web_app.py for the development server)")
+        sys.exit(1)
+
+    args = parse_args(argv)
+    print(f"🚀 Serving Bangladeshi Fitness App on http://{args.host}:{args.port} "
+          f"({args.workers} workers x {args.threads} threads)")
+    FitnessServer(build_options(args), proxy_count=args.proxy_count).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Materialized per-user, per-day totals.
+
+``daily_summaries`` holds one row per (user_id, date) that DataManager keeps
+up to date on every log write, so daily totals are a primary-key lookup
+instead of a join and SUM over the raw logs. ``rebuild`` recomputes rows
+from the logs for backfills or after bulk imports.
+"""
+
+from typing import Any, Dict
+
+SUMMARY_COLUMNS = ('calories', 'protein', 'carbs', 'fat', 'water_glasses', 'exercise_minutes')
+
+UPSERT_QUERY = '''
+    INSERT INTO daily_summaries
+    (user_id, date, calories, protein, carbs, fat, water_glasses, exercise_minutes)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    calories = calories + VALUES(calories),
+    protein = protein + VALUES(protein),
+    carbs = carbs + VALUES(carbs),
+    fat = fat + VALUES(fat),
+    water_glasses = water_glasses + VALUES(water_glasses),
+    exercise_minutes = exercise_minutes + VALUES(exercise_minutes)
+'''
+
+
+def create_table(db):
+    """Create the daily_summaries table"""
+    db.execute_query('''
+        CREATE TABLE IF NOT EXISTS daily_summaries (
+            user_id INT NOT NULL,
+            date DATE NOT NULL,
+            calories DECIMAL(10,2) NOT NULL DEFAULT 0,
+            protein DECIMAL(8,2) NOT NULL DEFAULT 0,
+            carbs DECIMAL(8,2) NOT NULL DEFAULT 0,
+            fat DECIMAL(8,2) NOT NULL DEFAULT 0,
+            water_glasses INT NOT NULL DEFAULT 0,
+            exercise_minutes INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, date),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+    db.commit()
+
+
+class DailySummaryManager:
+    """Reads and incrementally maintains daily_summaries"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def add(self, user_id, date, calories=0, protein=0, carbs=0, fat=0, water_glasses=0, exercise_minutes=0):
+        """Add to a day's totals (not committed; call inside the log write's ``db.transaction()``)"""
+        self.db.execute_query(UPSERT_QUERY, (
+            user_id, date, calories, protein, carbs, fat, water_glasses, exercise_minutes
+        ))
+
+    def get(self, user_id, date) -> Dict[str, Any]:
+        """Return a day's totals, all zero if nothing was logged"""
+        row = self.db.fetch_one(f'''
+            SELECT {', '.join(SUMMARY_COLUMNS)}
+            FROM daily_summaries
+            WHERE user_id = %s AND date = %s
+        ''', (user_id, date))
+        return dict(zip(SUMMARY_COLUMNS, row or (0,) * len(SUMMARY_COLUMNS)))
+
+    def rebuild(self, user_id=None, start_date=None, end_date=None) -> int:
+        """Recompute summaries from the raw logs; return the number of (user, day) rows written
+
+        Runs as one transaction: readers keep seeing the old totals until the new
+        ones commit, and a failure leaves the old ones in place.
+        """
+        conditions = []
+        params = []
+        if user_id is not None:
+            conditions.append("{prefix}user_id = %s")
+            params.append(user_id)
+        if start_date is not None:
+            conditions.append("{prefix}date >= %s")
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("{prefix}date <= %s")
+            params.append(end_date)
+        params = tuple(params)
+
+        def where(prefix=''):
+            if not conditions:
+                return ''
+            return 'WHERE ' + ' AND '.join(conditions).format(prefix=prefix)
+
+        with self.db.transaction():
+            self.db.execute_query(f"DELETE FROM daily_summaries {where()}", params)
+
+            food_totals = self.db.fetch_all(f'''
+                SELECT fl.user_id, fl.date,
+                       SUM(f.calories_per_100g * fl.amount / 100.0),
+                       SUM(f.protein * fl.amount / 100.0),
+                       SUM(f.carbs * fl.amount / 100.0),
+                       SUM(f.fat * fl.amount / 100.0),
+                       0, 0
+                FROM food_logs fl
+                JOIN foods f ON fl.food_id = f.id
+                {where('fl.')}
+                GROUP BY fl.user_id, fl.date
+            ''', params)
+            water_totals = self.db.fetch_all(f'''
+                SELECT user_id, date, 0, 0, 0, 0, SUM(glasses), 0
+                FROM water_logs
+                {where()}
+                GROUP BY user_id, date
+            ''', params)
+            exercise_totals = self.db.fetch_all(f'''
+                SELECT user_id, date, 0, 0, 0, 0, 0, SUM(duration)
+                FROM exercise_logs
+                {where()}
+                GROUP BY user_id, date
+            ''', params)
+
+            # Each source contributes its own columns; the upsert adds them together
+            self.db.insert_many(UPSERT_QUERY, food_totals + water_totals + exercise_totals, commit=False)
+        return len({(row[0], str(row[1])) for row in food_totals + water_totals + exercise_totals})
+
+
+if __name__ == '__main__':
+    import argparse
+    from database import Database
+
+    parser = argparse.ArgumentParser(description="Rebuild daily_summaries from the raw logs")
+    parser.add_argument('--user', type=int, help="only rebuild this user id")
+    parser.add_argument('--start', help="first date to rebuild (YYYY-MM-DD)")
+    parser.add_argument('--end', help="last date to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    db = Database()
+    rows = DailySummaryManager(db).rebuild(args.user, args.start, args.end)
+    print(f"✅ Rebuilt {rows} daily summaries")
+    db.close()
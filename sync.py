@@ -0,0 +1,406 @@
+"""
+Offline-first sync between the device and the web server.
+
+Log writes on the device are committed to the local database as before and
+also appended to a local journal (its own small SQLite file). A background
+``SyncEngine`` uploads pending journal entries to ``POST /api/logs`` in
+batches and keeps a mirror of the catalogue from ``/api/foods`` and
+``/api/exercises``, so the UI thread never waits on the network.
+
+- Logs are append-only, so there is nothing to merge: each journal entry
+  carries a UUID ``event_id`` and the server ignores ids it has already
+  stored, which makes re-uploading after a lost response safe. Entries stay
+  pending until the server confirms they are committed; a 202 (only queued)
+  is uploaded again on the next sync.
+- The server owns the catalogue. Each sync revalidates it with the ETag of
+  the last download, which covers the whole catalogue, so an unchanged one
+  costs a single bodiless 304. When it changed, every page is fetched (gzip,
+  keyset cursor) and replaces the mirror, so renamed, re-valued and deleted
+  items are picked up too.
+- Foods and exercises are journaled by both names (and the local id) and
+  mapped to server ids at upload time, since local and server ids and
+  English names need not agree.
+- Entries the server can never accept (an item missing from its catalogue,
+  a 4xx response) are set aside as rejected rather than deleted or retried
+  forever; ``on_status`` reports how many there are so the app can show it.
+  Only connection errors, 5xx and 408/429 responses count as being offline.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from catalogue import normalize_name
+from config import Config
+
+# Journal field naming the catalogue item, per log type; the Bangla name and
+# local id are journaled as ``<name field>_bangla`` and ``local_<id field>``
+CATALOGUE_FIELDS = {
+    'food': ('food_name', 'food_id', 'foods'),
+    'exercise': ('exercise_name', 'exercise_id', 'exercises'),
+}
+
+# Upload responses worth retrying later; any other 4xx is final
+RETRYABLE_STATUSES = {408, 429}
+
+
+class SyncJournal:
+    """Append-only local journal of log writes plus a mirror of the server catalogue"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.SYNC_JOURNAL_PATH
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Called after every append (SyncEngine uses it to upload promptly)
+        self.on_append = None
+        with self._lock:
+            catalogue_key = [row[1] for row in self.connection.execute("PRAGMA table_info(catalogue)") if row[5]]
+            if catalogue_key and 'name_key' not in catalogue_key:
+                # Mirrors keyed by (kind, server_id) kept only one name per item: download them again
+                self.connection.execute("DROP TABLE catalogue")
+                self.connection.execute("DELETE FROM sync_state WHERE key LIKE 'catalogue_etag:%'")
+                self.connection.commit()
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_id TEXT NOT NULL UNIQUE,
+                    type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    synced_at TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    rejected_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_journal_pending ON journal (synced_at, seq);
+                CREATE TABLE IF NOT EXISTS catalogue (
+                    kind TEXT NOT NULL,
+                    server_id INTEGER NOT NULL,
+                    name_key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (kind, server_id, name_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_catalogue_name ON catalogue (kind, name_key);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            ''')
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(journal)")}
+            if 'rejected_at' not in columns:
+                # Journals created before rejected entries were kept apart
+                self.connection.execute("ALTER TABLE journal ADD COLUMN rejected_at TEXT")
+                self.connection.commit()
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def append(self, log_type: str, **payload) -> str:
+        """Record a log write; return its event id"""
+        event_id = uuid.uuid4().hex
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO journal (event_id, type, payload, created_at) VALUES (?, ?, ?, ?)",
+                (event_id, log_type, json.dumps(payload, default=str), datetime.now().isoformat())
+            )
+            self.connection.commit()
+        if self.on_append:
+            self.on_append()
+        return event_id
+
+    def pending(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oldest entries not yet uploaded (or rejected)"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT event_id, type, payload, attempts FROM journal "
+                "WHERE synced_at IS NULL AND rejected_at IS NULL ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        return [{'event_id': event_id, 'type': log_type, 'payload': json.loads(payload), 'attempts': attempts}
+                for event_id, log_type, payload, attempts in rows]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM journal WHERE synced_at IS NULL AND rejected_at IS NULL"
+            ).fetchone()[0]
+
+    def rejected(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Entries that could not be uploaded, with the reason"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT event_id, type, payload, error, rejected_at FROM journal "
+                "WHERE rejected_at IS NOT NULL ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        return [{'event_id': event_id, 'type': log_type, 'payload': json.loads(payload), 'error': error,
+                 'rejected_at': rejected_at}
+                for event_id, log_type, payload, error, rejected_at in rows]
+
+    def rejected_count(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM journal WHERE rejected_at IS NOT NULL").fetchone()[0]
+
+    def mark_synced(self, event_ids: List[str]):
+        """Mark entries as stored by the server"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.connection.executemany(
+                "UPDATE journal SET synced_at = ?, error = NULL WHERE event_id = ?",
+                [(now, event_id) for event_id in event_ids]
+            )
+            self.connection.commit()
+
+    def mark_rejected(self, event_ids: List[str], error: str):
+        """Set entries aside as rejected; they are kept until ``retry_rejected``"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.connection.executemany(
+                "UPDATE journal SET rejected_at = ?, error = ? WHERE event_id = ?",
+                [(now, error, event_id) for event_id in event_ids]
+            )
+            self.connection.commit()
+
+    def retry_rejected(self) -> int:
+        """Queue rejected entries for upload again (e.g. after a catalogue fix); return how many"""
+        with self._lock:
+            cursor = self.connection.execute(
+                "UPDATE journal SET rejected_at = NULL, attempts = 0 WHERE rejected_at IS NOT NULL"
+            )
+            self.connection.commit()
+        return cursor.rowcount
+
+    def mark_failed(self, event_ids: List[str], error: str):
+        """Count a failed upload attempt; entries stay pending"""
+        with self._lock:
+            self.connection.executemany(
+                "UPDATE journal SET attempts = attempts + 1, error = ? WHERE event_id = ?",
+                [(error, event_id) for event_id in event_ids]
+            )
+            self.connection.commit()
+
+    def get_state(self, key: str, default: str = None) -> Optional[str]:
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key: str, value: str):
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value)
+            )
+            self.connection.commit()
+
+    def replace_catalogue(self, kind: str, items: List[Dict[str, Any]], etag: str = None):
+        """Replace the mirror of a catalogue with a full download (and remember its ETag)"""
+        rows = []
+        for item in items:
+            data = json.dumps(item)
+            for name in {item.get('name_bangla'), item.get('name_english')} - {None, ''}:
+                rows.append((kind, item['id'], normalize_name(name), data))
+        with self._lock:
+            self.connection.execute("DELETE FROM catalogue WHERE kind = ?", (kind,))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO catalogue (kind, server_id, name_key, data) VALUES (?, ?, ?, ?)", rows
+            )
+            self.connection.execute(
+                "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (f'catalogue_etag:{kind}', etag)
+            )
+            self.connection.commit()
+
+    def server_id(self, kind: str, name: str) -> Optional[int]:
+        """Server id of the mirrored catalogue item with this Bangla or English name"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT server_id FROM catalogue WHERE kind = ? AND name_key = ? ORDER BY server_id LIMIT 1",
+                (kind, normalize_name(name))
+            ).fetchone()
+        return row[0] if row else None
+
+
+class SyncEngine:
+    """Uploads the journal and refreshes the catalogue mirror on a background thread"""
+
+    def __init__(self, journal: SyncJournal, base_url: str, interval: float = None, batch_size: int = None,
+                 max_attempts: int = None, on_status=None):
+        self.journal = journal
+        self.base_url = base_url.rstrip('/')
+        self.interval = interval if interval is not None else Config.SYNC_INTERVAL
+        self.batch_size = batch_size or Config.SYNC_BATCH_SIZE
+        self.max_attempts = max_attempts or Config.SYNC_MAX_ATTEMPTS
+        # ``on_status(online, pending, rejected)`` is called from the sync thread whenever one
+        # of them changes; a Kivy app should hop to the UI thread (Clock.schedule_once)
+        self.on_status = on_status
+        self.http = requests.Session()
+        self.http.headers['Accept-Encoding'] = 'gzip'
+        cookie = journal.get_state('session_cookie')
+        if cookie:
+            # Keeps the same server-side user across app restarts
+            self.http.cookies.set('session', cookie)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.online = None
+        self._status = None
+
+    def start(self):
+        self.journal.on_append = self.trigger
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='sync', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self.journal.on_append = None
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def trigger(self):
+        """Sync as soon as possible (e.g. right after a log write)"""
+        self._wake.set()
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+                self._set_online(True)
+                delay = self.interval
+            except requests.RequestException:
+                # Offline or server unreachable: back off up to ten intervals
+                self._set_online(False)
+                delay = min(delay * 2, self.interval * 10)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _set_online(self, online: bool):
+        self.online = online
+        status = (online, self.journal.pending_count(), self.journal.rejected_count())
+        if status != self._status:
+            self._status = status
+            if self.on_status:
+                self.on_status(*status)
+
+    def sync_once(self) -> Dict[str, int]:
+        """Refresh the catalogue mirror then upload pending entries; raises when offline"""
+        downloaded = sum(self.pull_catalogue(kind) for kind in ('foods', 'exercises'))
+        uploaded = self.push()
+        return {'downloaded': downloaded, 'uploaded': uploaded}
+
+    def pull_catalogue(self, kind: str) -> int:
+        """Download the catalogue again if it changed since the last sync; return how many rows"""
+        etag = self.journal.get_state(f'catalogue_etag:{kind}')
+        items, cursor = [], None
+        while True:
+            params = {'limit': 100}
+            headers = {}
+            if cursor:
+                params['cursor'] = cursor
+            elif etag:
+                headers['If-None-Match'] = etag
+            response = self.http.get(f"{self.base_url}/api/{kind}", params=params, headers=headers, timeout=30)
+            if response.status_code == 304:
+                return 0
+            response.raise_for_status()
+            if not cursor:
+                new_etag = response.headers.get('ETag')
+            page = response.json()
+            items.extend(page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        # A change made while paging gives a newer ETag next time, so it is fetched again then
+        self.journal.replace_catalogue(kind, items, new_etag)
+        return len(items)
+
+    def push(self) -> int:
+        """Upload pending journal entries in batches; return how many the server stored"""
+        uploaded = 0
+        while True:
+            entries = self.journal.pending(self.batch_size)
+            if not entries:
+                return uploaded
+
+            events, sent = [], []
+            for entry in entries:
+                try:
+                    events.append(self._to_event(entry))
+                    sent.append(entry['event_id'])
+                except LookupError as e:
+                    # The mirror was brought up to date by this sync's pull, so the server has no item by
+                    # either name; retry_rejected() queues the entry again if one is added later
+                    self.journal.mark_rejected([entry['event_id']], str(e))
+            if not events:
+                continue
+
+            response = self.http.post(f"{self.base_url}/api/logs", json={'events': events}, timeout=30)
+            self._save_cookie(response)
+            if response.status_code >= 500 or response.status_code in RETRYABLE_STATUSES:
+                response.raise_for_status()
+            if response.status_code >= 400:
+                # Sending the same batch again would fail the same way: set it aside and go on
+                body = self._error_body(response)
+                if response.status_code == 400 and 'index' in body:
+                    # One malformed entry rejects the request; the rest are sent again
+                    sent = [sent[body['index']]]
+                self.journal.mark_rejected(sent, body.get('error') or f"HTTP {response.status_code}")
+                continue
+
+            body = response.json()
+            if body.get('committed') is None:
+                # 202: queued but not (yet) committed, so a crash on the server could still lose them.
+                # They stay pending and are sent again next sync; the server skips stored event ids.
+                return uploaded
+            failed = {sent[item['index']]: item['error'] for item in body.get('failed', [])}
+            self.journal.mark_synced([event_id for event_id in sent if event_id not in failed])
+            uploaded += len(sent) - len(failed)
+            for event_id, error in failed.items():
+                self._fail([entry for entry in entries if entry['event_id'] == event_id], error)
+            # Stop here if anything failed, so the same entries are not retried until the next sync
+            if failed or len(entries) < self.batch_size:
+                return uploaded
+
+    def _to_event(self, entry) -> Dict[str, Any]:
+        event = dict(entry['payload'], type=entry['type'], event_id=entry['event_id'])
+        if entry['type'] in CATALOGUE_FIELDS:
+            name_field, id_field, kind = CATALOGUE_FIELDS[entry['type']]
+            names = [event.pop(name_field, None), event.pop(f'{name_field}_bangla', None)]
+            local_id = event.pop(f'local_{id_field}', None)
+            names = [name for name in names if name]
+            for name in names:
+                server_id = self.journal.server_id(kind, name)
+                if server_id is not None:
+                    event[id_field] = server_id
+                    break
+            else:
+                raise LookupError(f"{' / '.join(names)!r} (local id {local_id}) is not in the server catalogue")
+        return event
+
+    def _fail(self, entries, error):
+        """Count a failed attempt, giving up on entries that keep failing"""
+        self.journal.mark_failed([entry['event_id'] for entry in entries], error)
+        exhausted = [entry['event_id'] for entry in entries if entry['attempts'] + 1 >= self.max_attempts]
+        if exhausted:
+            self.journal.mark_rejected(exhausted, error)
+
+    @staticmethod
+    def _error_body(response) -> Dict[str, Any]:
+        try:
+            body = response.json()
+        except ValueError:
+            # e.g. a proxy's HTML error page
+            return {}
+        return body if isinstance(body, dict) else {}
+
+    def _save_cookie(self, response):
+        cookie = response.cookies.get('session')
+        if cookie:
+            self.journal.set_state('session_cookie', cookie)
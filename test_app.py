@@ -52,6 +52,109 @@ def test_database_connection():
             print(f"❌ SQLite fallback also failed: {e2}")
             return False
 
+def test_sql_dialects():
+    """Test translation of MySQL queries for the SQLite fallback"""
+    print("\n🔁 Testing SQL dialect translation...")
+    
+    try:
+        from database import get_dialect
+        sqlite = get_dialect("sqlite")
+        
+        query = sqlite.translate("INSERT IGNORE INTO foods (name_bangla) VALUES (%s)")
+        assert query == "INSERT OR IGNORE INTO foods (name_bangla) VALUES (?)", query
+        
+        upsert = sqlite.translate(
+            "INSERT INTO pantry (user_id, custom_name) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE custom_name = VALUES(custom_name)"
+        )
+        assert upsert.endswith("ON CONFLICT DO UPDATE SET custom_name = excluded.custom_name"), upsert
+        
+        ddl = sqlite.translate("id INT AUTO_INCREMENT PRIMARY KEY, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+        assert ddl == "id INTEGER PRIMARY KEY AUTOINCREMENT, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP", ddl
+        
+        assert get_dialect("mysql").translate(query) == query
+        assert get_dialect("mariadb") is get_dialect("mysql")
+        try:
+            get_dialect("postgresql")
+            raise AssertionError("unsupported backend accepted")
+        except ValueError as e:
+            assert "unsupported database backend" in str(e), e
+        
+        print("✅ Placeholders, upserts and DDL translated for SQLite")
+        return True
+        
+    except Exception as e:
+        print(f"❌ SQL dialect test failed: {e}")
+        return False
+
+def test_query_profiler():
+    """Test query fingerprints and per-fingerprint statistics"""
+    print("\n🐢 Testing query profiler...")
+    
+    try:
+        from profiling import QueryProfiler, fingerprint
+        
+        assert fingerprint("SELECT * FROM foods WHERE id = %s") == fingerprint("SELECT *  FROM foods\n WHERE id = 42")
+        assert fingerprint("SELECT id FROM foods WHERE id IN (1, 2, 3)") == "SELECT id FROM foods WHERE id IN (...)"
+        
+        profiler = QueryProfiler(enabled=True, slow_ms=50, explain=False)
+        for duration in (0.001, 0.002, 0.003, 0.2):
+            profiler.record("SELECT name_bangla FROM foods WHERE id = %s", duration, rows=1, params=(7,))
+        profiler.record("SELECT broken", 0.001, error=True)
+        
+        report = profiler.report()
+        assert report[0]['count'] == 4 and report[0]['rows'] == 4
+        assert report[0]['max_ms'] == 200 and report[0]['p50_ms'] <= 5
+        assert report[1]['errors'] == 1
+        assert len(profiler.slow_queries) == 1 and profiler.slow_queries[0]['params'] == ['7']
+        assert 'db_query_duration_seconds_count{query="SELECT name_bangla FROM foods WHERE id = ?"} 4' in profiler.to_prometheus()
+        
+        print(f"✅ Profiler recorded {len(report)} fingerprints")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Query profiler test failed: {e}")
+        return False
+
+def test_request_metrics():
+    """Test per-endpoint request, SQL and template metrics on a throwaway Flask app"""
+    print("\n⏱️ Testing request metrics...")
+    
+    try:
+        from flask import Flask, render_template_string
+        from sqlalchemy import create_engine, text
+        from request_metrics import RequestMetrics
+        
+        app = Flask(__name__)
+        engine = create_engine('sqlite://')
+        metrics = RequestMetrics(app, trace_sample_rate=0, trace_path='')
+        
+        @app.route('/page')
+        def page():
+            with engine.connect() as connection:
+                value = connection.execute(text("SELECT 1")).scalar()
+            return render_template_string("{{ value }}", value=value)
+        
+        client = app.test_client()
+        for _ in range(3):
+            assert client.get('/page').data == b'1'
+        client.get('/missing')
+        
+        report = {row['endpoint']: row for row in metrics.report()}
+        assert report['page']['requests'] == 3 and report['page']['db_queries_per_request'] == 1
+        assert report['unmatched']['requests'] == 1
+        exported = metrics.to_prometheus()
+        assert 'http_requests_total{endpoint="page",method="GET",status="200"} 3' in exported
+        assert 'http_requests_total{endpoint="unmatched",method="GET",status="404"} 1' in exported
+        assert 'template_render_duration_seconds_count' in exported
+        
+        print(f"✅ Recorded {len(report)} endpoints")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Request metrics test failed: {e}")
+        return False
+
 def test_food_data():
     """Test food database functionality"""
     print("\n🍽️ Testing food database...")
@@ -75,6 +178,474 @@ def test_food_data():
         print(f"❌ Food data test failed: {e}")
         return False
 
+def test_food_search():
+    """Test fuzzy food search with Bangla normalization and transliteration"""
+    print("\n🔎 Testing food search...")
+    
+    try:
+        from food_search import FoodSearchIndex
+        foods = [dict(food, id=i + 1) for i, food in enumerate(BangladeshiFoodData.get_common_foods())]
+        index = FoodSearchIndex(foods)
+        
+        assert index.search('bhat')[0]['name_bangla'] == 'ভাত'
+        assert index.search('পেয়াজ')[0]['name_bangla'] == 'পেঁয়াজ'
+        assert index.search('fsh')[0]['name_english'] == 'Fish'
+        assert [food['name_english'] for food in index.autocomplete('egg')] == ['Egg', 'Eggplant']
+        
+        print("✅ Transliteration, vowel-sign normalization and typo matching working")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Food search test failed: {e}")
+        return False
+
+def test_write_behind_queue():
+    """Test batched flushing and per-item failure of the ingestion queue"""
+    print("\n📥 Testing write-behind queue...")
+    
+    try:
+        from ingest import QueueFullError, WriteBehindQueue
+        batches = []
+        
+        def flush(items):
+            if 'bad' in items:
+                raise ValueError("bad item")
+            batches.append(items)
+        
+        log_queue = WriteBehindQueue(flush, batch_size=10, flush_interval=0.05)
+        futures = log_queue.submit(list(range(25)) + ['bad'])
+        results = [future.exception(timeout=5) for future in futures]
+        log_queue.close()
+        
+        assert results[:25] == [None] * 25 and isinstance(results[25], ValueError)
+        assert sum(len(batch) for batch in batches) == 25 and len(batches[0]) == 10
+        
+        # A batch that does not fit is rejected without queueing any of it
+        full_queue = WriteBehindQueue(flush, maxsize=5, enqueue_timeout=0)
+        try:
+            full_queue.submit(list(range(6)))
+            raise AssertionError("oversized batch was accepted")
+        except QueueFullError:
+            assert full_queue.pending() == 0
+        full_queue.close()
+        
+        # Restarting the thread after close() does not add another exit flush
+        from unittest import mock
+        with mock.patch('ingest.atexit.register') as register:
+            restarted = WriteBehindQueue(lambda items: None, flush_interval=0.01)
+            for _ in range(3):
+                restarted.submit([1])[0].result(timeout=5)
+                restarted.close()
+        assert register.call_count == 1, f"exit flush registered {register.call_count} times"
+        
+        print(f"✅ 25 items flushed in {len(batches)} batches, bad item rejected alone")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Write-behind queue test failed: {e}")
+        return False
+
+def test_batch_nutrition():
+    """Test that batch nutrition targets match the scalar calculations"""
+    print("\n🧮 Testing batch nutrition targets...")
+    
+    try:
+        from nutrition import FitnessUtils
+        fitness = FitnessUtils()
+        users = [
+            (70, 170, 25, 'male', 'moderate', 'weight_loss'),
+            (55.5, 158, 31, 'female', 'light', 'weight_gain'),
+            (82.3, 181.5, 47, 'Male', 'very_active', 'maintenance'),
+            (64, 165, 60, 'female', 'unknown', 'unknown'),
+        ]
+        
+        targets = fitness.calculate_targets_batch(*zip(*users))
+        for row, (weight, height, age, gender, activity, goal) in enumerate(users):
+            bmr = fitness.calculate_bmr(weight, height, age, gender)
+            tdee = fitness.calculate_tdee(bmr, activity)
+            calories = fitness.get_calorie_goal(tdee, goal)
+            expected = dict(fitness.calculate_macros(calories, goal), bmr=bmr, tdee=tdee, calorie_goal=calories)
+            assert {name: int(values[row]) for name, values in targets.items()} == expected
+        
+        print(f"✅ Batch targets match the scalar results for {len(users)} users")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch nutrition test failed: {e}")
+        return False
+
+def test_analytics_buckets():
+    """Test that SQL date buckets agree with the Python ones and series fill gaps"""
+    print("\n📈 Testing analytics buckets...")
+    
+    try:
+        import sqlite3
+        from datetime import date, timedelta
+        from analytics import BUCKETS, bucket_start, build_series
+        from database import get_dialect
+        
+        dialect = get_dialect('sqlite')
+        connection = sqlite3.connect(':memory:')
+        days = [date(2024, 2, 20) + timedelta(days=i) for i in range(40)]
+        for bucket in BUCKETS:
+            expression = dialect.date_bucket('?', bucket)
+            for day in days:
+                (start,) = connection.execute(f"SELECT {expression}", (day.isoformat(),)).fetchone()
+                assert start == bucket_start(day, bucket).isoformat(), (bucket, day, start)
+        connection.close()
+        
+        series = build_series(date(2024, 2, 26), date(2024, 3, 10), 'week',
+                              [('2024-03-04', 2, 3000, 100, 400, 80, 12, 45)],
+                              [('2024-03-04', 'lunch', 1800), ('2024-03-04', 'dinner', 1200)])
+        assert series['periods'] == ['2024-02-26', '2024-03-04']
+        assert series['totals']['calories'] == [0, 3000]
+        assert series['meals']['lunch'] == [0, 1800] and series['meals']['breakfast'] == [0, 0]
+        
+        print(f"✅ Day, week and month buckets match for {len(days)} days")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Analytics test failed: {e}")
+        return False
+
+def test_synthetic_data():
+    """Test that generated data is deterministic and follows the meal patterns"""
+    print("\n🌱 Testing synthetic data generator...")
+    
+    try:
+        from datetime import date
+        from datagen import SyntheticDataGenerator, TABLE_COLUMNS
+        
+        foods = [dict(food, id=i) for i, food in enumerate(BangladeshiFoodData.get_common_foods(), 1)]
+        exercises = [dict(exercise, id=i) for i, exercise in enumerate(ExerciseData.get_exercises(), 1)]
+        
+        def generate(catalogue=foods, **kwargs):
+            return list(SyntheticDataGenerator(catalogue, exercises, 5, date(2024, 3, 1), date(2024, 3, 14),
+                                               seed=7, **kwargs).rows())
+        
+        rows = generate()
+        assert rows == generate(), "same seed gave different rows"
+        assert all(len(row) == len(TABLE_COLUMNS[table]) for table, row in rows)
+        # Rows depend on the user's position, not the id range they are written to
+        later = generate(first_user_id=3)
+        assert [row[1:] for table, row in rows if table != 'users' and row[0] == 5] == \
+               [row[1:] for table, row in later if table != 'users' and row[0] == 7]
+        # The device catalogue names some foods differently in English; they are matched by Bangla name
+        renamed = {'Lentils': 'Dal', 'Roti/Chapati': 'Roti'}
+        local = [dict(food, name_english=renamed.get(food['name_english'], food['name_english'])) for food in foods]
+        assert generate(local) == rows, "local catalogue names changed the generated rows"
+        meal_types = {row[4] for table, row in rows if table == 'food_logs'}
+        assert meal_types <= set(Config.MEAL_TYPES) and 'lunch' in meal_types
+        
+        print(f"✅ Generated {len(rows)} rows deterministically")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Synthetic data test failed: {e}")
+        return False
+
+def test_fragment_cache():
+    """Test that {% cache %} fragments are reused per vary key and dropped on invalidation"""
+    print("\n🧩 Testing template fragment cache...")
+    
+    try:
+        from jinja2 import Environment
+        from fragment_cache import FragmentCache, FragmentCacheExtension, LazyValues
+        
+        language = ['bn']
+        loads = []
+        env = Environment(extensions=[FragmentCacheExtension])
+        env.fragment_cache = FragmentCache(maxsize=8, vary=lambda: (language[0],))
+        template = env.from_string("{% cache 'grid' %}{{ language }}:{{ page.items | join(',') }}{% endcache %}")
+        
+        def render(items):
+            return template.render(language=language[0], page=LazyValues(lambda: loads.append(1) or {'items': items}))
+        
+        assert render([1, 2]) == 'bn:1,2'
+        assert render([3]) == 'bn:1,2' and len(loads) == 1, "cached fragment was re-rendered"
+        language[0] = 'en'
+        assert render([3]) == 'en:3'
+        env.fragment_cache.invalidate()
+        assert render([4]) == 'en:4' and len(loads) == 3
+        
+        print("✅ Fragments cached per language and invalidated on demand")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Fragment cache test failed: {e}")
+        return False
+
+def test_catalogue_misses():
+    """Test that unknown names are looked up once, not by reloading the catalogue, until the miss expires"""
+    print("\n📚 Testing catalogue lookup misses...")
+    
+    try:
+        import time
+        import uuid
+        from catalogue import CatalogueCache
+        
+        db = Database()
+        cache = CatalogueCache(miss_ttl=60)
+        loads = []
+        load = cache.load
+        cache.load = lambda db: loads.append(1) or load(db)
+        
+        assert cache.find_food(db, 'Rice') is not None
+        for _ in range(100):
+            assert cache.find_food(db, 'No such food') is None
+        assert len(loads) == 1, f"{len(loads)} catalogue loads for 100 misses"
+        cache.invalidate()
+        assert cache.find_food(db, 'No such food') is None and len(loads) == 2
+        
+        # A food added by another process is found once its remembered miss expires
+        cache.miss_ttl = 0.2
+        name = f"Test food {uuid.uuid4().hex[:8]}"
+        assert cache.find_food(db, name) is None
+        db.insert("INSERT INTO foods (name_bangla, name_english, calories_per_100g) VALUES (%s, %s, %s)",
+                  (name, name, 100))
+        try:
+            assert cache.find_food(db, name) is None, "miss expired early"
+            time.sleep(0.25)
+            assert cache.find_food(db, name) is not None, "miss never expired"
+            assert len(loads) == 2, "expired miss reloaded the catalogue"
+        finally:
+            db.delete("DELETE FROM foods WHERE name_english = %s", (name,))
+        
+        db.close()
+        print("✅ 100 misses answered with one catalogue load; expired misses are looked up again")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Catalogue miss test failed: {e}")
+        return False
+
+def test_fresh_database():
+    """Test that a freshly migrated database has the local user and accepts log writes"""
+    print("\n🆕 Testing a freshly migrated database...")
+    
+    import tempfile
+    from database import DatabaseManager
+    saved_path = Config.SQLITE_DATABASE_PATH
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            # Pools are per backend, so drop the one holding the app database first
+            DatabaseManager.close_all_pools()
+            Config.SQLITE_DATABASE_PATH = os.path.join(directory, 'fresh.db')
+            db = Database('sqlite')
+            try:
+                data_manager = DataManager(db)
+                assert data_manager.get_user(Config.LOCAL_USER_ID) is not None, "no local user"
+                calories = data_manager.add_food_log(Config.LOCAL_USER_ID, 'Rice', 100, 'lunch')
+                assert calories > 0, "food log was not written"
+                assert len(data_manager.get_meal_logs(Config.LOCAL_USER_ID)) == 1
+            finally:
+                db.close()
+        
+        print("✅ Local user created and food logged on a fresh database")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Fresh database test failed: {e}")
+        return False
+    finally:
+        DatabaseManager.close_all_pools()
+        Config.SQLITE_DATABASE_PATH = saved_path
+
+def test_migration_runner():
+    """Test that concurrent startups migrate once and a failed migration is rolled back"""
+    print("\n🧱 Testing migration runner...")
+    
+    import subprocess
+    import tempfile
+    import migrations
+    from database import DatabaseManager
+    saved_path, saved_migrations = Config.SQLITE_DATABASE_PATH, list(migrations.MIGRATIONS)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            # Several processes open the same fresh database at once
+            env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)), WEB_METRICS='0')
+            script = "from database import Database; Database('sqlite').close()"
+            processes = [subprocess.Popen([sys.executable, '-c', script], cwd=directory, env=env,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                         for _ in range(4)]
+            errors = [process.communicate(timeout=120)[1] for process in processes]
+            assert all(process.returncode == 0 for process in processes), errors
+            
+            DatabaseManager.close_all_pools()
+            migrations.MigrationRunner.reset_cache()
+            Config.SQLITE_DATABASE_PATH = os.path.join(directory, Config.SQLITE_DATABASE_NAME)
+            db = Database('sqlite')
+            try:
+                versions = [row[0] for row in db.fetch_all("SELECT version FROM schema_version ORDER BY version")]
+                assert versions == [version for version, _, _ in saved_migrations], versions
+                foods = db.fetch_one("SELECT COUNT(*) FROM foods")[0]
+                assert foods == len(BangladeshiFoodData.get_common_foods()), f"{foods} catalogue rows"
+                
+                def broken(db):
+                    db.execute_query("CREATE TABLE half_applied (id INT)")
+                    raise RuntimeError("migration failed")
+                
+                migrations.MIGRATIONS.append((migrations.LATEST_VERSION + 1, "broken", broken))
+                migrations.MigrationRunner.reset_cache()
+                try:
+                    migrations.MigrationRunner(db).run()
+                    raise AssertionError("failing migration was not raised")
+                except RuntimeError:
+                    pass
+                assert migrations.MigrationRunner(db).current_version() == migrations.LATEST_VERSION
+                assert db.fetch_one("SELECT name FROM sqlite_master WHERE name = 'half_applied'") is None, \
+                    "failed migration left its table behind"
+            finally:
+                db.close()
+        
+        print(f"✅ {len(processes)} concurrent startups migrated once; failed migration rolled back")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Migration runner test failed: {e}")
+        return False
+    finally:
+        migrations.MIGRATIONS[:] = saved_migrations
+        migrations.MigrationRunner.reset_cache()
+        DatabaseManager.close_all_pools()
+        Config.SQLITE_DATABASE_PATH = saved_path
+
+def test_summary_rebuild():
+    """Test that a failed daily summary rebuild leaves the old totals in place"""
+    print("\n🧾 Testing daily summary rebuild...")
+    
+    try:
+        from summaries import DailySummaryManager
+        
+        db = Database()
+        data_manager = DataManager(db)
+        summaries = DailySummaryManager(db)
+        day = '2000-01-01'
+        data_manager.add_water_log(Config.LOCAL_USER_ID, 2, day)
+        before = summaries.get(Config.LOCAL_USER_ID, day)
+        
+        def fail(*args, **kwargs):
+            raise RuntimeError("insert failed")
+        db.insert_many = fail
+        try:
+            summaries.rebuild(Config.LOCAL_USER_ID, day, day)
+            raise AssertionError("rebuild did not fail")
+        except RuntimeError:
+            pass
+        assert summaries.get(Config.LOCAL_USER_ID, day) == before, "the failed rebuild deleted the totals"
+        
+        del db.insert_many
+        assert summaries.rebuild(Config.LOCAL_USER_ID, day, day) == 1
+        assert summaries.get(Config.LOCAL_USER_ID, day) == before
+        db.close()
+        
+        print(f"✅ Totals kept through a failed rebuild ({before['water_glasses']} glasses)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Summary rebuild test failed: {e}")
+        return False
+
+def test_benchmark_seed():
+    """Test that the benchmark seeds a fresh data dir with --users users in both databases"""
+    print("\n🏁 Testing benchmark seeding...")
+    
+    try:
+        import json
+        import sqlite3
+        import subprocess
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as directory:
+            results_path = os.path.join(directory, 'results.json')
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark.py')
+            subprocess.run([sys.executable, script, 'datamanager', '--data-dir', directory, '--users', '3',
+                            '--days', '2', '--iterations', '1', '--methods', 'get_user', '--save', results_path],
+                           check=True, capture_output=True, env=dict(os.environ, WEB_METRICS='0'))
+            with open(results_path, encoding='utf-8') as results_file:
+                raw_users = json.load(results_file)['users']
+            assert raw_users == 3, f"{raw_users} raw users"
+            connection = sqlite3.connect(os.path.join(directory, 'bench_web.db'))
+            web_users = connection.execute("SELECT COUNT(*) FROM user").fetchone()[0]
+            connection.close()
+            assert web_users == 3, f"{web_users} web users"
+        
+        print("✅ Fresh data dir seeded with 3 users")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Benchmark seed test failed: {e}")
+        return False
+
+def test_sync_engine():
+    """Test that queued-only uploads stay pending and changed catalogues replace the mirror"""
+    print("\n🔄 Testing sync engine...")
+    
+    try:
+        import tempfile
+        from sync import SyncEngine, SyncJournal
+        
+        class Response:
+            def __init__(self, status_code, body=None, etag=None):
+                self.status_code, self.body = status_code, body
+                self.headers = {'ETag': etag} if etag else {}
+                self.cookies = {}
+            
+            def json(self):
+                return self.body
+            
+            def raise_for_status(self):
+                assert self.status_code < 400, self.status_code
+        
+        class Server:
+            """Answers the engine's requests from canned responses, recording what was sent"""
+            def __init__(self):
+                self.responses, self.sent = [], []
+            
+            def get(self, url, params, headers, timeout):
+                self.sent.append(headers.get('If-None-Match'))
+                return self.responses.pop(0)
+            
+            def post(self, url, json, timeout):
+                self.sent.append(json['events'])
+                return self.responses.pop(0)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            journal = SyncJournal(os.path.join(directory, 'journal.db'))
+            engine = SyncEngine(journal, 'http://server')
+            engine.http = server = Server()
+            
+            lentils = {'id': 7, 'name_bangla': 'ডাল', 'name_english': 'Lentils'}
+            server.responses = [Response(200, {'items': [lentils, {'id': 8, 'name_bangla': 'পিঠা',
+                                                                   'name_english': 'Pitha'}],
+                                               'next_cursor': None}, etag='"v1"')]
+            engine.pull_catalogue('foods')
+            # Renamed and deleted items reach the mirror
+            server.responses = [Response(200, {'items': [dict(lentils, name_english='Dal')], 'next_cursor': None},
+                                         etag='"v2"')]
+            engine.pull_catalogue('foods')
+            assert server.sent[-1] == '"v1"'
+            assert journal.server_id('foods', 'Dal') == 7 and journal.server_id('foods', 'Pitha') is None
+            server.responses = [Response(304)]
+            assert engine.pull_catalogue('foods') == 0 and server.sent[-1] == '"v2"'
+            
+            journal.append('food', food_name='Dal', food_name_bangla='ডাল', local_food_id=5, amount=100,
+                           meal_type='lunch', date='2024-03-01')
+            # The server only queued the batch before its ack timed out: keep it for the next sync
+            server.responses = [Response(202, {'accepted': 1, 'committed': None})]
+            assert engine.push() == 0 and journal.pending_count() == 1
+            server.responses = [Response(201, {'accepted': 1, 'committed': 1})]
+            assert engine.push() == 1 and journal.pending_count() == 0
+            assert server.sent[-1][0]['food_id'] == 7
+            journal.close()
+        
+        print("✅ 202 uploads kept pending, catalogue refreshed on change")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Sync engine test failed: {e}")
+        return False
+
 def test_exercise_data():
     """Test exercise database functionality"""
     print("\n💪 Testing exercise database...")
@@ -159,7 +730,22 @@ def run_all_tests():
     
     tests = [
         test_database_connection,
+        test_sql_dialects,
+        test_query_profiler,
+        test_request_metrics,
         test_food_data,
+        test_food_search,
+        test_catalogue_misses,
+        test_fresh_database,
+        test_migration_runner,
+        test_summary_rebuild,
+        test_benchmark_seed,
+        test_sync_engine,
+        test_write_behind_queue,
+        test_batch_nutrition,
+        test_analytics_buckets,
+        test_synthetic_data,
+        test_fragment_cache,
         test_exercise_data,
         test_config,
         test_data_manager
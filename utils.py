@@ -1,60 +1,10 @@
-import mysql.connector
-import pymysql
-import sqlite3
 from datetime import datetime, date
 import json
-from database import Database
 from config import Config
-
-class FitnessUtils:
-    def __init__(self, db_connection):
-        self.db = db_connection
-    
-    def calculate_bmr(self, weight, height, age, gender):
-        """Calculate Basal Metabolic Rate using Mifflin-St Jeor Equation"""
-        if gender.lower() == 'male':
-            bmr = 10 * weight + 6.25 * height - 5 * age + 5
-        else:
-            bmr = 10 * weight + 6.25 * height - 5 * age - 161
-        return round(bmr)
-    
-    def calculate_tdee(self, bmr, activity_level):
-        """Calculate Total Daily Energy Expenditure"""
-        activity_multipliers = {
-            'sedentary': 1.2,      # Little or no exercise
-            'light': 1.375,         # Light exercise 1-3 days/week
-            'moderate': 1.55,       # Moderate exercise 3-5 days/week
-            'active': 1.725,        # Hard exercise 6-7 days/week
-            'very_active': 1.9      # Very hard exercise, physical job
-        }
-        return round(bmr * activity_multipliers.get(activity_level, 1.2))
-    
-    def get_calorie_goal(self, tdee, goal):
-        """Calculate calorie goal based on fitness objective"""
-        if goal == 'weight_loss':
-            return tdee - 500  # 500 calorie deficit
-        elif goal == 'weight_gain':
-            return tdee + 300  # 300 calorie surplus
-        else:  # maintenance
-            return tdee
-    
-    def get_macro_ratios(self, goal):
-        """Get macro ratios based on fitness goal"""
-        if goal == 'weight_loss':
-            return {'protein': 0.3, 'carbs': 0.4, 'fat': 0.3}
-        elif goal == 'weight_gain':
-            return {'protein': 0.25, 'carbs': 0.55, 'fat': 0.2}
-        else:  # maintenance
-            return {'protein': 0.25, 'carbs': 0.5, 'fat': 0.25}
-    
-    def calculate_macros(self, calories, goal):
-        """Calculate macro targets in grams"""
-        ratios = self.get_macro_ratios(goal)
-        macros = {}
-        macros['protein'] = round((calories * ratios['protein']) / 4)  # 4 cal/g
-        macros['carbs'] = round((calories * ratios['carbs']) / 4)      # 4 cal/g
-        macros['fat'] = round((calories * ratios['fat']) / 9)          # 9 cal/g
-        return macros
+from nutrition import FitnessUtils
+from summaries import DailySummaryManager
+from analytics import AnalyticsManager, date_range
+from catalogue import CatalogueCache
 
 class BangladeshiFoodData:
     """Database of common Bangladeshi foods with nutritional information"""
@@ -342,29 +292,87 @@ class ExerciseData:
 class DataManager:
     """Manages data operations for the fitness app"""
     
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, journal=None):
         self.db = db_connection
         self.utils = FitnessUtils(db_connection)
+        self.summaries = DailySummaryManager(db_connection)
+        self.analytics = AnalyticsManager(db_connection)
+        # Optional sync.SyncJournal; log writes are also journaled for upload to the server
+        self.journal = journal
+    
+    @property
+    def catalogue(self):
+        """Shared food/exercise catalogue cache for this database"""
+        return CatalogueCache.for_database(self.db)
+    
+    def get_foods(self, category=None):
+        """Get the food catalogue (optionally one category) from the catalogue cache"""
+        foods = sorted(self.catalogue.foods(self.db), key=lambda food: food['id'])
+        return [food for food in foods if category is None or food['category'] == category]
+    
+    def get_exercises(self, level=None):
+        """Get the exercise catalogue (optionally one level) from the catalogue cache"""
+        exercises = sorted(self.catalogue.exercises(self.db), key=lambda exercise: exercise['id'])
+        return [exercise for exercise in exercises if level is None or exercise['level'] == level]
+    
+    def get_user(self, user_id):
+        """Get a user's profile as a dict, or None"""
+        columns = ('id', 'name', 'age', 'weight', 'height', 'goal', 'target_calories')
+        row = self.db.fetch_one(f"SELECT {', '.join(columns)} FROM users WHERE id = %s", (user_id,))
+        return dict(zip(columns, row)) if row else None
+    
+    def add_food(self, name_bangla, name_english, calories_per_100g, protein=0, carbs=0, fat=0,
+                 category=None, serving_size=None, serving_weight=None):
+        """Add a food to the catalogue"""
+        food_id = self.db.insert('''
+            INSERT INTO foods 
+            (name_bangla, name_english, calories_per_100g, protein, carbs, fat, category, serving_size, serving_weight)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (name_bangla, name_english, calories_per_100g, protein, carbs, fat, category, serving_size, serving_weight))
+        self.catalogue.invalidate()
+        return food_id
+    
+    def add_exercise(self, name_bangla, name_english, level, category, description=None,
+                     muscle_groups=None, equipment=None, instructions=None):
+        """Add an exercise to the catalogue"""
+        exercise_id = self.db.insert('''
+            INSERT INTO exercises 
+            (name_bangla, name_english, level, category, description, muscle_groups, equipment, instructions)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (name_bangla, name_english, level, category, description, muscle_groups, equipment, instructions))
+        self.catalogue.invalidate()
+        return exercise_id
     
     def add_food_log(self, user_id, food_name, amount, meal_type, date=None):
         """Add food to user's daily log"""
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        # Get food info from database
-        food = self.db.fetch_one('''
-            SELECT id, calories_per_100g FROM foods 
-            WHERE name_bangla = %s OR name_english = %s
-        ''', (food_name, food_name))
+        # Get food info from the catalogue cache
+        food = self.catalogue.find_food(self.db, food_name)
         
         if food:
-            food_id, calories_per_100g = food
+            food_id, calories_per_100g = food['id'], food['calories_per_100g']
+            protein, carbs, fat = food['protein'], food['carbs'], food['fat']
             total_calories = (calories_per_100g * amount) / 100
             
-            self.db.insert('''
-                INSERT INTO food_logs (user_id, food_id, amount, date, meal_type)
-                VALUES (%s, %s, %s, %s, %s)
-            ''', (user_id, food_id, amount, date, meal_type))
+            # The log and its summary totals commit together (or not at all)
+            with self.db.transaction():
+                self.db.execute_query('''
+                    INSERT INTO food_logs (user_id, food_id, amount, date, meal_type)
+                    VALUES (%s, %s, %s, %s, %s)
+                ''', (user_id, food_id, amount, date, meal_type))
+                self.summaries.add(
+                    user_id, date,
+                    calories=total_calories,
+                    protein=float(protein or 0) * amount / 100,
+                    carbs=float(carbs or 0) * amount / 100,
+                    fat=float(fat or 0) * amount / 100
+                )
+            self.analytics.invalidate(user_id)
+            if self.journal:
+                self.journal.append('food', food_name=food['name_english'], food_name_bangla=food['name_bangla'],
+                                    local_food_id=food_id, amount=amount, meal_type=meal_type, date=date)
             
             return total_calories
         return 0
@@ -375,10 +383,9 @@ class DataManager:
             date = datetime.now().strftime('%Y-%m-%d')
         
         result = self.db.fetch_one('''
-            SELECT SUM(f.calories_per_100g * fl.amount / 100)
-            FROM food_logs fl
-            JOIN foods f ON fl.food_id = f.id
-            WHERE fl.user_id = %s AND fl.date = %s
+            SELECT calories
+            FROM daily_summaries
+            WHERE user_id = %s AND date = %s
         ''', (user_id, date))
         
         return result[0] if result and result[0] else 0
@@ -390,7 +397,7 @@ class DataManager:
         
         return self.db.fetch_all('''
             SELECT f.name_bangla, fl.amount, fl.meal_type, 
-                   (f.calories_per_100g * fl.amount / 100) as calories
+                   (f.calories_per_100g * fl.amount / 100.0) as calories
             FROM food_logs fl
             JOIN foods f ON fl.food_id = f.id
             WHERE fl.user_id = %s AND fl.date = %s
@@ -402,19 +409,23 @@ class DataManager:
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        # Get exercise info from database
-        exercise = self.db.fetch_one('''
-            SELECT id FROM exercises 
-            WHERE name_bangla = %s OR name_english = %s
-        ''', (exercise_name, exercise_name))
+        # Get exercise info from the catalogue cache
+        exercise = self.catalogue.find_exercise(self.db, exercise_name)
         
         if exercise:
-            exercise_id = exercise[0]
+            exercise_id = exercise['id']
             
-            self.db.insert('''
-                INSERT INTO exercise_logs (user_id, exercise_id, duration, sets, reps, date)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            ''', (user_id, exercise_id, duration, sets, reps, date))
+            with self.db.transaction():
+                self.db.execute_query('''
+                    INSERT INTO exercise_logs (user_id, exercise_id, duration, sets, reps, date)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                ''', (user_id, exercise_id, duration, sets, reps, date))
+                self.summaries.add(user_id, date, exercise_minutes=duration)
+            self.analytics.invalidate(user_id)
+            if self.journal:
+                self.journal.append('exercise', exercise_name=exercise['name_english'],
+                                    exercise_name_bangla=exercise['name_bangla'], local_exercise_id=exercise_id,
+                                    duration=duration, sets=sets, reps=reps, date=date)
             
             return True
         return False
@@ -434,14 +445,11 @@ class DataManager:
     
     def add_to_pantry(self, user_id, food_name, custom_name=None, custom_calories=None):
         """Add food item to user's pantry"""
-        # Get food info from database
-        food = self.db.fetch_one('''
-            SELECT id FROM foods 
-            WHERE name_bangla = %s OR name_english = %s
-        ''', (food_name, food_name))
+        # Get food info from the catalogue cache
+        food = self.catalogue.find_food(self.db, food_name)
         
         if food:
-            food_id = food[0]
+            food_id = food['id']
             
             self.db.insert('''
                 INSERT INTO pantry (user_id, food_id, custom_name, custom_calories)
@@ -468,10 +476,15 @@ class DataManager:
         if date is None:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        self.db.insert('''
-            INSERT INTO water_logs (user_id, glasses, date)
-            VALUES (%s, %s, %s)
-        ''', (user_id, glasses, date))
+        with self.db.transaction():
+            self.db.execute_query('''
+                INSERT INTO water_logs (user_id, glasses, date)
+                VALUES (%s, %s, %s)
+            ''', (user_id, glasses, date))
+            self.summaries.add(user_id, date, water_glasses=glasses)
+        self.analytics.invalidate(user_id)
+        if self.journal:
+            self.journal.append('water', glasses=glasses, date=date)
         
         return True
     
@@ -481,9 +494,30 @@ class DataManager:
             date = datetime.now().strftime('%Y-%m-%d')
         
         result = self.db.fetch_one('''
-            SELECT SUM(glasses)
-            FROM water_logs
+            SELECT water_glasses
+            FROM daily_summaries
             WHERE user_id = %s AND date = %s
         ''', (user_id, date))
         
-        return result[0] if result and result[0] else 0 
\ No newline at end of file
+        return result[0] if result and result[0] else 0
+    
+    def get_daily_summary(self, user_id, date=None):
+        """Get calories, macros, water and exercise minutes for a specific date"""
+        if date is None:
+            date = datetime.now().strftime('%Y-%m-%d')
+        
+        return self.summaries.get(user_id, date)
+    
+    def rebuild_daily_summaries(self, user_id=None, start_date=None, end_date=None):
+        """Recompute daily summaries from the raw logs (for backfills and imports)"""
+        count = self.summaries.rebuild(user_id, start_date, end_date)
+        self.analytics.invalidate(user_id)
+        return count
+    
+    def get_trends(self, user_id, days=30, bucket='day', end_date=None):
+        """Per-day/week/month totals and meal breakdown for the ``days`` days ending on ``end_date``
+        
+        One grouped query per range (cached until the user's next log write); see analytics.build_series.
+        """
+        start_date, end_date = date_range(days, end_date)
+        return self.analytics.series(user_id, start_date, end_date, bucket) 
\ No newline at end of file
@@ -1,16 +1,47 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, g
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, literal_column
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload, make_transient_to_detached, object_session
+from collections import defaultdict
+from concurrent.futures import wait
 from datetime import datetime, date
+import gzip
+import hashlib
+import json
 import os
+from analytics import AnalyticsCache, BUCKETS, build_series, date_range
+from cache import LRUCache
 from config import Config
+from database import get_dialect
+from ingest import QueueFullError, WriteBehindQueue
+from food_search import FoodSearchIndex
+from fragment_cache import FragmentCache, FragmentCacheExtension, LazyValues
+from pagination import keyset_page, page_size, select_fields
+from profiling import query_profiler
+from request_metrics import RequestMetrics
+from summaries import SUMMARY_COLUMNS
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'bangladeshi_fitness_secret_key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///fitness_demo.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = Config.WEB_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db = SQLAlchemy(app)
 
+# Per-endpoint latency, SQL and template timings, served at /metrics
+request_metrics = RequestMetrics()
+if Config.WEB_METRICS:
+    request_metrics.init_app(app)
+
+# Rendered {% cache %} fragments per language, re-rendered after the next catalogue write
+app.jinja_env.add_extension(FragmentCacheExtension)
+fragment_cache = FragmentCache(maxsize=Config.FRAGMENT_CACHE_SIZE, ttl=Config.FRAGMENT_CACHE_TTL,
+                               vary=lambda: (session.get('language', 'bn'),))
+if Config.FRAGMENT_CACHE:
+    app.jinja_env.fragment_cache = fragment_cache
+
 # Database Models
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -48,6 +79,10 @@ class FoodLog(db.Model):
     amount = db.Column(db.Float)
     date = db.Column(db.Date, default=date.today)
     meal_type = db.Column(db.String(50))
+    
+    food = db.relationship('Food')
+    
+    __table_args__ = (db.Index('idx_food_log_user_date', 'user_id', 'date', 'meal_type', 'food_id', 'amount'),)
 
 class ExerciseLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -57,6 +92,10 @@ class ExerciseLog(db.Model):
     sets = db.Column(db.Integer)
     reps = db.Column(db.Integer)
     date = db.Column(db.Date, default=date.today)
+    
+    exercise = db.relationship('Exercise')
+    
+    __table_args__ = (db.Index('idx_exercise_log_user_date', 'user_id', 'date', 'exercise_id', 'duration'),)
 
 class Pantry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -64,12 +103,429 @@ class Pantry(db.Model):
     food_id = db.Column(db.Integer, db.ForeignKey('food.id'))
     custom_name = db.Column(db.String(100))
     custom_calories = db.Column(db.Integer)
+    
+    food = db.relationship('Food')
 
 class WaterLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     glasses = db.Column(db.Integer, default=1)
     date = db.Column(db.Date, default=date.today)
+    
+    __table_args__ = (db.Index('idx_water_log_user_date', 'user_id', 'date', 'glasses'),)
+
+class DailySummary(db.Model):
+    """Per-user, per-day totals maintained on every log write"""
+    __tablename__ = 'daily_summaries'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    calories = db.Column(db.Float, default=0, nullable=False)
+    protein = db.Column(db.Float, default=0, nullable=False)
+    carbs = db.Column(db.Float, default=0, nullable=False)
+    fat = db.Column(db.Float, default=0, nullable=False)
+    water_glasses = db.Column(db.Integer, default=0, nullable=False)
+    exercise_minutes = db.Column(db.Integer, default=0, nullable=False)
+
+class SyncEvent(db.Model):
+    """Client event ids already ingested, so re-uploaded events are not stored twice"""
+    __tablename__ = 'sync_events'
+    event_id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def add_to_daily_summary(user_id, day, **totals):
+    """Add to a day's totals in the current session (committed with the log write)
+    
+    A single upsert, so two first writes for the same day cannot both insert.
+    """
+    if not totals:
+        return
+    values = dict({column: 0 for column in SUMMARY_COLUMNS}, user_id=user_id, date=day)
+    values.update(totals)
+    columns = DailySummary.__table__.c
+    if web_dialect().name == 'mysql':
+        statement = mysql_insert(DailySummary).values(**values)
+        statement = statement.on_duplicate_key_update(
+            {column: columns[column] + statement.inserted[column] for column in totals})
+    else:
+        statement = sqlite_insert(DailySummary).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'date'],
+            set_={column: columns[column] + statement.excluded[column] for column in totals})
+    db.session.execute(statement)
+    # Cached analytics for this user are dropped once the write commits
+    db.session.info.setdefault('analytics_users', set()).add(user_id)
+
+def rebuild_daily_summaries():
+    """Recompute every daily summary from the raw logs"""
+    DailySummary.query.delete()
+    summaries = {}
+    
+    def summary_for(user_id, day):
+        if (user_id, day) not in summaries:
+            summaries[(user_id, day)] = DailySummary(user_id=user_id, date=day, calories=0, protein=0,
+                                                     carbs=0, fat=0, water_glasses=0, exercise_minutes=0)
+        return summaries[(user_id, day)]
+    
+    food_totals = db.session.query(
+        FoodLog.user_id, FoodLog.date,
+        func.sum(FoodLog.amount * Food.calories_per_100g / 100),
+        func.sum(FoodLog.amount * Food.protein / 100),
+        func.sum(FoodLog.amount * Food.carbs / 100),
+        func.sum(FoodLog.amount * Food.fat / 100)
+    ).join(Food, FoodLog.food_id == Food.id).group_by(FoodLog.user_id, FoodLog.date)
+    for user_id, day, calories, protein, carbs, fat in food_totals:
+        summary = summary_for(user_id, day)
+        summary.calories, summary.protein, summary.carbs, summary.fat = calories or 0, protein or 0, carbs or 0, fat or 0
+    
+    water_totals = db.session.query(WaterLog.user_id, WaterLog.date, func.sum(WaterLog.glasses)).group_by(WaterLog.user_id, WaterLog.date)
+    for user_id, day, glasses in water_totals:
+        summary_for(user_id, day).water_glasses = glasses or 0
+    
+    exercise_totals = db.session.query(ExerciseLog.user_id, ExerciseLog.date, func.sum(ExerciseLog.duration)).group_by(ExerciseLog.user_id, ExerciseLog.date)
+    for user_id, day, minutes in exercise_totals:
+        summary_for(user_id, day).exercise_minutes = minutes or 0
+    
+    db.session.add_all(summaries.values())
+    db.session.commit()
+    _analytics_cache.invalidate()
+    return len(summaries)
+
+def web_dialect():
+    """The raw stack's Dialect for the web database; raises ValueError for unsupported backends"""
+    return get_dialect(db.engine.dialect.name)
+
+# Trend analytics: one grouped query per range, cached per (user, range) until the user's next log write
+def analytics_bucket(attribute, bucket):
+    """Start of the bucket holding a DATE column, using the raw stack's Dialect.DATE_BUCKETS for this backend"""
+    column = attribute.expression
+    return literal_column(web_dialect().date_bucket(f'{column.table.name}.{column.name}', bucket))
+
+_analytics_cache = AnalyticsCache()
+
+def analytics_series(user_id, start_date, end_date, bucket='day'):
+    """Per-bucket totals and meal breakdown for a user and date range (see analytics.build_series)"""
+    key = _analytics_cache.key(user_id, start_date, end_date, bucket)
+    result = _analytics_cache.get(key)
+    if result is not None:
+        return result
+    
+    period = analytics_bucket(DailySummary.date, bucket).label('period')
+    totals = db.session.query(
+        period, func.count(), *[func.sum(getattr(DailySummary, column)) for column in SUMMARY_COLUMNS]
+    ).filter(
+        DailySummary.user_id == user_id, DailySummary.date.between(start_date, end_date)
+    ).group_by(period).order_by(period).all()
+    
+    meal_period = analytics_bucket(FoodLog.date, bucket).label('period')
+    meals = db.session.query(
+        meal_period, FoodLog.meal_type, func.sum(FoodLog.amount * Food.calories_per_100g / 100)
+    ).join(Food, FoodLog.food_id == Food.id).filter(
+        FoodLog.user_id == user_id, FoodLog.date.between(start_date, end_date)
+    ).group_by(meal_period, FoodLog.meal_type).order_by(meal_period).all()
+    
+    result = build_series(start_date, end_date, bucket, totals, meals)
+    _analytics_cache.set(key, result)
+    return result
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_analytics(session):
+    for user_id in session.info.pop('analytics_users', ()):
+        _analytics_cache.invalidate(user_id)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_analytics_invalidations(session):
+    session.info.pop('analytics_users', None)
+
+# Batched log ingestion: POST /api/logs queues events, a background thread commits them in groups
+LOG_EVENT_FIELDS = {
+    'food': {'food_id': int, 'amount': float, 'meal_type': str},
+    'exercise': {'exercise_id': int, 'duration': int, 'sets': int, 'reps': int},
+    'water': {'glasses': int},
+}
+LOG_EVENT_DEFAULTS = {
+    'food': {'amount': 100, 'meal_type': 'snack'},
+    'exercise': {'duration': 10, 'sets': 0, 'reps': 0},
+    'water': {'glasses': 1},
+}
+
+def parse_log_event(data, user_id):
+    """Validate one ingested log event; raises ValueError describing what is wrong"""
+    if not isinstance(data, dict):
+        raise ValueError("event must be an object")
+    log_type = data.get('type')
+    if log_type not in LOG_EVENT_FIELDS:
+        raise ValueError(f"unknown log type: {log_type!r}")
+    
+    event = {'type': log_type, 'user_id': user_id, 'event_id': data.get('event_id')}
+    if event['event_id'] is not None and not (isinstance(event['event_id'], str) and 0 < len(event['event_id']) <= 64):
+        raise ValueError(f"invalid event_id: {event['event_id']!r}")
+    try:
+        event['date'] = date.fromisoformat(data['date']) if data.get('date') else date.today()
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid date: {data.get('date')!r}")
+    for field, cast in LOG_EVENT_FIELDS[log_type].items():
+        value = data.get(field, LOG_EVENT_DEFAULTS[log_type].get(field))
+        if value is None:
+            raise ValueError(f"missing field: {field}")
+        try:
+            event[field] = cast(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid {field}: {value!r}")
+        if cast is not str and event[field] < 0:
+            raise ValueError(f"invalid {field}: {value!r}")
+    return event
+
+def write_log_events(events):
+    """Insert a batch of validated log events and their summary totals in one transaction"""
+    with app.app_context():
+        food_ids = {event['food_id'] for event in events if event['type'] == 'food'}
+        foods = {food.id: food for food in Food.query.filter(Food.id.in_(food_ids))} if food_ids else {}
+        totals = defaultdict(lambda: defaultdict(float))
+        
+        # Skip events a client already delivered (e.g. a retry after a lost response)
+        event_ids = {event['event_id'] for event in events if event['event_id']}
+        seen = {row[0] for row in db.session.query(SyncEvent.event_id).filter(SyncEvent.event_id.in_(event_ids))} if event_ids else set()
+        
+        try:
+            for event in events:
+                if event['event_id']:
+                    if event['event_id'] in seen:
+                        continue
+                    seen.add(event['event_id'])
+                    db.session.add(SyncEvent(event_id=event['event_id'], user_id=event['user_id']))
+                day_totals = totals[(event['user_id'], event['date'])]
+                if event['type'] == 'food':
+                    food = foods[event['food_id']]
+                    amount = event['amount']
+                    db.session.add(FoodLog(user_id=event['user_id'], food_id=food.id, amount=amount,
+                                           meal_type=event['meal_type'], date=event['date']))
+                    day_totals['calories'] += amount * food.calories_per_100g / 100
+                    day_totals['protein'] += amount * (food.protein or 0) / 100
+                    day_totals['carbs'] += amount * (food.carbs or 0) / 100
+                    day_totals['fat'] += amount * (food.fat or 0) / 100
+                elif event['type'] == 'exercise':
+                    db.session.add(ExerciseLog(user_id=event['user_id'], exercise_id=event['exercise_id'],
+                                               duration=event['duration'], sets=event['sets'],
+                                               reps=event['reps'], date=event['date']))
+                    day_totals['exercise_minutes'] += event['duration']
+                else:
+                    db.session.add(WaterLog(user_id=event['user_id'], glasses=event['glasses'], date=event['date']))
+                    day_totals['water_glasses'] += event['glasses']
+            
+            # One summary update per (user, day) rather than per event
+            for (user_id, day), day_totals in totals.items():
+                add_to_daily_summary(user_id, day, **day_totals)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+log_queue = WriteBehindQueue(write_log_events,
+                             maxsize=Config.INGEST_QUEUE_SIZE,
+                             batch_size=Config.INGEST_BATCH_SIZE,
+                             flush_interval=Config.INGEST_FLUSH_INTERVAL,
+                             enqueue_timeout=Config.INGEST_ENQUEUE_TIMEOUT)
+
+@app.cli.command('rebuild-summaries')
+def rebuild_summaries_command():
+    """Recompute daily_summaries from the raw logs"""
+    count = rebuild_daily_summaries()
+    print(f"✅ Rebuilt {count} daily summaries")
+
+# Current user: resolved once per request from the session and cached across requests
+USER_COLUMNS = ('id', 'name', 'age', 'weight', 'height', 'goal', 'target_calories')
+DEFAULT_USER = dict(name='আহমেদ', age=25, weight=70, height=170, goal='weight_loss', target_calories=2000)
+
+# Per process: invalidate_user only drops this worker's copy, so other workers may
+# keep serving a changed profile for up to USER_CACHE_TTL seconds
+_user_cache = LRUCache(maxsize=Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_TTL)
+
+def get_current_user(create=False):
+    """Return the signed-in session's user
+    
+    A session without a user gets an unsaved default user, so page views from
+    crawlers, health checks and load tests don't add rows. Write routes pass
+    ``create=True`` to save it and sign the session in.
+    """
+    if 'user' in g and (g.user.id is not None or not create):
+        return g.user
+    
+    user = None
+    user_id = session.get('user_id')
+    if user_id is not None:
+        snapshot = _user_cache.get(user_id)
+        if snapshot is not None:
+            # Attach the cached row to this request's session without querying it again
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            user = db.session.merge(user, load=False)
+        else:
+            user = db.session.get(User, user_id)
+    
+    if user is None:
+        user = User(**DEFAULT_USER)
+        if not create:
+            g.user = user
+            return user
+        db.session.add(user)
+        db.session.commit()
+        session.permanent = True
+        session['user_id'] = user.id
+    
+    _user_cache.set(user.id, {column: getattr(user, column) for column in USER_COLUMNS})
+    g.user = user
+    return user
+
+def invalidate_user(user_id):
+    """Drop a user's cached row (call after changing it)"""
+    _user_cache.delete(user_id)
+    g.pop('user', None)
+
+# Food search index, built on first search and dropped whenever a food changes
+_food_search_index = None
+
+def get_food_search_index():
+    global _food_search_index
+    if _food_search_index is None:
+        _food_search_index = FoodSearchIndex(food_to_dict(food) for food in Food.query.all())
+    return _food_search_index
+
+def food_to_dict(food):
+    return {
+        'id': food.id,
+        'name_bangla': food.name_bangla,
+        'name_english': food.name_english,
+        'calories_per_100g': food.calories_per_100g,
+        'protein': food.protein,
+        'carbs': food.carbs,
+        'fat': food.fat,
+        'category': food.category,
+        'serving_size': food.serving_size,
+        'serving_weight': food.serving_weight
+    }
+
+def exercise_to_dict(exercise):
+    return {
+        'id': exercise.id,
+        'name_bangla': exercise.name_bangla,
+        'name_english': exercise.name_english,
+        'level': exercise.level,
+        'category': exercise.category,
+        'description': exercise.description
+    }
+
+def food_log_to_dict(log):
+    return {
+        'id': log.id,
+        'type': 'food',
+        'date': log.date.isoformat(),
+        'food_id': log.food_id,
+        'food_name_bangla': log.food.name_bangla if log.food else None,
+        'food_name_english': log.food.name_english if log.food else None,
+        'amount': log.amount,
+        'meal_type': log.meal_type,
+        'calories': log.amount * log.food.calories_per_100g / 100 if log.food else 0
+    }
+
+def exercise_log_to_dict(log):
+    return {
+        'id': log.id,
+        'type': 'exercise',
+        'date': log.date.isoformat(),
+        'exercise_id': log.exercise_id,
+        'exercise_name_bangla': log.exercise.name_bangla if log.exercise else None,
+        'exercise_name_english': log.exercise.name_english if log.exercise else None,
+        'duration': log.duration,
+        'sets': log.sets,
+        'reps': log.reps
+    }
+
+def water_log_to_dict(log):
+    return {
+        'id': log.id,
+        'type': 'water',
+        'date': log.date.isoformat(),
+        'glasses': log.glasses
+    }
+
+def catalogue_etag(model, serializer):
+    """Hash of a whole catalogue table; changes on any insert, update or delete"""
+    digest = hashlib.sha1()
+    for item in model.query.order_by(model.id):
+        digest.update(json.dumps(serializer(item), sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def api_page(query, id_column, serializer, descending=False, etag=None):
+    """Serialize one cursor page of a query as a conditional (ETag) JSON response
+
+    ``etag``, if given, is called for the first page's ETag instead of hashing the
+    page (the catalogue endpoints use ``catalogue_etag``, so a client can tell
+    from one request whether anything in the catalogue changed).
+    """
+    fields = {field.strip() for field in request.args.get('fields', '').split(',') if field.strip()}
+    try:
+        items, next_cursor = keyset_page(query, id_column, request.args.get('cursor'),
+                                         page_size(request.args.get('limit', type=int)), descending)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify({
+        'items': [select_fields(serializer(item), fields) for item in items],
+        'next_cursor': next_cursor
+    })
+    # Clients revalidate with If-None-Match and get a bodiless 304 when nothing changed
+    if etag is not None and not request.args.get('cursor'):
+        response.set_etag(etag())
+    else:
+        response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+GZIP_MIN_SIZE = 1024
+
+@app.after_request
+def compress_json_response(response):
+    """Gzip larger JSON responses for clients that accept it (API clients on mobile data)"""
+    response.vary.add('Accept-Encoding')
+    if (response.mimetype == 'application/json' and response.status_code == 200
+            and not response.direct_passthrough and 'Content-Encoding' not in response.headers
+            and 'gzip' in request.headers.get('Accept-Encoding', '')):
+        body = response.get_data()
+        if len(body) >= GZIP_MIN_SIZE:
+            response.set_data(gzip.compress(body, compresslevel=6))
+            response.headers['Content-Encoding'] = 'gzip'
+            # The ETag was computed on the uncompressed body, so it only matches weakly now
+            etag, weak = response.get_etag()
+            if etag and not weak:
+                response.set_etag(etag, weak=True)
+    return response
+
+@event.listens_for(Food, 'after_insert')
+@event.listens_for(Food, 'after_update')
+@event.listens_for(Food, 'after_delete')
+def invalidate_food_search_index(mapper, connection, target):
+    global _food_search_index
+    _food_search_index = None
+
+@event.listens_for(Food, 'after_insert')
+@event.listens_for(Food, 'after_update')
+@event.listens_for(Food, 'after_delete')
+@event.listens_for(Exercise, 'after_insert')
+@event.listens_for(Exercise, 'after_update')
+@event.listens_for(Exercise, 'after_delete')
+def mark_catalogue_changed(mapper, connection, target):
+    # Cached catalogue fragments are dropped once the write commits
+    object_session(target).info['catalogue_changed'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_fragments(session):
+    if session.info.pop('catalogue_changed', False):
+        fragment_cache.invalidate()
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_fragment_invalidation(session):
+    session.info.pop('catalogue_changed', None)
 
 # Sample data
 def insert_sample_data():
@@ -112,71 +568,225 @@ def insert_sample_data():
 # Routes
 @app.route('/')
 def dashboard():
-    user = User.query.first()
-    if not user:
-        user = User(name='আহমেদ', age=25, weight=70, height=170, goal='weight_loss', target_calories=2000)
-        db.session.add(user)
-        db.session.commit()
+    user = get_current_user()
     
-    # Get today's logs
+    # Get today's logs with their food/exercise loaded in the same query
     today = date.today()
-    food_logs = FoodLog.query.filter_by(user_id=user.id, date=today).all()
-    exercise_logs = ExerciseLog.query.filter_by(user_id=user.id, date=today).all()
-    water_logs = WaterLog.query.filter_by(user_id=user.id, date=today).all()
-    
-    # Calculate totals
-    total_calories = sum(log.amount * Food.query.get(log.food_id).calories_per_100g / 100 for log in food_logs)
-    total_water = sum(log.glasses for log in water_logs)
-    
-    # Get related objects for template
-    for log in food_logs:
-        log.food = Food.query.get(log.food_id)
+    food_logs = FoodLog.query.options(joinedload(FoodLog.food)).filter_by(user_id=user.id, date=today).all()
+    exercise_logs = ExerciseLog.query.options(joinedload(ExerciseLog.exercise)).filter_by(user_id=user.id, date=today).all()
     
-    for log in exercise_logs:
-        log.exercise = Exercise.query.get(log.exercise_id)
+    # Totals come from the materialized daily summary (a primary-key lookup)
+    summary = db.session.get(DailySummary, (user.id, today)) if user.id is not None else None
+    total_calories = summary.calories if summary else 0
+    total_water = summary.water_glasses if summary else 0
     
     return render_template('dashboard.html', 
                          user=user, 
                          food_logs=food_logs,
                          exercise_logs=exercise_logs,
-                         water_logs=water_logs,
                          total_calories=total_calories,
-                         total_water=total_water)
+                         total_water=total_water,
+                         meal_types=Config.MEAL_TYPES)
 
 @app.route('/food')
 def food_tracking():
-    foods = Food.query.all()
-    categories = db.session.query(Food.category).distinct().all()
-    return render_template('food.html', foods=foods, categories=categories)
+    # First page is rendered here; the rest is loaded from /api/foods as the user scrolls.
+    # The page body is a cached fragment, so these queries only run when it is re-rendered.
+    def load():
+        foods, next_cursor = keyset_page(Food.query, Food.id)
+        categories = db.session.query(Food.category).distinct().all()
+        return {'foods': foods, 'next_cursor': next_cursor, 'categories': categories}
+    return render_template('food.html', catalogue=LazyValues(load))
 
 @app.route('/exercise')
 def exercise_tracking():
-    exercises = Exercise.query.all()
-    levels = db.session.query(Exercise.level).distinct().all()
-    categories = db.session.query(Exercise.category).distinct().all()
-    return render_template('exercise.html', exercises=exercises, levels=levels, categories=categories)
+    def load():
+        exercises, next_cursor = keyset_page(Exercise.query, Exercise.id)
+        levels = db.session.query(Exercise.level).distinct().all()
+        categories = db.session.query(Exercise.category).distinct().all()
+        return {'exercises': exercises, 'next_cursor': next_cursor, 'levels': levels, 'categories': categories}
+    return render_template('exercise.html', catalogue=LazyValues(load))
 
 @app.route('/pantry')
 def pantry():
-    user = User.query.first()
-    pantry_items = Pantry.query.filter_by(user_id=user.id).all()
-    foods = Food.query.all()
-    return render_template('pantry.html', pantry_items=pantry_items, foods=foods)
+    user = get_current_user()
+    pantry_items = Pantry.query.options(joinedload(Pantry.food)).filter_by(user_id=user.id).all()
+    # Foods to add are picked with the search autocomplete instead of a full <select>
+    return render_template('pantry.html', pantry_items=pantry_items)
+
+@app.route('/api/foods')
+def api_foods():
+    query = Food.query
+    if request.args.get('category'):
+        query = query.filter_by(category=request.args['category'])
+    return api_page(query, Food.id, food_to_dict, etag=lambda: catalogue_etag(Food, food_to_dict))
+
+@app.route('/api/exercises')
+def api_exercises():
+    query = Exercise.query
+    if request.args.get('level'):
+        query = query.filter_by(level=request.args['level'])
+    if request.args.get('category'):
+        query = query.filter_by(category=request.args['category'])
+    return api_page(query, Exercise.id, exercise_to_dict,
+                    etag=lambda: catalogue_etag(Exercise, exercise_to_dict))
+
+@app.route('/api/analytics')
+def api_analytics():
+    """Totals per day/week/month over the last ``days`` days (ending ``end``, default today)"""
+    user = get_current_user()
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return jsonify({'error': f"Unknown bucket: {bucket} (expected one of {', '.join(BUCKETS)})"}), 400
+    try:
+        days = int(request.args.get('days', 30))
+        end_date = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'error': "days must be an integer and end a YYYY-MM-DD date"}), 400
+    if not 1 <= days <= Config.ANALYTICS_MAX_DAYS:
+        return jsonify({'error': f"days must be between 1 and {Config.ANALYTICS_MAX_DAYS}"}), 400
+    try:
+        web_dialect()
+    except ValueError as e:
+        # The bucket SQL only exists for the backends in database.DIALECTS
+        return jsonify({'error': str(e)}), 501
+    
+    start_date, end_date = date_range(days, end_date)
+    response = jsonify(analytics_series(user.id, start_date, end_date, bucket))
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/logs')
+def api_logs():
+    user = get_current_user()
+    log_type = request.args.get('type', 'food')
+    if log_type == 'food':
+        model, serializer = FoodLog, food_log_to_dict
+        query = FoodLog.query.options(joinedload(FoodLog.food))
+    elif log_type == 'exercise':
+        model, serializer = ExerciseLog, exercise_log_to_dict
+        query = ExerciseLog.query.options(joinedload(ExerciseLog.exercise))
+    elif log_type == 'water':
+        model, serializer = WaterLog, water_log_to_dict
+        query = WaterLog.query
+    else:
+        return jsonify({'error': f"Unknown log type: {log_type}"}), 400
+    
+    query = query.filter(model.user_id == user.id)
+    if request.args.get('date'):
+        try:
+            log_date = date.fromisoformat(request.args['date'])
+        except ValueError:
+            return jsonify({'error': f"Invalid date: {request.args['date']}"}), 400
+        query = query.filter(model.date == log_date)
+    # Newest logs first
+    return api_page(query, model.id, serializer, descending=True)
+
+@app.route('/api/logs', methods=['POST'])
+def ingest_logs():
+    """Accept one event, a list of events or {"events": [...]}
+
+    By default the response waits until the events are committed (201). With
+    ``?ack=queued`` it returns 202 as soon as they are queued.
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and 'events' in data:
+        data = data['events']
+    raw_events = data if isinstance(data, list) else [data]
+    if data is None or not raw_events:
+        return jsonify({'error': "Expected a JSON log event or a list of events"}), 400
+    if len(raw_events) > Config.INGEST_MAX_EVENTS:
+        return jsonify({'error': f"At most {Config.INGEST_MAX_EVENTS} events per request"}), 413
+    
+    user = get_current_user()
+    events = []
+    for index, raw_event in enumerate(raw_events):
+        try:
+            events.append(parse_log_event(raw_event, user.id))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'index': index}), 400
+    
+    # Reject unknown foods/exercises now rather than failing them in the background
+    for log_type, model, field in (('food', Food, 'food_id'), ('exercise', Exercise, 'exercise_id')):
+        ids = {event[field] for event in events if event['type'] == log_type}
+        if ids:
+            known = {row[0] for row in db.session.query(model.id).filter(model.id.in_(ids))}
+            if ids - known:
+                return jsonify({'error': f"Unknown {field}: {sorted(ids - known)}"}), 400
+    
+    if user.id is None:
+        # First write from this session: only now save its user
+        user = get_current_user(create=True)
+        for event in events:
+            event['user_id'] = user.id
+    
+    try:
+        futures = log_queue.submit(events)
+    except QueueFullError as e:
+        # Nothing from this request was queued, so the client can resend all of it
+        response = jsonify({'error': str(e), 'accepted': 0})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    
+    if request.args.get('ack') == 'queued':
+        return jsonify({'accepted': len(futures)}), 202
+    
+    done, not_done = wait(futures, timeout=Config.INGEST_ACK_TIMEOUT)
+    if not_done:
+        # Still queued; they will be written, we just could not confirm it in time
+        return jsonify({'accepted': len(futures), 'committed': None}), 202
+    failed = [{'index': index, 'error': str(future.exception())}
+              for index, future in enumerate(futures) if future.exception()]
+    body = {'accepted': len(futures), 'committed': len(futures) - len(failed)}
+    if failed:
+        body['failed'] = failed
+        return jsonify(body), 207
+    return jsonify(body), 201
 
 @app.route('/profile')
 def profile():
-    user = User.query.first()
+    user = get_current_user()
     return render_template('profile.html', user=user)
 
+@app.route('/update_profile', methods=['POST'])
+def update_profile():
+    user = get_current_user(create=True)
+    try:
+        user.name = request.form.get('name', user.name).strip() or user.name
+        user.age = int(request.form.get('age', user.age))
+        user.weight = float(request.form.get('weight', user.weight))
+        user.height = float(request.form.get('height', user.height))
+        user.target_calories = int(request.form.get('target_calories', user.target_calories))
+    except ValueError:
+        db.session.rollback()
+        flash('অবৈধ তথ্য!' if session.get('language', 'bn') == 'bn' else 'Invalid profile details!', 'error')
+        return redirect(url_for('profile'))
+    if request.form.get('goal') in Config.FITNESS_GOALS:
+        user.goal = request.form['goal']
+    db.session.commit()
+    invalidate_user(user.id)
+    
+    flash('প্রোফাইল আপডেট করা হয়েছে!' if session.get('language', 'bn') == 'bn' else 'Profile updated!', 'success')
+    return redirect(url_for('profile'))
+
 @app.route('/add_food', methods=['POST'])
 def add_food():
-    user = User.query.first()
+    user = get_current_user(create=True)
     food_id = request.form.get('food_id')
     amount = float(request.form.get('amount', 100))
     meal_type = request.form.get('meal_type', 'snack')
     
-    food_log = FoodLog(user_id=user.id, food_id=food_id, amount=amount, meal_type=meal_type)
+    food_log = FoodLog(user_id=user.id, food_id=food_id, amount=amount, meal_type=meal_type, date=date.today())
     db.session.add(food_log)
+    food = db.session.get(Food, food_id)
+    if food:
+        add_to_daily_summary(user.id, food_log.date,
+                             calories=amount * food.calories_per_100g / 100,
+                             protein=amount * (food.protein or 0) / 100,
+                             carbs=amount * (food.carbs or 0) / 100,
+                             fat=amount * (food.fat or 0) / 100)
     db.session.commit()
     
     flash('খাবার যোগ করা হয়েছে!' if session.get('language', 'bn') == 'bn' else 'Food added successfully!', 'success')
@@ -184,14 +794,15 @@ def add_food():
 
 @app.route('/add_exercise', methods=['POST'])
 def add_exercise():
-    user = User.query.first()
+    user = get_current_user(create=True)
     exercise_id = request.form.get('exercise_id')
     duration = int(request.form.get('duration', 10))
     sets = int(request.form.get('sets', 0))
     reps = int(request.form.get('reps', 0))
     
-    exercise_log = ExerciseLog(user_id=user.id, exercise_id=exercise_id, duration=duration, sets=sets, reps=reps)
+    exercise_log = ExerciseLog(user_id=user.id, exercise_id=exercise_id, duration=duration, sets=sets, reps=reps, date=date.today())
     db.session.add(exercise_log)
+    add_to_daily_summary(user.id, exercise_log.date, exercise_minutes=duration)
     db.session.commit()
     
     flash('ব্যায়াম যোগ করা হয়েছে!' if session.get('language', 'bn') == 'bn' else 'Exercise added successfully!', 'success')
@@ -199,11 +810,12 @@ def add_exercise():
 
 @app.route('/add_water', methods=['POST'])
 def add_water():
-    user = User.query.first()
+    user = get_current_user(create=True)
     glasses = int(request.form.get('glasses', 1))
     
-    water_log = WaterLog(user_id=user.id, glasses=glasses)
+    water_log = WaterLog(user_id=user.id, glasses=glasses, date=date.today())
     db.session.add(water_log)
+    add_to_daily_summary(user.id, water_log.date, water_glasses=glasses)
     db.session.commit()
     
     flash('পানি যোগ করা হয়েছে!' if session.get('language', 'bn') == 'bn' else 'Water added successfully!', 'success')
@@ -211,7 +823,7 @@ def add_water():
 
 @app.route('/add_to_pantry', methods=['POST'])
 def add_to_pantry():
-    user = User.query.first()
+    user = get_current_user(create=True)
     food_id = request.form.get('food_id')
     custom_name = request.form.get('custom_name', '')
     
@@ -222,6 +834,33 @@ def add_to_pantry():
     flash('প্যান্ট্রিতে যোগ করা হয়েছে!' if session.get('language', 'bn') == 'bn' else 'Added to pantry!', 'success')
     return redirect(url_for('pantry'))
 
+SEARCH_MAX_RESULTS = 50
+
+@app.route('/api/foods/search')
+def search_foods():
+    query = request.args.get('q', '').strip()
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': "limit must be an integer"}), 400
+    limit = max(1, min(limit, SEARCH_MAX_RESULTS))
+    index = get_food_search_index()
+    if request.args.get('prefix'):
+        results = index.autocomplete(query, limit)
+    else:
+        results = index.search(query, limit)
+    return jsonify({'query': query, 'results': results})
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (this worker process only); ?format=json for a percentile report"""
+    if not Config.WEB_METRICS:
+        return jsonify({'error': "Metrics are disabled (WEB_METRICS=0)"}), 404
+    if request.args.get('format') == 'json':
+        return jsonify({'endpoints': request_metrics.report(), 'queries': query_profiler.report(top=20)})
+    body = request_metrics.to_prometheus() + query_profiler.to_prometheus()
+    return body, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.route('/toggle_language')
 def toggle_language():
     current_lang = session.get('language', 'bn')
@@ -229,11 +868,28 @@ def toggle_language():
     session['language'] = new_lang
     return redirect(request.referrer or url_for('dashboard'))
 
-if __name__ == '__main__':
+def init_db():
+    """Create the tables and seed the sample catalogue on first run"""
     with app.app_context():
         db.create_all()
+        # create_all skips tables that already exist, so indexes declared on them later are added here
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
         if not Food.query.first():
             insert_sample_data()
+        if not DailySummary.query.first():
+            rebuild_daily_summaries()
+
+def warm_up():
+    """Build the per-process caches up front (done once in the server master before forking)"""
+    with app.app_context():
+        get_food_search_index()
+    for template in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(template)
+
+if __name__ == '__main__':
+    init_db()
     
     print("🚀 Bangladeshi Fitness App Web Demo")
     print("🌐 Server running at: http://localhost:8080")